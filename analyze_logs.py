@@ -6,11 +6,39 @@ This tool helps analyze and debug MCP server logs.
 """
 
 import argparse
+import gzip
+import io
 import json
+import math
+import os
+import re
+import sqlite3
 import sys
-from datetime import datetime
+import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from kali_driver_mcp.metrics import command_template
+except ImportError:
+    # Running from a source checkout without the package installed
+    sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+    from kali_driver_mcp.metrics import command_template
+
+# Uncompressed files larger than this are split across worker processes
+CHUNK_SIZE = 64 * 1024 * 1024
+
+# Suffix of rotated segments (see CompressingRotatingFileHandler)
+SEGMENT_RE = re.compile(r"\.\d{8}-\d{6}(-\d+)?(\.gz|\.zst)?")
 
 
 def parse_json_log(line: str) -> Optional[dict]:
@@ -36,148 +64,325 @@ def parse_text_log(line: str) -> Optional[dict]:
     return None
 
 
-def filter_commands(log_file: Path, output_file: Optional[Path] = None):
-    """Extract all SSH command logs."""
-    commands = []
+def open_log(log_file: Path):
+    """Open a log file or a rotated, compressed segment for reading bytes."""
+    if log_file.suffix == ".gz":
+        return gzip.open(log_file, 'rb')
+    if log_file.suffix == ".zst":
+        if zstandard is None:
+            print(f"Error: Reading {log_file} requires the zstandard package")
+            sys.exit(1)
+        return io.BufferedReader(
+            zstandard.ZstdDecompressor().stream_reader(open(log_file, 'rb'), closefd=True)
+        )
+    return open(log_file, 'rb')
 
-    with open(log_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
 
-            # Try JSON format first
-            log_entry = parse_json_log(line)
-            if not log_entry:
-                log_entry = parse_text_log(line)
+def is_compressed(log_file: Path) -> bool:
+    """Check if a log segment is compressed (and cannot be split)."""
+    return log_file.suffix in (".gz", ".zst")
 
-            if not log_entry:
-                continue
 
-            # Check if this is a command log
-            message = log_entry.get("message", "")
-            if "[CMD-" in message:
-                # Extract command ID
-                if "Starting command" in message:
-                    cmd_info = {
-                        "type": "start",
-                        "message": message,
-                        "timestamp": log_entry.get("timestamp"),
-                    }
-                    if log_entry.get("extra"):
-                        cmd_info.update(log_entry["extra"])
-                    commands.append(cmd_info)
-
-                elif "Completed with exit code" in message:
-                    cmd_info = {
-                        "type": "complete",
-                        "message": message,
-                        "timestamp": log_entry.get("timestamp"),
-                    }
-                    if log_entry.get("extra"):
-                        cmd_info.update(log_entry["extra"])
-                    commands.append(cmd_info)
-
-                elif "Command failed" in message:
-                    cmd_info = {
-                        "type": "error",
-                        "message": message,
-                        "timestamp": log_entry.get("timestamp"),
-                    }
-                    if log_entry.get("extra"):
-                        cmd_info.update(log_entry["extra"])
-                    commands.append(cmd_info)
-
-    # Print or save results
-    if output_file:
-        with open(output_file, 'w') as f:
-            json.dump(commands, f, indent=2)
-        print(f"Extracted {len(commands)} command logs to {output_file}")
-    else:
-        print(f"\n=== SSH Commands ({len(commands)} entries) ===\n")
-        for cmd in commands:
-            print(f"[{cmd.get('timestamp', 'N/A')}] {cmd.get('message', '')}")
-            if cmd.get('command'):
-                print(f"  Command: {cmd['command'][:80]}...")
-            if cmd.get('exit_code') is not None:
-                print(f"  Exit Code: {cmd['exit_code']}")
-            if cmd.get('duration_seconds'):
-                print(f"  Duration: {cmd['duration_seconds']}s")
-            print()
-
-
-def filter_tools(log_file: Path, output_file: Optional[Path] = None):
-    """Extract all MCP tool logs."""
-    tools = []
-
-    with open(log_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+def iter_lines(log_file: Path, start: int = 0, end: Optional[int] = None):
+    """
+    Yield the stripped, non-empty lines of a log file.
+
+    For uncompressed files, only the lines starting in [start, end) are
+    read, so byte ranges of one file can be scanned independently.
+    """
+    with open_log(log_file) as f:
+        if start > 0:
+            # Skip the line straddling the range start; the previous range owns it
+            f.seek(start - 1)
+            pos = start - 1 + len(f.readline())
+        else:
+            pos = 0
+
+        for raw in f:
+            if end is not None and pos >= end:
+                break
+            pos += len(raw)
+            line = raw.decode('utf-8', errors='replace').strip()
+            if line:
+                yield line
+
+
+def parse_entry(line: str) -> Optional[dict]:
+    """Parse a JSON or text log line."""
+    log_entry = parse_json_log(line)
+    if isinstance(log_entry, dict):
+        return log_entry
+    return parse_text_log(line)
+
+
+def load_blob(blob_dir: Path, digest: str) -> Optional[str]:
+    """Load a command output from the blob store (None if missing)."""
+    path = blob_dir / digest[:2] / f"{digest}.gz"
+    try:
+        with gzip.open(path, 'rb') as f:
+            return f.read().decode('utf-8')
+    except FileNotFoundError:
+        return None
 
-            # Try JSON format first
-            log_entry = parse_json_log(line)
-            if not log_entry:
-                log_entry = parse_text_log(line)
 
-            if not log_entry:
+def show_output(log_files: List[Path], cmd_id: int, blob_dir: Path):
+    """Print the full stdout and stderr of one command."""
+    marker = f"[CMD-{cmd_id}] Completed"
+
+    for log_file in log_files:
+        for line in iter_lines(log_file):
+            log_entry = parse_json_log(line)
+            if not isinstance(log_entry, dict) or not log_entry.get("message", "").startswith(marker):
                 continue
 
-            # Check if this is a tool log
-            message = log_entry.get("message", "")
-            if "[TOOL-" in message:
-                tool_info = {
+            extra = log_entry.get("extra", {})
+            for stream in ("stdout", "stderr"):
+                text = extra.get(stream, "")
+                blob = extra.get(f"{stream}_blob")
+                if blob:
+                    # Outputs moved to the blob store are only read when asked for
+                    text = load_blob(blob_dir, blob["sha256"])
+                    if text is None:
+                        print(f"Warning: {stream} blob {blob['sha256']} not found in {blob_dir}")
+                        text = blob.get("preview", "")
+                print(f"=== {stream.upper()} ({len(text)} chars) ===")
+                print(text)
+            return
+
+    print(f"Error: No completed command CMD-{cmd_id} in {', '.join(map(str, log_files))} (JSON logs only)")
+    sys.exit(1)
+
+
+class Report:
+    """
+    A report computed in one pass over the log.
+
+    Reports are fed every line of their byte range (entry is None for lines
+    that do not parse), merged in file order, then rendered. They must stay
+    picklable, since ranges are scanned in worker processes.
+    """
+
+    name = ""
+    # Whether byte ranges can be scanned separately and merged
+    splittable = True
+
+    def feed(self, log_entry: Optional[dict]):
+        raise NotImplementedError
+
+    def merge(self, other: "Report"):
+        raise NotImplementedError
+
+    def close(self):
+        """Release resources before the report leaves its worker."""
+
+    def render(self):
+        raise NotImplementedError
+
+
+class StatsReport(Report):
+    """Line, level, command and tool counts."""
+
+    name = "stats"
+
+    def __init__(self):
+        self.stats = {
+            "total_lines": 0,
+            "commands": 0,
+            "tools": 0,
+            "errors": 0,
+            "warnings": 0,
+            "levels": {},
+        }
+
+    def feed(self, log_entry: Optional[dict]):
+        stats = self.stats
+        stats["total_lines"] += 1
+        if not log_entry:
+            return
+
+        # Count by level
+        level = log_entry.get("level", "UNKNOWN")
+        stats["levels"][level] = stats["levels"].get(level, 0) + 1
+
+        # Count errors and warnings
+        if level == "ERROR":
+            stats["errors"] += 1
+        elif level == "WARNING":
+            stats["warnings"] += 1
+
+        # Count commands and tools
+        message = log_entry.get("message", "")
+        if "[CMD-" in message:
+            stats["commands"] += 1
+        if "[TOOL-" in message:
+            stats["tools"] += 1
+
+    def merge(self, other: "StatsReport"):
+        for key in ("total_lines", "commands", "tools", "errors", "warnings"):
+            self.stats[key] += other.stats[key]
+        for level, count in other.stats["levels"].items():
+            self.stats["levels"][level] = self.stats["levels"].get(level, 0) + count
+
+    def render(self):
+        stats = self.stats
+        print("\n=== Log Statistics ===\n")
+        print(f"Total Lines: {stats['total_lines']}")
+        print(f"Commands: {stats['commands']}")
+        print(f"Tools: {stats['tools']}")
+        print(f"Errors: {stats['errors']}")
+        print(f"Warnings: {stats['warnings']}")
+        print("\nBy Level:")
+        for level, count in sorted(stats["levels"].items()):
+            print(f"  {level}: {count}")
+
+
+class EntryReport(Report):
+    """
+    Extracted entries, with bounded memory.
+
+    Only the last ``limit`` entries are kept for display; with an output
+    file, every entry is spooled to disk and streamed into it at the end.
+    """
+
+    title = ""
+
+    def __init__(self, limit: int, spool: Optional[Path] = None):
+        self.count = 0
+        self.recent = deque(maxlen=limit)
+        self.spools: List[Path] = [spool] if spool else []
+        self._spool_file = open(spool, 'w') if spool else None
+
+    def select(self, log_entry: dict) -> Optional[dict]:
+        """Return the entry to report for a log line, if any."""
+        raise NotImplementedError
+
+    def feed(self, log_entry: Optional[dict]):
+        if not log_entry:
+            return
+        item = self.select(log_entry)
+        if item is None:
+            return
+        self.count += 1
+        self.recent.append(item)
+        if self._spool_file:
+            self._spool_file.write(json.dumps(item) + "\n")
+
+    def merge(self, other: "EntryReport"):
+        self.count += other.count
+        self.recent.extend(other.recent)
+        self.spools.extend(other.spools)
+
+    def close(self):
+        if self._spool_file:
+            self._spool_file.close()
+            self._spool_file = None
+
+    def write_items(self, f):
+        """Stream all spooled entries into a JSON array."""
+        f.write("[")
+        first = True
+        for spool in self.spools:
+            with open(spool) as spooled:
+                for line in spooled:
+                    f.write(("\n  " if first else ",\n  ") + line.rstrip("\n"))
+                    first = False
+        f.write("\n]" if not first else "]")
+
+    def render(self):
+        print(f"\n=== {self.title} ({self.count} entries) ===\n")
+        shown = len(self.recent)
+        if shown < self.count:
+            print(f"Showing last {shown} of {self.count} entries (raise --limit or use --output for all)\n")
+        for item in self.recent:
+            self.render_item(item)
+
+    def render_item(self, item: dict):
+        raise NotImplementedError
+
+
+class CommandsReport(EntryReport):
+    """SSH command start, completion and error records."""
+
+    name = "commands"
+    title = "SSH Commands"
+    _TYPES = (
+        ("Starting command", "start"),
+        ("Completed with exit code", "complete"),
+        ("Command failed", "error"),
+    )
+
+    def select(self, log_entry: dict) -> Optional[dict]:
+        message = log_entry.get("message", "")
+        if "[CMD-" not in message:
+            return None
+        for marker, kind in self._TYPES:
+            if marker in message:
+                cmd_info = {
+                    "type": kind,
                     "message": message,
                     "timestamp": log_entry.get("timestamp"),
                 }
                 if log_entry.get("extra"):
-                    tool_info.update(log_entry["extra"])
-                tools.append(tool_info)
+                    cmd_info.update(log_entry["extra"])
+                return cmd_info
+        return None
 
-    # Print or save results
-    if output_file:
-        with open(output_file, 'w') as f:
-            json.dump(tools, f, indent=2)
-        print(f"Extracted {len(tools)} tool logs to {output_file}")
-    else:
-        print(f"\n=== MCP Tools ({len(tools)} entries) ===\n")
-        for tool in tools:
-            print(f"[{tool.get('timestamp', 'N/A')}] {tool.get('message', '')}")
-            if tool.get('tool_name'):
-                print(f"  Tool: {tool['tool_name']}")
-            if tool.get('arguments'):
-                print(f"  Arguments: {tool['arguments']}")
-            if tool.get('duration_seconds'):
-                print(f"  Duration: {tool['duration_seconds']}s")
-            print()
-
-
-def filter_errors(log_file: Path):
-    """Extract all errors from log."""
-    errors = []
-
-    with open(log_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+    def render_item(self, cmd: dict):
+        print(f"[{cmd.get('timestamp', 'N/A')}] {cmd.get('message', '')}")
+        if cmd.get('command'):
+            print(f"  Command: {cmd['command'][:80]}...")
+        if cmd.get('exit_code') is not None:
+            print(f"  Exit Code: {cmd['exit_code']}")
+        if cmd.get('duration_seconds'):
+            print(f"  Duration: {cmd['duration_seconds']}s")
+        for stream in ("stdout", "stderr"):
+            blob = cmd.get(f"{stream}_blob")
+            if blob:
+                print(f"  {stream.capitalize()}: {blob['size']} bytes in blob {blob['sha256'][:12]}")
+        print()
 
-            # Try JSON format first
-            log_entry = parse_json_log(line)
-            if not log_entry:
-                log_entry = parse_text_log(line)
 
-            if not log_entry:
-                continue
+class ToolsReport(EntryReport):
+    """MCP tool invocation records."""
 
-            # Check if this is an error
-            level = log_entry.get("level", "")
-            if level in ["ERROR", "CRITICAL"]:
-                errors.append(log_entry)
+    name = "tools"
+    title = "MCP Tools"
 
-    print(f"\n=== Errors ({len(errors)} entries) ===\n")
-    for error in errors:
+    def select(self, log_entry: dict) -> Optional[dict]:
+        message = log_entry.get("message", "")
+        if "[TOOL-" not in message:
+            return None
+        tool_info = {
+            "message": message,
+            "timestamp": log_entry.get("timestamp"),
+        }
+        if log_entry.get("extra"):
+            tool_info.update(log_entry["extra"])
+        return tool_info
+
+    def render_item(self, tool: dict):
+        print(f"[{tool.get('timestamp', 'N/A')}] {tool.get('message', '')}")
+        if tool.get('tool_name'):
+            print(f"  Tool: {tool['tool_name']}")
+        if tool.get('arguments'):
+            print(f"  Arguments: {tool['arguments']}")
+        if tool.get('duration_seconds'):
+            print(f"  Duration: {tool['duration_seconds']}s")
+        print()
+
+
+class ErrorsReport(EntryReport):
+    """ERROR and CRITICAL records."""
+
+    name = "errors"
+    title = "Errors"
+
+    def select(self, log_entry: dict) -> Optional[dict]:
+        if log_entry.get("level", "") in ("ERROR", "CRITICAL"):
+            return log_entry
+        return None
+
+    def render_item(self, error: dict):
         print(f"[{error.get('timestamp', 'N/A')}] {error.get('message', '')}")
         if error.get("exception"):
             exc = error["exception"]
@@ -185,59 +390,1171 @@ def filter_errors(log_file: Path):
         print()
 
 
-def show_stats(log_file: Path):
-    """Show statistics about the log file."""
-    stats = {
-        "total_lines": 0,
-        "commands": 0,
-        "tools": 0,
-        "errors": 0,
-        "warnings": 0,
-        "levels": {},
-    }
+# Sudo password piped in by the SSH manager's sudo wrapping
+_SUDO_PASSWORD_RE = re.compile(r'echo ".*?" \| (?=sudo -S )')
+
+
+def requested_command(extra: dict, logged: str) -> str:
+    """
+    Command as requested, before sudo wrapping.
+
+    JSON records carry it in their context; otherwise the logged (wrapped,
+    possibly truncated) command is used with any sudo password removed.
+    """
+    command = (extra.get("context") or {}).get("original_command") or extra.get("command") or logged
+    return _SUDO_PASSWORD_RE.sub("", command)
+
 
-    with open(log_file, 'r') as f:
+class TemplateLatency:
+    """Duration distribution of one command template, in log-scale buckets."""
+
+    # Bucket upper bounds grow by 5% from 1ms, so percentiles are within 5%
+    BASE = 0.001
+    GROWTH = 1.05
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.buckets: Counter = Counter()
+
+    def add(self, duration: float, failed: bool = False):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.errors += failed
+        bucket = max(0, math.ceil(math.log(max(duration, self.BASE) / self.BASE, self.GROWTH)))
+        self.buckets[bucket] += 1
+
+    def merge(self, other: "TemplateLatency"):
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.errors += other.errors
+        self.buckets.update(other.buckets)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile."""
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.BASE * self.GROWTH ** bucket, self.max)
+        return self.max
+
+
+class LatencyReport(Report):
+    """Command count, total time and duration percentiles per command template."""
+
+    name = "latency"
+    _START_RE = re.compile(r"\[CMD-(\d+)\] Starting command: (.*)", re.DOTALL)
+    _END_RE = re.compile(r"\[CMD-(\d+)\] Completed with exit code (-?\d+) in ([\d.]+)s")
+    _ERROR_RE = re.compile(r"\[CMD-(\d+)\] Command failed")
+
+    def __init__(self, limit: int = 100):
+        self.limit = limit
+        self.templates: dict = {}
+        # Commands started but not finished yet, and completions whose start
+        # lies in an earlier byte range (paired up by merge)
+        self.pending: dict = {}
+        self.orphans: List[tuple] = []
+
+    def add(self, template: str, duration: Optional[float], failed: bool = False):
+        latency = self.templates.setdefault(template, TemplateLatency())
+        if duration is None:
+            # Timeouts and connection errors have no duration; count the failure
+            latency.errors += 1
+        else:
+            latency.add(duration, failed)
+
+    def feed(self, log_entry: Optional[dict]):
+        if not log_entry:
+            return
+        message = log_entry.get("message", "")
+        if "[CMD-" not in message:
+            return
+        extra = log_entry.get("extra") or {}
+
+        match = self._START_RE.search(message)
+        if match:
+            self.pending[int(match.group(1))] = command_template(requested_command(extra, match.group(2)))
+            return
+
+        match = self._END_RE.search(message)
+        if match:
+            duration = extra.get("duration_seconds", float(match.group(3)))
+            self._finish(int(match.group(1)), duration, int(match.group(2)) != 0)
+            return
+
+        match = self._ERROR_RE.search(message)
+        if match:
+            self._finish(int(match.group(1)), None, True)
+
+    def _finish(self, cmd_id: int, duration: Optional[float], failed: bool):
+        template = self.pending.pop(cmd_id, None)
+        if template is None:
+            self.orphans.append((cmd_id, duration, failed))
+        else:
+            self.add(template, duration, failed)
+
+    def merge(self, other: "LatencyReport"):
+        for template, latency in other.templates.items():
+            self.templates.setdefault(template, TemplateLatency()).merge(latency)
+        for cmd_id, duration, failed in other.orphans:
+            self._finish(cmd_id, duration, failed)
+        self.pending.update(other.pending)
+
+    def render(self):
+        rows = sorted(self.templates.items(), key=lambda item: item[1].total, reverse=True)
+        print(f"\n=== Command Latency by Template ({len(rows)} templates, by total time) ===\n")
+        print(f"{'Count':>7} {'Total(s)':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'Max':>8} {'Err':>5}  Template")
+        for template, latency in rows[:self.limit]:
+            print(
+                f"{latency.count:>7} {latency.total:>10.2f} "
+                f"{latency.percentile(50):>8.3f} {latency.percentile(95):>8.3f} "
+                f"{latency.percentile(99):>8.3f} {latency.max:>8.3f} {latency.errors:>5}  {template}"
+            )
+
+
+def entry_time(log_entry: dict) -> Optional[float]:
+    """Seconds since the epoch of a record's timestamp (log clock)."""
+    timestamp = log_entry.get("timestamp")
+    if not timestamp:
+        return None
+    try:
+        return (datetime.fromisoformat(timestamp.rstrip("Z")) - datetime(1970, 1, 1)).total_seconds()
+    except ValueError:
+        return None
+
+
+def union_length(intervals: List[tuple]) -> float:
+    """Total time covered by possibly overlapping intervals."""
+    covered = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                covered += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        covered += current_end - current_start
+    return covered
+
+
+class ToolPath:
+    """Critical-path totals of one tool across its calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.commands = 0
+        self.wall = 0.0
+        self.remote = 0.0
+        self.host = 0.0
+        self.parallel_savings = 0.0
+        self.batch_savings = 0.0
+
+    def add_call(self, wall: float, commands: List[tuple]):
+        """
+        Attribute one call's wall time.
+
+        Remote time is when at least one command was running; the rest is
+        host overhead (argument handling, gaps between commands, encoding).
+        Running every command concurrently would shrink remote time to the
+        longest command; batching them into one round trip would save the
+        gaps between them plus one round-trip floor (the fastest command)
+        per extra command.
+        """
+        remote = union_length(commands)
+        self.calls += 1
+        self.commands += len(commands)
+        self.wall += wall
+        self.remote += remote
+        self.host += max(0.0, wall - remote)
+        if len(commands) > 1:
+            durations = [end - start for start, end in commands]
+            self.parallel_savings += remote - max(durations)
+            ordered = sorted(commands)
+            gaps = sum(
+                max(0.0, ordered[i + 1][0] - max(end for _, end in ordered[:i + 1]))
+                for i in range(len(ordered) - 1)
+            )
+            self.batch_savings += gaps + (len(commands) - 1) * min(durations)
+
+    def merge(self, other: "ToolPath"):
+        for key, value in vars(other).items():
+            setattr(self, key, getattr(self, key) + value)
+
+
+class ToolCall:
+    """One tool invocation reconstructed from its log records."""
+
+    def __init__(self, tool_id: int, name: str, start: float, trace_id: Optional[str], track: int):
+        self.tool_id = tool_id
+        self.name = name
+        self.start = start
+        self.trace_id = trace_id
+        # Sequence number of the call in the log (tool ids restart with the server)
+        self.track = track
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+        self.commands: List["CommandRun"] = []
+
+
+class CommandRun:
+    """One SSH command reconstructed from its log records."""
+
+    def __init__(self, cmd_id: int, command: str, start: float, call: Optional[ToolCall]):
+        self.cmd_id = cmd_id
+        self.command = command
+        self.start = start
+        self.call = call
+        self.end: Optional[float] = None
+        self.exit_code: Optional[int] = None
+        self.stdout_length: Optional[int] = None
+        self.stderr_length: Optional[int] = None
+        self.error: Optional[str] = None
+        # Track the command is drawn on, for exporters
+        self.track: Optional[int] = None
+
+
+class ToolCallTracker:
+    """
+    Pairs tool call and command records, and commands with their calls.
+
+    Commands are attributed to tool calls by trace id when the records
+    carry one (tracing enabled), otherwise by time: a command belongs to
+    the only tool call in flight when it starts. Commands started while
+    several calls overlap cannot be attributed and are counted apart.
+    Subclasses are told about calls and commands as they start and finish
+    through the ``*_started`` and ``*_done`` methods.
+    """
+
+    _TOOL_START_RE = re.compile(r"\[TOOL-(\d+)\] Invoking tool: (\S+)")
+    _TOOL_END_RE = re.compile(r"\[TOOL-(\d+)\] Tool (\S+) (?:completed in ([\d.]+)s|failed: (.*))", re.DOTALL)
+
+    def __init__(self):
+        self.unattributed = 0
+        # Latest record time seen, the end of anything still running
+        self.last_time: Optional[float] = None
+        self._calls = 0
+        self._open_tools: Dict[int, ToolCall] = {}
+        self._open_commands: Dict[int, CommandRun] = {}
+
+    def track(self, log_entry: Optional[dict]):
+        """Feed one log record."""
+        if not log_entry:
+            return
+        message = log_entry.get("message", "")
+        if "[TOOL-" in message:
+            self._tool_record(log_entry, message)
+        elif "[CMD-" in message:
+            self._command_record(log_entry, message)
+
+    def call_started(self, call: ToolCall):
+        """Called when a tool call starts."""
+
+    def command_started(self, command: CommandRun):
+        """Called when a command starts."""
+
+    def command_done(self, command: CommandRun):
+        """Called when a command completes or fails."""
+
+    def call_done(self, call: ToolCall):
+        """Called when a tool call completes or fails."""
+
+    def _tool_record(self, log_entry: dict, message: str):
+        now = self._time(log_entry)
+        match = self._TOOL_START_RE.search(message)
+        if match and now is not None:
+            self._calls += 1
+            tool_id = int(match.group(1))
+            call = ToolCall(tool_id, match.group(2), now, log_entry.get("trace_id"), self._calls)
+            self._open_tools[tool_id] = call
+            self.call_started(call)
+            return
+
+        match = self._TOOL_END_RE.search(message)
+        if not match:
+            return
+        call = self._open_tools.pop(int(match.group(1)), None)
+        if call is None or now is None:
+            return
+        call.end = call.start + float(match.group(3)) if match.group(3) else max(call.start, now)
+        call.error = match.group(4)
+        self.call_done(call)
+
+    def _owner(self, trace_id: Optional[str]) -> Optional[ToolCall]:
+        """Tool call a starting command belongs to."""
+        if trace_id:
+            for call in self._open_tools.values():
+                if call.trace_id == trace_id:
+                    return call
+        if len(self._open_tools) == 1:
+            return next(iter(self._open_tools.values()))
+        return None
+
+    def _command_record(self, log_entry: dict, message: str):
+        now = self._time(log_entry)
+        extra = log_entry.get("extra") or {}
+        match = LatencyReport._START_RE.search(message)
+        if match:
+            if now is None:
+                return
+            owner = self._owner(log_entry.get("trace_id"))
+            if owner is None and self._open_tools:
+                self.unattributed += 1
+            cmd_id = int(match.group(1))
+            command = requested_command(extra, match.group(2).strip())
+            self._open_commands[cmd_id] = CommandRun(cmd_id, command, now, owner)
+            self.command_started(self._open_commands[cmd_id])
+            return
+
+        match = LatencyReport._END_RE.search(message)
+        failed = match is None and LatencyReport._ERROR_RE.search(message)
+        if not (match or failed):
+            return
+        command = self._open_commands.pop(int((match or failed).group(1)), None)
+        if command is None:
+            return
+        if match:
+            # The logged duration is finer than text log timestamps
+            command.end = command.start + float(match.group(3))
+            command.exit_code = int(match.group(2))
+            command.stdout_length = extra.get("stdout_length")
+            command.stderr_length = extra.get("stderr_length")
+        else:
+            command.end = max(command.start, now or command.start)
+            command.error = (
+                f"{extra['error_type']}: {extra.get('error_message')}" if "error_type" in extra else "failed"
+            )
+        if command.call is not None and command.call.end is None:
+            command.call.commands.append(command)
+        self.command_done(command)
+
+    def _time(self, log_entry: dict) -> Optional[float]:
+        now = entry_time(log_entry)
+        if now is not None and (self.last_time is None or now > self.last_time):
+            self.last_time = now
+        return now
+
+
+class CriticalPathReport(ToolCallTracker, Report):
+    """
+    Where each tool call's wall time goes, reconstructed from the log.
+
+    Tool calls and their commands can span byte ranges, so this report
+    needs a sequential scan.
+    """
+
+    name = "critical_path"
+    splittable = False
+
+    def __init__(self, limit: int = 100):
+        super().__init__()
+        self.limit = limit
+        self.tools: dict = {}
+
+    def feed(self, log_entry: Optional[dict]):
+        self.track(log_entry)
+
+    def call_done(self, call: ToolCall):
+        intervals = [(command.start, command.end) for command in call.commands]
+        self.tools.setdefault(call.name, ToolPath()).add_call(call.end - call.start, intervals)
+
+    def merge(self, other: "CriticalPathReport"):
+        for name, path in other.tools.items():
+            self.tools.setdefault(name, ToolPath()).merge(path)
+        self.unattributed += other.unattributed
+
+    def render(self):
+        rows = sorted(self.tools.items(), key=lambda item: item[1].wall, reverse=True)
+        calls = sum(path.calls for path in self.tools.values())
+        print(f"\n=== Critical Path by Tool ({calls} calls, by total wall time) ===\n")
+        print(
+            f"{'Calls':>6} {'Wall(s)':>9} {'Remote':>9} {'Host':>9} {'Cmds/call':>10} "
+            f"{'Parallel':>9} {'Batch':>9}  Tool"
+        )
+        for name, path in rows[:self.limit]:
+            print(
+                f"{path.calls:>6} {path.wall:>9.2f} "
+                f"{path.remote:>9.2f} {path.host:>9.2f} {path.commands / path.calls:>10.1f} "
+                f"{path.parallel_savings:>9.2f} {path.batch_savings:>9.2f}  {name}"
+            )
+        print(
+            "\nRemote: time with a command running; Host: the rest of the wall time.\n"
+            "Parallel/Batch: estimated seconds saved by running each call's commands\n"
+            "concurrently, or in one round trip."
+        )
+        if self.unattributed:
+            print(f"{self.unattributed} commands started during overlapping tool calls were not attributed "
+                  "(enable tracing to attribute them by trace id).")
+
+
+REPORTS = {
+    report.name: report
+    for report in (StatsReport, CommandsReport, ToolsReport, ErrorsReport, LatencyReport, CriticalPathReport)
+}
+
+
+# Leading timestamp of a JSON record (JSONFormatter writes it first) or text line
+_TIMESTAMP_RE = re.compile(r'^(?:\{"timestamp": "([^"]+)"|(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d))')
+
+# Records probed past a seek point before giving up on finding a timestamp
+MAX_PROBE_LINES = 1000
+
+# Cached first/last timestamps of rotated segments, next to the segments
+SEGMENT_INDEX = ".analyze_logs_index.json"
+
+
+def line_timestamp(line) -> Optional[datetime]:
+    """Timestamp at the start of a log line (str or bytes), if any."""
+    if isinstance(line, bytes):
+        line = line[:64].decode('utf-8', errors='replace')
+    match = _TIMESTAMP_RE.match(line)
+    if not match:
+        return None
+    try:
+        return datetime.fromisoformat((match.group(1) or match.group(2)).rstrip("Z"))
+    except ValueError:
+        return None
+
+
+def parse_time(value: str) -> datetime:
+    """Parse a --since/--until value; a bare time means today."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.combine(datetime.now().date(), datetime.strptime(value, "%H:%M:%S").time())
+    except ValueError:
+        return datetime.combine(datetime.now().date(), datetime.strptime(value, "%H:%M").time())
+
+
+def seek_time(log_file: Path, target: datetime) -> int:
+    """
+    Binary-search an uncompressed log for the first line at or after target.
+
+    Returns:
+        Byte offset of the first line with a timestamp >= target (lines
+        without one belong to the record before), or the file size
+    """
+    size = log_file.stat().st_size
+    lo, hi = 0, size
+    with open(log_file, 'rb') as f:
+        while hi - lo > 4096:
+            mid = (lo + hi) // 2
+            f.seek(mid)
+            f.readline()
+            timestamp = None
+            for _ in range(MAX_PROBE_LINES):
+                line = f.readline()
+                if not line:
+                    break
+                timestamp = line_timestamp(line)
+                if timestamp is not None:
+                    break
+            if timestamp is not None and timestamp < target:
+                lo = mid
+            else:
+                hi = mid
+
+        # Walk the last few KB to the exact record
+        f.seek(lo)
+        if lo > 0:
+            f.readline()
+        pos = f.tell()
         for line in f:
-            line = line.strip()
-            if not line:
-                continue
+            timestamp = line_timestamp(line)
+            if timestamp is not None and timestamp >= target:
+                return pos
+            pos += len(line)
+    return size
 
-            stats["total_lines"] += 1
 
-            # Try to parse
-            log_entry = parse_json_log(line)
-            if not log_entry:
-                log_entry = parse_text_log(line)
+def segment_bounds(log_file: Path) -> Optional[tuple]:
+    """
+    First and last timestamps of a rotated (immutable) segment.
 
-            if not log_entry:
-                continue
+    Computed with one full read and cached in a small index file beside the
+    segment, keyed by name, size and modification time.
+    """
+    index_file = log_file.parent / SEGMENT_INDEX
+    stat = log_file.stat()
+    key = [stat.st_size, stat.st_mtime]
+    try:
+        index = json.loads(index_file.read_text())
+    except (OSError, ValueError):
+        index = {}
+
+    cached = index.get(log_file.name)
+    if cached and cached["key"] == key:
+        first, last = cached["first"], cached["last"]
+    else:
+        first = last = None
+        for line in iter_lines(log_file):
+            timestamp = line_timestamp(line)
+            if timestamp is not None:
+                first = first or timestamp.isoformat()
+                last = timestamp.isoformat()
+        index[log_file.name] = {"key": key, "first": first, "last": last}
+        try:
+            index_file.write_text(json.dumps(index))
+        except OSError:
+            pass
+
+    if first is None:
+        return None
+    return datetime.fromisoformat(first), datetime.fromisoformat(last)
+
+
+class TimeWindow:
+    """
+    Keeps the lines of records within [since, until].
+
+    Lines without a timestamp (multi-line messages) follow the record they
+    belong to; a timestamp past ``until`` ends the scan.
+    """
+
+    def __init__(self, since: Optional[datetime], until: Optional[datetime]):
+        self.since = since
+        self.until = until
+        self.keep = True
+        self.done = False
+
+    def accept(self, line: str) -> bool:
+        timestamp = line_timestamp(line)
+        if timestamp is not None:
+            if self.until is not None and timestamp > self.until:
+                self.done = True
+                return False
+            self.keep = self.since is None or timestamp >= self.since
+        return self.keep
+
+
+def make_reports(names: List[str], limit: int, spool_dir: Optional[str], task_index: int) -> List[Report]:
+    """Create the requested reports for one scan task."""
+    reports = []
+    for name in names:
+        cls = REPORTS[name]
+        if issubclass(cls, EntryReport):
+            spool = Path(spool_dir) / f"{task_index:06d}-{name}.jsonl" if spool_dir else None
+            reports.append(cls(limit, spool))
+        elif cls in (LatencyReport, CriticalPathReport):
+            reports.append(cls(limit))
+        else:
+            reports.append(cls())
+    return reports
+
+
+def scan(task: tuple, reports: Optional[List[Report]] = None) -> List[Report]:
+    """Feed every line of one byte range to the reports (fresh ones by default)."""
+    log_file, start, end, names, limit, spool_dir, task_index, since, until = task
+    if reports is None:
+        reports = make_reports(names, limit, spool_dir, task_index)
+    window = TimeWindow(since, until) if since or until else None
+    for line in iter_lines(log_file, start, end):
+        if window is not None and not window.accept(line):
+            if window.done:
+                break
+            continue
+        log_entry = parse_entry(line)
+        for report in reports:
+            report.feed(log_entry)
+    return reports
+
+
+def scan_range(task: tuple) -> List[Report]:
+    """Scan one byte range in a worker process."""
+    reports = scan(task)
+    for report in reports:
+        report.close()
+    return reports
+
+
+def plan_tasks(
+    log_files: List[Path],
+    jobs: int,
+    chunk_size: int = CHUNK_SIZE,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> List[tuple]:
+    """
+    Split the log files into (file, start, end) ranges, in log order.
+
+    With a time window, uncompressed files are narrowed by binary search
+    and compressed segments outside the window are skipped.
+    """
+    ranges = []
+    for log_file in log_files:
+        if is_compressed(log_file):
+            if since or until:
+                bounds = segment_bounds(log_file)
+                if bounds is None or (since and bounds[1] < since) or (until and bounds[0] > until):
+                    continue
+            ranges.append((log_file, 0, None))
+            continue
+
+        first = seek_time(log_file, since) if since else 0
+        last = seek_time(log_file, until + timedelta(microseconds=1)) if until else log_file.stat().st_size
+        if jobs <= 1 or last - first <= chunk_size:
+            ranges.append((log_file, first, last if until else None))
+            continue
+        for start in range(first, last, chunk_size):
+            ranges.append((log_file, start, min(start + chunk_size, last)))
+    return ranges
+
+
+def run_reports(
+    log_files: List[Path],
+    names: List[str],
+    limit: int = 100,
+    jobs: int = 1,
+    spool_dir: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> List[Report]:
+    """
+    Compute all requested reports in a single pass over the logs.
+
+    Args:
+        log_files: Log files and rotated segments, oldest first
+        names: Report names (keys of REPORTS)
+        limit: Entries kept for display per entry report
+        jobs: Worker processes scanning byte ranges in parallel
+        spool_dir: Directory spooling every extracted entry (for --output)
+        chunk_size: Byte range size of one task for large uncompressed files
+        since: Only records at or after this time
+        until: Only records at or before this time
+
+    Returns:
+        Merged reports, in the order of names
+    """
+    if not all(REPORTS[name].splittable for name in names):
+        jobs = 1
+
+    tasks = [
+        (log_file, start, end, names, limit, spool_dir, index, since, until)
+        for index, (log_file, start, end) in enumerate(
+            plan_tasks(log_files, jobs, chunk_size, since, until)
+        )
+    ]
+    if not tasks:
+        return make_reports(names, limit, None, 0)
+
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = pool.map(scan_range, tasks)
+            merged = next(results)
+            for reports in results:
+                for report, other in zip(merged, reports):
+                    report.merge(other)
+        return merged
+
+    # One set of reports carried through every file in order
+    reports = None
+    for task in tasks:
+        reports = scan(task, reports)
+    for report in reports:
+        report.close()
+    return reports
+
+
+def write_output(output_file: Path, reports: List[EntryReport]):
+    """Write extracted entries as JSON (an array, or an object per report)."""
+    with open(output_file, 'w') as f:
+        if len(reports) == 1:
+            reports[0].write_items(f)
+        else:
+            f.write("{")
+            for i, report in enumerate(reports):
+                f.write(("" if i == 0 else ",") + f"\n\"{report.name}\": ")
+                report.write_items(f)
+            f.write("\n}")
+    for report in reports:
+        print(f"Extracted {report.count} {report.name} logs to {output_file}")
+
+
+class ChromeTraceWriter(ToolCallTracker):
+    """
+    Streams tool calls and commands as Chrome trace events (JSON array).
+
+    Each tool call gets its own track with the call as the outer slice and
+    its commands nested inside; commands outside any call go to tracks of
+    their own. Complete ("X") slices on one track must nest, so a command
+    overlapping another one of the same call (or, outside calls, any other
+    command) is moved to an extra track. Events are written as soon as
+    their end record is read, so only calls and commands in flight are held
+    in memory. The file loads in Perfetto (ui.perfetto.dev) and
+    chrome://tracing.
+    """
+
+    PID = 1
+
+    def __init__(self, output_file: Path):
+        super().__init__()
+        self.events = 0
+        self._file = open(output_file, 'w')
+        self._file.write("[")
+        self._tracks = 0
+        # Tracks of each open call (None: commands outside calls), and the busy ones
+        self._lanes: Dict[Optional[int], List[int]] = {None: []}
+        self._busy: set = set()
+        self._metadata("process_name", 0, {"name": "kali-driver-mcp"})
+
+    def _write(self, event: dict):
+        self._file.write(("\n" if self.events == 0 else ",\n") + json.dumps(event))
+        self.events += 1
+
+    def _metadata(self, name: str, tid: int, args: dict):
+        self._write({"ph": "M", "name": name, "pid": self.PID, "tid": tid, "args": args})
+
+    def _new_track(self, name: str) -> int:
+        """Name a new track; tracks sort in the order they first appear."""
+        self._tracks += 1
+        self._metadata("thread_name", self._tracks, {"name": name})
+        self._metadata("thread_sort_index", self._tracks, {"sort_index": self._tracks})
+        return self._tracks
+
+    def _slice(self, name: str, category: str, tid: int, start: float, end: float, args: dict):
+        self._write({
+            "ph": "X",
+            "name": name,
+            "cat": category,
+            "pid": self.PID,
+            "tid": tid,
+            "ts": round(start * 1e6, 3),
+            "dur": round(max(0.0, end - start) * 1e6, 3),
+            "args": {key: value for key, value in args.items() if value is not None}
+        })
+
+    def call_started(self, call: ToolCall):
+        self._lanes[call.track] = [self._new_track(f"TOOL-{call.track} {call.name}")]
+
+    def command_started(self, command: CommandRun):
+        group = command.call.track if command.call is not None else None
+        lanes = self._lanes.setdefault(group, [])
+        free = [lane for lane in lanes if lane not in self._busy]
+        if free:
+            command.track = free[0]
+        elif group is None:
+            command.track = self._new_track(f"commands (no tool call) #{len(lanes) + 1}")
+        else:
+            command.track = self._new_track(f"TOOL-{group} concurrent #{len(lanes)}")
+        if not free:
+            lanes.append(command.track)
+        self._busy.add(command.track)
+
+    def command_done(self, command: CommandRun, incomplete: bool = False):
+        self._busy.discard(command.track)
+        self._slice(command_template(command.command), "command", command.track, command.start, command.end, {
+            "cmd_id": command.cmd_id,
+            "command": command.command,
+            "exit_code": command.exit_code,
+            "stdout_length": command.stdout_length,
+            "stderr_length": command.stderr_length,
+            "error": command.error,
+            "incomplete": incomplete or None
+        })
+
+    def call_done(self, call: ToolCall, incomplete: bool = False):
+        lanes = self._lanes.pop(call.track, [])
+        self._slice(call.name, "tool", lanes[0], call.start, call.end, {
+            "tool_id": call.tool_id,
+            "trace_id": call.trace_id,
+            "commands": len(call.commands),
+            "error": call.error,
+            "incomplete": incomplete or None
+        })
+
+    def close(self):
+        """Write what is still running at the end of the log, and finish the array."""
+        for command in self._open_commands.values():
+            command.end = max(command.start, self.last_time)
+            self.command_done(command, incomplete=True)
+        for call in self._open_tools.values():
+            call.end = max(call.start, self.last_time)
+            self.call_done(call, incomplete=True)
+        self._open_commands.clear()
+        self._open_tools.clear()
+        self._file.write("\n]\n")
+        self._file.close()
+
+
+def export_chrome_trace(
+    log_files: List[Path],
+    output_file: Path,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> int:
+    """
+    Convert tool and command records to a Chrome trace file.
+
+    Returns:
+        Number of trace events written
+    """
+    writer = ChromeTraceWriter(output_file)
+    try:
+        for log_file, start, end in plan_tasks(log_files, 1, since=since, until=until):
+            window = TimeWindow(since, until) if since or until else None
+            for line in iter_lines(log_file, start, end):
+                if window is not None and not window.accept(line):
+                    if window.done:
+                        break
+                    continue
+                writer.track(parse_entry(line))
+    finally:
+        writer.close()
+    return writer.events
+
+
+class LogTail:
+    """
+    Reads lines appended to a log file, following it across rotation.
+
+    Only new bytes are read. When the path is replaced (rotation) or
+    truncated, the rest of the old file is drained and the new file is read
+    from its start.
+    """
+
+    def __init__(self, log_file: Path, from_start: bool = False):
+        self.log_file = log_file
+        self._file = None
+        self._inode = None
+        self._partial = b""
+        self._open(from_start)
+
+    def _open(self, from_start: bool) -> bool:
+        try:
+            self._file = open(self.log_file, 'rb')
+        except FileNotFoundError:
+            self._file = None
+            return False
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        if not from_start:
+            self._file.seek(0, os.SEEK_END)
+        return True
+
+    def _replaced(self) -> bool:
+        """Check if the path now refers to a new or truncated file."""
+        try:
+            stat = self.log_file.stat()
+        except FileNotFoundError:
+            return False
+        return stat.st_ino != self._inode or stat.st_size < self._file.tell()
+
+    def read_lines(self) -> List[str]:
+        """Return the complete lines appended since the last call."""
+        if self._file is None and not self._open(from_start=True):
+            return []
+
+        data = self._file.read()
+        if self._replaced():
+            # Rotated: finish the old file, continue with the new one
+            data += self._file.read()
+            self._file.close()
+            if self._open(from_start=True):
+                data += self._file.read()
+
+        data = self._partial + data
+        *complete, self._partial = data.split(b"\n")
+        return [
+            line.decode('utf-8', errors='replace').strip()
+            for line in complete if line.strip()
+        ]
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+
+class LiveStats:
+    """Rolling tool and command metrics over the last ``window`` seconds."""
+
+    _TOOL_START_RE = re.compile(r"\[TOOL-(\d+)\] Invoking tool: (\S+)")
+    _TOOL_END_RE = re.compile(r"\[TOOL-(\d+)\] Tool \S+ (completed|failed)")
+
+    def __init__(self, window: float = 60.0):
+        self.window = window
+        self.tools_in_flight: dict = {}
+        # (arrival time, duration or None, failed)
+        self.commands: deque = deque()
+        self.total_commands = 0
+        self.total_errors = 0
+
+    def feed(self, log_entry: Optional[dict], now: float):
+        if not log_entry:
+            return
+        message = log_entry.get("message", "")
+
+        if "[TOOL-" in message:
+            match = self._TOOL_START_RE.search(message)
+            if match:
+                self.tools_in_flight[int(match.group(1))] = (match.group(2), now)
+                return
+            match = self._TOOL_END_RE.search(message)
+            if match:
+                self.tools_in_flight.pop(int(match.group(1)), None)
+            return
+
+        if "[CMD-" in message:
+            match = LatencyReport._END_RE.search(message)
+            if match:
+                failed = int(match.group(2)) != 0
+                self.commands.append((now, float(match.group(3)), failed))
+            elif LatencyReport._ERROR_RE.search(message):
+                failed = True
+                self.commands.append((now, None, failed))
+            else:
+                return
+            self.total_commands += 1
+            self.total_errors += failed
+
+    def _expire(self, now: float):
+        while self.commands and self.commands[0][0] < now - self.window:
+            self.commands.popleft()
+
+    def snapshot(self, now: float) -> dict:
+        """Current rolling metrics."""
+        self._expire(now)
+        durations = sorted(d for _, d, _ in self.commands if d is not None)
+        errors = sum(1 for _, _, failed in self.commands if failed)
+
+        def percentile(q):
+            if not durations:
+                return None
+            return durations[min(len(durations) - 1, max(0, math.ceil(q / 100 * len(durations)) - 1))]
+
+        return {
+            "tools_in_flight": [
+                (tool_id, name, now - started)
+                for tool_id, (name, started) in sorted(self.tools_in_flight.items())
+            ],
+            "commands_per_second": len(self.commands) / self.window,
+            "error_rate": errors / len(self.commands) if self.commands else 0.0,
+            "p50": percentile(50),
+            "p95": percentile(95),
+            "p99": percentile(99),
+            "total_commands": self.total_commands,
+            "total_errors": self.total_errors,
+        }
+
+
+def render_live(log_file: Path, snapshot: dict, window: float):
+    """Redraw the follow-mode dashboard."""
+    def seconds(value):
+        return f"{value:.3f}s" if value is not None else "-"
+
+    if sys.stdout.isatty():
+        print("\033[H\033[J", end="")
+    print(f"=== {log_file} (last {window:g}s, {datetime.now().strftime('%H:%M:%S')}) ===\n")
+    print(f"Commands/sec: {snapshot['commands_per_second']:.2f}")
+    print(f"Error rate:   {snapshot['error_rate']:.1%}")
+    print(f"Latency:      p50 {seconds(snapshot['p50'])}  p95 {seconds(snapshot['p95'])}  p99 {seconds(snapshot['p99'])}")
+    print(f"Totals:       {snapshot['total_commands']} commands, {snapshot['total_errors']} failed")
+    print(f"\nTools in flight ({len(snapshot['tools_in_flight'])}):")
+    for tool_id, name, running in snapshot["tools_in_flight"]:
+        print(f"  TOOL-{tool_id} {name} ({running:.1f}s)")
+    sys.stdout.flush()
+
+
+def follow(log_file: Path, interval: float = 1.0, window: float = 60.0):
+    """Tail a log file and keep the dashboard up to date until interrupted."""
+    tail = LogTail(log_file)
+    stats = LiveStats(window)
+    try:
+        while True:
+            now = time.monotonic()
+            for line in tail.read_lines():
+                stats.feed(parse_entry(line), now)
+            render_live(log_file, stats.snapshot(now), window)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        tail.close()
+
+
+def rotated_segments(log_file: Path) -> List[Path]:
+    """Rotated segments of a log file, oldest first."""
+    segments = [
+        path for path in log_file.parent.glob(f"{log_file.name}.*")
+        if SEGMENT_RE.fullmatch(path.name[len(log_file.name):])
+    ]
+    return sorted(segments, key=lambda path: path.stat().st_mtime)
+
+
+def db_window(args, time_column: str) -> tuple:
+    """Conditions for --since/--until (database times are UTC epoch seconds)."""
+    clauses, params = [], []
+    if args.since:
+        clauses.append(f"{time_column} >= ?")
+        params.append(utc_epoch(args.since))
+    if args.until:
+        clauses.append(f"{time_column} <= ?")
+        params.append(utc_epoch(args.until))
+    return clauses, params
 
-            # Count by level
-            level = log_entry.get("level", "UNKNOWN")
-            stats["levels"][level] = stats["levels"].get(level, 0) + 1
 
-            # Count errors and warnings
-            if level == "ERROR":
-                stats["errors"] += 1
-            elif level == "WARNING":
-                stats["warnings"] += 1
+def db_where(args, failed_column: str, name_column: Optional[str] = None, time_column: str = "started_at"):
+    """Build the WHERE clause for --failed, --min-duration, --tool and the time window."""
+    clauses, params = db_window(args, time_column)
+    if args.failed:
+        clauses.append(failed_column)
+    if args.min_duration is not None:
+        clauses.append("duration >= ?")
+        params.append(args.min_duration)
+    if args.tool and name_column:
+        clauses.append(f"{name_column} = ?")
+        params.append(args.tool)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
 
-            # Count commands and tools
-            message = log_entry.get("message", "")
-            if "[CMD-" in message:
-                stats["commands"] += 1
-            if "[TOOL-" in message:
-                stats["tools"] += 1
+
+def db_rows(db: sqlite3.Connection, query: str, params=()) -> list:
+    """Run a query and return rows as dictionaries."""
+    cursor = db.execute(query, params)
+    columns = [c[0] for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor]
+
+
+def utc_epoch(value: datetime) -> float:
+    """Epoch seconds of a naive UTC datetime."""
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+def format_time(value: Optional[float]) -> str:
+    """Format an epoch timestamp from the database."""
+    return datetime.utcfromtimestamp(value).isoformat() + "Z" if value else "N/A"
+
+
+def db_stats(db: sqlite3.Connection, args):
+    """Show statistics from the SQLite log database."""
+    clauses, params = db_window(args, "started_at")
+    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    error_clauses, error_params = db_window(args, "time")
+    error_where = (" WHERE " + " AND ".join(error_clauses)) if error_clauses else ""
+
+    tools = db_rows(db, f"SELECT COUNT(*) AS n, SUM(success = 0) AS failed FROM tools{where}", params)[0]
+    commands = db_rows(
+        db,
+        f"SELECT COUNT(*) AS n, SUM(exit_code != 0 OR error IS NOT NULL) AS failed FROM commands{where}",
+        params
+    )[0]
+    errors = db_rows(db, f"SELECT COUNT(*) AS n FROM errors{error_where}", error_params)[0]
 
     print("\n=== Log Statistics ===\n")
-    print(f"Total Lines: {stats['total_lines']}")
-    print(f"Commands: {stats['commands']}")
-    print(f"Tools: {stats['tools']}")
-    print(f"Errors: {stats['errors']}")
-    print(f"Warnings: {stats['warnings']}")
-    print("\nBy Level:")
-    for level, count in sorted(stats["levels"].items()):
-        print(f"  {level}: {count}")
+    print(f"Commands: {commands['n']} ({commands['failed'] or 0} failed)")
+    print(f"Tools: {tools['n']} ({tools['failed'] or 0} failed)")
+    print(f"Errors: {errors['n']}")
+    print("\nBy Tool:")
+    for row in db_rows(db, (
+        "SELECT tool_name, COUNT(*) AS calls, ROUND(AVG(duration), 3) AS avg_duration,"
+        f" ROUND(MAX(duration), 3) AS max_duration FROM tools{where} GROUP BY tool_name ORDER BY calls DESC"
+    ), params):
+        print(f"  {row['tool_name']}: {row['calls']} calls, avg {row['avg_duration']}s, max {row['max_duration']}s")
+
+
+def db_commands(db: sqlite3.Connection, args):
+    """Show SSH commands from the SQLite log database."""
+    where, params = db_where(args, "(exit_code != 0 OR error IS NOT NULL)")
+    commands = db_rows(
+        db,
+        f"SELECT * FROM commands{where} ORDER BY started_at DESC LIMIT ?",
+        (*params, args.limit)
+    )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(commands, f, indent=2)
+        print(f"Extracted {len(commands)} commands to {args.output}")
+        return
+
+    print(f"\n=== SSH Commands ({len(commands)} entries, newest first) ===\n")
+    for cmd in commands:
+        print(f"[{format_time(cmd['started_at'])}] CMD-{cmd['cmd_id']}: {cmd['command'][:80]}")
+        if cmd['exit_code'] is not None:
+            print(f"  Exit Code: {cmd['exit_code']}")
+        if cmd['duration'] is not None:
+            print(f"  Duration: {cmd['duration']:.3f}s")
+        if cmd['error']:
+            print(f"  Error: {cmd['error']}")
+        print()
+
+
+def db_tools(db: sqlite3.Connection, args):
+    """Show MCP tool calls from the SQLite log database."""
+    where, params = db_where(args, "success = 0", "tool_name")
+    tools = db_rows(
+        db,
+        f"SELECT * FROM tools{where} ORDER BY started_at DESC LIMIT ?",
+        (*params, args.limit)
+    )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(tools, f, indent=2)
+        print(f"Extracted {len(tools)} tool calls to {args.output}")
+        return
+
+    print(f"\n=== MCP Tools ({len(tools)} entries, newest first) ===\n")
+    for tool in tools:
+        print(f"[{format_time(tool['started_at'])}] TOOL-{tool['tool_id']}: {tool['tool_name']}")
+        print(f"  Arguments: {tool['arguments']}")
+        if tool['duration'] is not None:
+            print(f"  Duration: {tool['duration']:.3f}s")
+        if tool['error']:
+            print(f"  Error: {tool['error']}")
+        print()
+
+
+def db_errors(db: sqlite3.Connection, args):
+    """Show errors from the SQLite log database."""
+    clauses, params = db_window(args, "time")
+    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    errors = db_rows(db, f"SELECT * FROM errors{where} ORDER BY time DESC LIMIT ?", (*params, args.limit))
+
+    print(f"\n=== Errors ({len(errors)} entries, newest first) ===\n")
+    for error in errors:
+        print(f"[{format_time(error['time'])}] {error['message']}")
+        if error['exception_type']:
+            print(f"  Exception: {error['exception_type']} - {error['exception_message']}")
+        print()
+
+
+def db_latency(db: sqlite3.Connection, args):
+    """Show per-template command latency from the SQLite log database."""
+    report = LatencyReport(args.limit)
+    where, params = db_where(args, "(exit_code != 0 OR error IS NOT NULL)")
+    cursor = db.execute(
+        f"SELECT template, duration, exit_code, error FROM commands{where}",
+        params
+    )
+    for template, duration, exit_code, error in cursor:
+        report.add(template, duration, bool(exit_code) or error is not None)
+    report.render()
+
+
+def analyze_db(args):
+    """Answer queries from the SQLite log database."""
+    db = sqlite3.connect(f"file:{args.logfile[0]}?mode=ro", uri=True)
+    try:
+        if args.stats:
+            db_stats(db, args)
+        if args.commands:
+            db_commands(db, args)
+        if args.tools:
+            db_tools(db, args)
+        if args.errors:
+            db_errors(db, args)
+        if args.latency:
+            db_latency(db, args)
+    finally:
+        db.close()
 
 
 def main():
@@ -247,7 +1564,19 @@ def main():
     parser.add_argument(
         "logfile",
         type=Path,
-        help="Path to log file"
+        nargs="+",
+        help="Log files or rotated segments, oldest first (or a SQLite log database with --db)"
+    )
+    parser.add_argument(
+        "--rotated",
+        action="store_true",
+        help="Also read the rotated segments of each log file"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for scanning large logs (default: CPU count)"
     )
     parser.add_argument(
         "--commands",
@@ -269,33 +1598,167 @@ def main():
         action="store_true",
         help="Show statistics"
     )
+    parser.add_argument(
+        "--latency",
+        action="store_true",
+        help="Show duration percentiles per normalized command template"
+    )
+    parser.add_argument(
+        "--critical-path",
+        action="store_true",
+        help="Break tool call wall time into remote execution and host overhead, with parallelization/batching savings"
+    )
+    parser.add_argument(
+        "--chrome-trace",
+        type=Path,
+        metavar="FILE",
+        help="Write tool calls and their commands as Chrome trace JSON (open in Perfetto)"
+    )
     parser.add_argument(
         "--output",
         type=Path,
         help="Output file for extracted logs (JSON format)"
     )
+    parser.add_argument(
+        "--show-output",
+        type=int,
+        metavar="CMD_ID",
+        help="Print the full stdout/stderr of a command (loads output blobs)"
+    )
+    parser.add_argument(
+        "--blobs",
+        type=Path,
+        help="Output blob directory (default: 'blobs' next to the log file)"
+    )
+    parser.add_argument(
+        "--since",
+        type=parse_time,
+        metavar="TIME",
+        help="Only records at or after TIME (ISO date/time, or HH:MM[:SS] today; log clock, "
+             "UTC for JSON logs and --db)"
+    )
+    parser.add_argument(
+        "--until",
+        type=parse_time,
+        metavar="TIME",
+        help="Only records at or before TIME"
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Tail the log file (across rotation) and show live rolling metrics"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Seconds between dashboard updates with --follow (default: 1)"
+    )
+    parser.add_argument(
+        "--window",
+        type=float,
+        default=60.0,
+        help="Rolling window in seconds for --follow metrics (default: 60)"
+    )
+    parser.add_argument(
+        "--db",
+        action="store_true",
+        help="Read the SQLite log database (logging.db_file) instead of a log file"
+    )
+    parser.add_argument(
+        "--failed",
+        action="store_true",
+        help="Only failed commands/tools (--db only)"
+    )
+    parser.add_argument(
+        "--min-duration",
+        type=float,
+        metavar="SECONDS",
+        help="Only commands/tools running at least this long (--db only)"
+    )
+    parser.add_argument(
+        "--tool",
+        help="Only calls of this tool (--db only)"
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=100,
+        help="Maximum entries shown per report (default: 100)"
+    )
 
     args = parser.parse_args()
 
-    if not args.logfile.exists():
-        print(f"Error: Log file not found: {args.logfile}")
-        sys.exit(1)
+    # Options one source does not implement are errors, not partial output
+    if args.db:
+        unsupported = [flag for flag, used in (
+            ("--follow", args.follow),
+            ("--rotated", args.rotated),
+            ("--show-output", args.show_output is not None),
+            ("--critical-path", args.critical_path),
+            ("--chrome-trace", args.chrome_trace is not None),
+        ) if used]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} cannot be used with --db")
+    else:
+        db_only = [flag for flag, used in (
+            ("--failed", args.failed),
+            ("--min-duration", args.min_duration is not None),
+            ("--tool", args.tool is not None),
+        ) if used]
+        if db_only:
+            parser.error(f"{', '.join(db_only)} requires --db")
+
+    if args.follow:
+        # The file may not exist yet when started next to a fresh server
+        follow(args.logfile[-1], args.interval, args.window)
+        return
+
+    log_files = []
+    for log_file in args.logfile:
+        if not log_file.exists():
+            print(f"Error: Log file not found: {log_file}")
+            sys.exit(1)
+        if args.rotated:
+            log_files.extend(rotated_segments(log_file))
+        log_files.append(log_file)
+
+    if args.show_output is not None:
+        show_output(log_files, args.show_output, args.blobs or log_files[-1].parent / "blobs")
+        return
+
+    if args.chrome_trace:
+        events = export_chrome_trace(log_files, args.chrome_trace, args.since, args.until)
+        print(f"Wrote {events} trace events to {args.chrome_trace}")
+        return
 
     # If no specific filter, show stats
-    if not (args.commands or args.tools or args.errors or args.stats):
+    if not (args.commands or args.tools or args.errors or args.stats or args.latency or args.critical_path):
         args.stats = True
 
-    if args.stats:
-        show_stats(args.logfile)
-
-    if args.commands:
-        filter_commands(args.logfile, args.output)
+    if args.db:
+        analyze_db(args)
+        return
 
-    if args.tools:
-        filter_tools(args.logfile, args.output)
+    # All requested reports come from a single scan
+    names = [name for name in REPORTS if getattr(args, name)]
+    with tempfile.TemporaryDirectory(prefix="analyze-logs-") as spool_dir:
+        reports = run_reports(
+            log_files,
+            names,
+            limit=args.limit,
+            jobs=args.jobs,
+            spool_dir=spool_dir if args.output else None,
+            since=args.since,
+            until=args.until
+        )
 
-    if args.errors:
-        filter_errors(args.logfile)
+        extracted = [report for report in reports if isinstance(report, EntryReport)]
+        for report in reports:
+            if not (args.output and report in extracted):
+                report.render()
+        if args.output and extracted:
+            write_output(args.output, extracted)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+"""Admission control for tool calls.
+
+Bounds how many tool calls run against the VM at once, globally and per
+tool. Calls over the limit wait in a bounded FIFO queue until a slot frees
+up or their queue deadline passes; when the queue is full they are rejected
+immediately with a retry-after hint so bursts degrade into back-pressure
+instead of piling SSH channels onto the VM.
+
+Tools that spend their time waiting idle (remote watchers, hotplug event
+waits) do not take global slots; they are bounded by their own per-tool
+limit only, so a few watchers cannot starve real VM work.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from .metrics import get_metrics_registry
+
+# Weight of the newest call in the running average of slot hold times
+_HOLD_TIME_SMOOTHING = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Raised when a tool call cannot be admitted."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Global and per-tool concurrency limits with a bounded wait queue."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        tool_limits: Optional[Dict[str, int]] = None,
+        max_queue: int = 32,
+        queue_timeout: float = 30,
+        wait_tools: Optional[Dict[str, int]] = None
+    ):
+        self.max_concurrent = max_concurrent
+        self.wait_tools = wait_tools or {}
+        # Waiting tools default to their own limit; explicit tool limits win
+        self.tool_limits = {**self.wait_tools, **(tool_limits or {})}
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.metrics = get_metrics_registry()
+        self.active = 0
+        self._active_by_tool: Dict[str, int] = {}
+        self._waiters: Deque[Tuple[str, "asyncio.Future"]] = deque()
+        self._started: Dict[str, Deque[float]] = {}
+        self._avg_hold = 1.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for a slot."""
+        return len(self._waiters)
+
+    def _has_capacity(self, tool_name: str) -> bool:
+        """Check if a call of this tool may start now."""
+        if tool_name not in self.wait_tools and self.active >= self.max_concurrent:
+            return False
+        limit = self.tool_limits.get(tool_name)
+        return limit is None or self._active_by_tool.get(tool_name, 0) < limit
+
+    def _start(self, tool_name: str):
+        """Take a slot for a tool call."""
+        if tool_name not in self.wait_tools:
+            self.active += 1
+        self._active_by_tool[tool_name] = self._active_by_tool.get(tool_name, 0) + 1
+        self._started.setdefault(tool_name, deque()).append(time.monotonic())
+        self.metrics.set_gauge("admission_active", self.active)
+
+    def retry_after(self) -> float:
+        """Estimate seconds until a new call would likely be admitted."""
+        backlog = self.queue_depth + 1
+        return max(1, math.ceil(self._avg_hold * backlog / self.max_concurrent))
+
+    async def acquire(self, tool_name: str):
+        """
+        Wait for a slot for a tool call.
+
+        Args:
+            tool_name: Name of the tool being called
+
+        Raises:
+            AdmissionRejected: If the queue is full or the queue deadline passed
+        """
+        wait_start = time.monotonic()
+
+        if self._has_capacity(tool_name):
+            # Anyone still queued is blocked by a limit this call is not
+            self._start(tool_name)
+            self.metrics.observe("admission_wait_seconds", 0.0, tool=tool_name)
+            return
+
+        if self.queue_depth >= self.max_queue:
+            self.metrics.inc("admission_rejected_total", tool=tool_name, reason="queue_full")
+            raise AdmissionRejected(
+                f"Server busy: {self.active} tool calls running and {self.queue_depth} queued",
+                self.retry_after()
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (tool_name, waiter)
+        self._waiters.append(entry)
+        self.metrics.set_gauge("admission_queue_depth", self.queue_depth)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                self._abandon(entry)
+                self.metrics.inc("admission_rejected_total", tool=tool_name, reason="timeout")
+                raise AdmissionRejected(
+                    f"Timed out after {self.queue_timeout}s waiting for a free slot",
+                    self.retry_after()
+                )
+            # The slot was granted just as the deadline passed
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release(tool_name)
+            else:
+                self._abandon(entry)
+            raise
+
+        self.metrics.observe("admission_wait_seconds", time.monotonic() - wait_start, tool=tool_name)
+
+    def release(self, tool_name: str):
+        """
+        Free the slot of a finished tool call and admit queued calls.
+
+        Args:
+            tool_name: Name of the tool that finished
+        """
+        self._active_by_tool[tool_name] -= 1
+        started = self._started[tool_name].popleft()
+        if tool_name not in self.wait_tools:
+            self.active -= 1
+            held = time.monotonic() - started
+            self._avg_hold += _HOLD_TIME_SMOOTHING * (held - self._avg_hold)
+
+        # Grant slots in FIFO order, skipping calls blocked by a per-tool limit
+        for entry in list(self._waiters):
+            waiting_tool, waiter = entry
+            if not self._has_capacity(waiting_tool):
+                continue
+            self._waiters.remove(entry)
+            self._start(waiting_tool)
+            waiter.set_result(None)
+
+        self.metrics.set_gauge("admission_active", self.active)
+        self.metrics.set_gauge("admission_queue_depth", self.queue_depth)
+
+    def _abandon(self, entry: Tuple[str, "asyncio.Future"]):
+        """Remove a call that stopped waiting from the queue."""
+        entry[1].cancel()
+        self._waiters.remove(entry)
+        self.metrics.set_gauge("admission_queue_depth", self.queue_depth)
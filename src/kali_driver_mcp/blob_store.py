@@ -0,0 +1,142 @@
+"""Content-addressed store for large command outputs.
+
+Command logs used to embed the complete stdout and stderr of every command,
+so the same multi-MB ``lsmod``, ``dmesg`` or build output was repeated across
+the log. Outputs above a size threshold are now written once, gzip-compressed,
+to ``<dir>/<sha256[:2]>/<sha256>.gz`` and log records carry only a reference
+(digest, size and a short preview). Identical outputs share one blob.
+
+Hashing happens in the logging thread (the digest goes into the record);
+compression and the file write run on a background thread.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Set
+
+from .metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+def blob_path(directory: str, digest: str) -> str:
+    """Path of a blob inside a store directory."""
+    return os.path.join(directory, digest[:2], f"{digest}.gz")
+
+
+class BlobStore:
+    """Hash-addressed, compressed output blobs."""
+
+    def __init__(self):
+        self.directory: Optional[str] = None
+        self.min_size = 1024
+        self.preview_chars = 200
+        self.metrics = get_metrics_registry()
+        self._known: Set[str] = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def configure(self, directory: Optional[str], min_size: int = 1024, preview_chars: int = 200):
+        """
+        Enable or disable the store.
+
+        Args:
+            directory: Blob directory, or None to keep outputs inline
+            min_size: Outputs shorter than this (in bytes) stay inline
+            preview_chars: Characters of the output kept in the log record
+        """
+        self.close()
+        self.directory = directory
+        self.min_size = min_size
+        self.preview_chars = preview_chars
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="blob-writer")
+
+    def put(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Store an output.
+
+        Args:
+            text: Command output
+
+        Returns:
+            Reference with ``sha256``, ``size`` and ``preview``, or None when
+            the store is disabled or the output is small enough to log inline
+        """
+        if not self.enabled:
+            return None
+        data = text.encode("utf-8", errors="replace")
+        if len(data) < self.min_size:
+            return None
+
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            new = digest not in self._known
+            self._known.add(digest)
+        if new:
+            self._executor.submit(self._write, digest, data)
+        self.metrics.inc("log_blobs_total", result="written" if new else "deduplicated")
+
+        return {
+            "sha256": digest,
+            "size": len(data),
+            "preview": text[:self.preview_chars]
+        }
+
+    def _write(self, digest: str, data: bytes):
+        """Compress and write a blob unless it is already on disk."""
+        path = blob_path(self.directory, digest)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file so readers never see a partial blob
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(tmp, path)
+            self.metrics.inc("log_blob_bytes_total", len(data))
+        except OSError as e:
+            logger.warning(f"Failed to write output blob {digest}: {e}")
+            with self._lock:
+                self._known.discard(digest)
+
+    def get(self, digest: str) -> str:
+        """
+        Read a stored output.
+
+        Raises:
+            FileNotFoundError: If the blob does not exist (yet)
+        """
+        with gzip.open(blob_path(self.directory, digest), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def flush(self):
+        """Wait for queued blob writes."""
+        if self._executor is not None:
+            self._executor.submit(lambda: None).result()
+
+    def close(self):
+        """Finish queued writes and stop the writer thread."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Process-wide store shared by command loggers
+_store = BlobStore()
+
+
+def get_blob_store() -> BlobStore:
+    """Get the process-wide blob store."""
+    return _store
@@ -0,0 +1,175 @@
+"""Prefetched and short-lived cache of read-only tool results.
+
+The startup warm-up prefetches kernel info, the interface inventory and the
+module list so the first real tool call is served hot. A prefetched result
+is served once, to the first matching call; later calls read the VM again
+unless a result TTL is configured. Concurrent callers of the same entry
+share one in-flight fetch.
+
+Tools that change VM state invalidate everything when they start and again
+when they finish, and results fetched while a change was in progress are
+never stored.
+"""
+
+import asyncio
+import copy
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Seconds an unused prefetched result stays servable
+PREFETCH_MAX_AGE = 30.0
+
+# Tools whose results may be cached, with the operations that are read-only
+# (None means every call of the tool is read-only)
+CACHEABLE_TOOLS = {
+    "kernel_info": None,
+    "network_info": None,
+    "driver_load": {"list", "info"}
+}
+
+# Tools that change (or may change) modules or interfaces on the VM
+INVALIDATING_TOOLS = {"driver_load", "network_monitor", "driver_pipeline", "execute_command"}
+
+
+def is_cacheable(tool_name: str, params: Optional[Dict[str, Any]] = None) -> bool:
+    """Check whether a tool call only reads VM state that may be reused."""
+    if tool_name not in CACHEABLE_TOOLS:
+        return False
+    params = params or {}
+    if tool_name == "network_info":
+        # Interface counters change on every read
+        return params.get("info_type") != "stats" and params.get("detail_level") != "statistics"
+    operations = CACHEABLE_TOOLS[tool_name]
+    return operations is None or params.get("operation") in operations
+
+
+class _Entry:
+    """A cached (or in-flight) tool result."""
+
+    def __init__(self, future: "asyncio.Future", generation: int, prefetched: bool):
+        self.future = future
+        self.generation = generation
+        # Served to one call only
+        self.prefetched = prefetched
+        self.expires_at: Optional[float] = None
+
+
+class ResultCache:
+    """Tool results keyed by tool name and parameters."""
+
+    def __init__(self, ttl: float, prefetch_max_age: float = PREFETCH_MAX_AGE):
+        self.ttl = ttl
+        self.prefetch_max_age = prefetch_max_age
+        self._entries: Dict[str, _Entry] = {}
+        # Bumped by every invalidation; fetches from an older generation are not stored
+        self._generation = 0
+        self._mutations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Check if results are kept for later calls (beyond prefetches)."""
+        return self.ttl > 0
+
+    @staticmethod
+    def key(tool_name: str, params: Dict[str, Any]) -> str:
+        """Build the cache key for a tool and its resolved parameters."""
+        return f"{tool_name}:{json.dumps(params, sort_keys=True, default=str)}"
+
+    async def get_or_fetch(
+        self,
+        tool_name: str,
+        params: Dict[str, Any],
+        fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Return a cached or prefetched result, or fetch a new one.
+
+        Args:
+            tool_name: Name of the tool
+            params: Resolved tool parameters
+            fetch: Coroutine factory producing the full tool result
+
+        Returns:
+            Tuple of (result copy, whether it came from the cache)
+        """
+        key = self.key(tool_name, params)
+        entry = self._entries.get(key)
+        if self._is_live(entry):
+            if entry.prefetched:
+                del self._entries[key]
+            # Fresh or still being fetched (e.g. by the warm-up)
+            result = await asyncio.shield(entry.future)
+            return copy.deepcopy(result), True
+
+        if not self.enabled or self._mutations:
+            return await fetch(), False
+
+        entry = self._start(key, fetch, prefetched=False)
+        result = await asyncio.shield(entry.future)
+        return copy.deepcopy(result), False
+
+    async def prefetch(
+        self,
+        tool_name: str,
+        params: Dict[str, Any],
+        fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Fetch a result for the next call with the same parameters.
+
+        Returns:
+            The fetched result
+        """
+        entry = self._start(self.key(tool_name, params), fetch, prefetched=True)
+        return await asyncio.shield(entry.future)
+
+    def has(self, tool_name: str, params: Dict[str, Any]) -> bool:
+        """Check if a fresh or in-flight result exists."""
+        return self._is_live(self._entries.get(self.key(tool_name, params)))
+
+    def invalidate(self):
+        """Drop every cached result, including fetches still in flight."""
+        self._generation += 1
+        self._entries.clear()
+
+    def begin_mutation(self):
+        """Invalidate before a tool that changes VM state runs."""
+        self._mutations += 1
+        self.invalidate()
+
+    def end_mutation(self):
+        """Invalidate again once it finished, dropping reads that overlapped it."""
+        self._mutations -= 1
+        self.invalidate()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _start(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]], prefetched: bool) -> _Entry:
+        """Start a fetch and register it as the entry for key."""
+        entry = _Entry(asyncio.ensure_future(fetch()), self._generation, prefetched)
+        entry.future.add_done_callback(lambda future: self._settle(key, entry))
+        self._entries[key] = entry
+        return entry
+
+    @staticmethod
+    def _is_live(entry: Optional[_Entry]) -> bool:
+        """Check if an entry is still being fetched or has not expired."""
+        return entry is not None and (entry.expires_at is None or entry.expires_at > time.monotonic())
+
+    def _settle(self, key: str, entry: _Entry):
+        """Start the TTL of a finished fetch, dropping failures and stale reads."""
+        future = entry.future
+        failed = (
+            future.cancelled()
+            or future.exception() is not None
+            or future.result().get("success") is False
+            or "error" in future.result()
+            or future.result().get("deadline_exceeded")
+        )
+        if not failed and entry.generation == self._generation:
+            entry.expires_at = time.monotonic() + (self.prefetch_max_age if entry.prefetched else self.ttl)
+        elif self._entries.get(key) is entry:
+            # Never serve failures, partial results or reads overlapping a change
+            del self._entries[key]
@@ -1,6 +1,7 @@
 """Configuration loading and validation."""
 
 import os
+import re
 from pathlib import Path
 from typing import Any, Optional
 import yaml
@@ -95,6 +96,33 @@ class CaptureConfig:
             raise ConfigError("capture.output_format must be 'pcap', 'csv', or 'pcap,csv'")
 
 
+class CommandLogPolicyConfig:
+    """Command output logging policy configuration."""
+
+    def __init__(self, data: dict):
+        self.slow_threshold: float = data.get("slow_threshold", 5.0)
+        self.success: str = data.get("success", "full")
+        self.sample_every: int = data.get("sample_every", 10)
+        self.rules: list = data.get("rules", [])
+
+        modes = ("full", "metadata", "sample")
+        if self.success not in modes:
+            raise ConfigError("logging.command_policy.success must be 'full', 'metadata' or 'sample'")
+        if self.sample_every < 1:
+            raise ConfigError("logging.command_policy.sample_every must be at least 1")
+        for rule in self.rules:
+            if "match" not in rule:
+                raise ConfigError("logging.command_policy.rules entries need a 'match' pattern")
+            try:
+                re.compile(rule["match"])
+            except re.error as e:
+                raise ConfigError(f"Invalid logging.command_policy pattern {rule['match']!r}: {e}")
+            if rule.get("success", "metadata") not in modes:
+                raise ConfigError("logging.command_policy.rules success must be 'full', 'metadata' or 'sample'")
+            if rule.get("sample_every", 1) < 1:
+                raise ConfigError("logging.command_policy.rules sample_every must be at least 1")
+
+
 class LoggingConfig:
     """Logging configuration."""
 
@@ -110,11 +138,176 @@ class LoggingConfig:
         self.enable_console: bool = data.get("enable_console", True)
         self.log_commands: bool = data.get("log_commands", True)
         self.log_tools: bool = data.get("log_tools", True)
+        self.queue_size: int = data.get("queue_size", 10000)
+        self.queue_overflow: str = data.get("queue_overflow", "drop")
+        self.blobs: bool = data.get("blobs", True)
+        self.blob_dir: Optional[str] = data.get("blob_dir")
+        self.blob_min_size: int = data.get("blob_min_size", 1024)
+        self.max_bytes: int = data.get("max_bytes", 100 * 1024 * 1024)
+        self.max_age_hours: float = data.get("max_age_hours", 24)
+        self.backup_count: int = data.get("backup_count", 14)
+        self.compression: str = data.get("compression", "gzip")
+        self.command_policy = CommandLogPolicyConfig(data.get("command_policy", {}))
+        self.db_file: Optional[str] = data.get("db_file")
+
+        if self.queue_size < 0:
+            raise ConfigError("logging.queue_size must not be negative")
+        if self.queue_overflow not in ("drop", "block"):
+            raise ConfigError("logging.queue_overflow must be 'drop' or 'block'")
+        if self.compression not in ("gzip", "zstd", "none"):
+            raise ConfigError("logging.compression must be 'gzip', 'zstd' or 'none'")
 
         # Expand log file path if provided
         if self.file:
             self.file = os.path.expanduser(self.file)
 
+        if self.db_file:
+            self.db_file = os.path.expanduser(self.db_file)
+
+        # Output blobs live next to the log file unless placed elsewhere
+        if self.blob_dir:
+            self.blob_dir = os.path.expanduser(self.blob_dir)
+        elif self.file:
+            self.blob_dir = os.path.join(os.path.dirname(self.file), "blobs")
+        if not self.blobs:
+            self.blob_dir = None
+
+
+class HotplugConfig:
+    """udev hotplug monitor configuration."""
+
+    def __init__(self, data: dict):
+        self.autostart: bool = data.get("autostart", False)
+        self.subsystems: list = data.get("subsystems", ["usb", "net"])
+        self.max_events: int = data.get("max_events", 1000)
+
+        if not self.subsystems:
+            raise ConfigError("hotplug.subsystems must not be empty")
+
+
+# Data the startup warm-up can prefetch
+WARMUP_PREFETCH_TARGETS = ("kernel_info", "interfaces", "modules")
+
+
+class WarmupConfig:
+    """Startup warm-up and result cache configuration."""
+
+    def __init__(self, data: dict):
+        self.enabled: bool = data.get("enabled", True)
+        self.pre_elevate: bool = data.get("pre_elevate", True)
+        self.prefetch: list = data.get("prefetch", list(WARMUP_PREFETCH_TARGETS))
+        self.cache_ttl: float = data.get("cache_ttl", 0)
+
+        unknown = [p for p in self.prefetch if p not in WARMUP_PREFETCH_TARGETS]
+        if unknown:
+            raise ConfigError(f"Unknown warmup.prefetch targets: {', '.join(unknown)}")
+        if self.cache_ttl < 0:
+            raise ConfigError("warmup.cache_ttl must not be negative")
+
+
+class AdmissionConfig:
+    """Tool call admission control configuration."""
+
+    def __init__(self, data: dict):
+        self.max_concurrent: int = data.get("max_concurrent", 8)
+        self.tool_limits: dict = data.get("tool_limits", {})
+        self.max_queue: int = data.get("max_queue", 32)
+        self.queue_timeout: float = data.get("queue_timeout", 30)
+        # Mostly idle tools, outside the global limit with their own limit
+        self.wait_tools: dict = data.get("wait_tools", {"wait_condition": 4, "hotplug_events": 4})
+
+        if self.max_concurrent < 1:
+            raise ConfigError("admission.max_concurrent must be at least 1")
+        if self.max_queue < 0:
+            raise ConfigError("admission.max_queue must not be negative")
+        for tool_name, limit in self.tool_limits.items():
+            if limit < 1:
+                raise ConfigError(f"admission.tool_limits.{tool_name} must be at least 1")
+        for tool_name, limit in self.wait_tools.items():
+            if limit < 1:
+                raise ConfigError(f"admission.wait_tools.{tool_name} must be at least 1")
+
+
+class DeadlineConfig:
+    """Per-tool-call deadline configuration."""
+
+    def __init__(self, data: dict):
+        self.default: Optional[float] = data.get("default")
+        self.tools: dict = data.get("tools", {})
+
+        for name, seconds in [("default", self.default), *self.tools.items()]:
+            if seconds is not None and seconds <= 0:
+                raise ConfigError(f"deadline.{name} must be positive")
+
+    def for_tool(self, tool_name: str) -> Optional[float]:
+        """Return the deadline in seconds for a tool, or None for no deadline."""
+        return self.tools.get(tool_name, self.default)
+
+
+class ProfilingConfig:
+    """Tool call profiling configuration."""
+
+    def __init__(self, data: dict):
+        self.enabled: bool = data.get("enabled", False)
+        self.tools: list = data.get("tools", [])
+        self.mode: str = data.get("mode", "sampling")
+        self.output_dir: str = os.path.expanduser(data.get("output_dir", "~/.kali-driver-mcp/profiles"))
+        self.sample_interval: float = data.get("sample_interval", 0.005)
+
+        if self.mode not in ["cprofile", "sampling", "both"]:
+            raise ConfigError("profiling.mode must be 'cprofile', 'sampling', or 'both'")
+        if self.sample_interval <= 0:
+            raise ConfigError("profiling.sample_interval must be positive")
+
+
+class LoopMonitorConfig:
+    """Event loop lag monitor configuration."""
+
+    def __init__(self, data: dict):
+        self.enabled: bool = data.get("enabled", True)
+        self.interval: float = data.get("interval", 0.1)
+        self.slow_threshold: float = data.get("slow_threshold", 0.1)
+        self.max_events: int = data.get("max_events", 20)
+
+        if self.interval <= 0 or self.slow_threshold <= 0:
+            raise ConfigError("loop_monitor.interval and slow_threshold must be positive")
+
+
+class MemoryConfig:
+    """tracemalloc memory accounting configuration."""
+
+    def __init__(self, data: dict):
+        self.enabled: bool = data.get("enabled", False)
+        self.frames: int = data.get("frames", 1)
+
+        if self.frames < 1:
+            raise ConfigError("memory.frames must be at least 1")
+
+
+class TracingConfig:
+    """Trace span export configuration."""
+
+    def __init__(self, data: dict):
+        self.enabled: bool = data.get("enabled", False)
+        self.file: str = os.path.expanduser(data.get("file", "~/.kali-driver-mcp/traces.jsonl"))
+        self.service_name: str = data.get("service_name", "kali-driver-mcp")
+
+
+class MetricsConfig:
+    """Metrics collection configuration."""
+
+    def __init__(self, data: dict):
+        self.histogram_window: int = data.get("histogram_window", 1024)
+        self.prometheus_file: Optional[str] = data.get("prometheus_file")
+        self.prometheus_interval: int = data.get("prometheus_interval", 0)
+
+        if self.histogram_window < 1:
+            raise ConfigError("metrics.histogram_window must be at least 1")
+
+        # Expand Prometheus dump path if provided
+        if self.prometheus_file:
+            self.prometheus_file = os.path.expanduser(self.prometheus_file)
+
 
 class Config:
     """Main configuration object."""
@@ -150,6 +343,15 @@ class Config:
         self.network = NetworkConfig(data.get("network", {}))
         self.capture = CaptureConfig(data.get("capture", {}))
         self.logging = LoggingConfig(data.get("logging", {}))
+        self.metrics = MetricsConfig(data.get("metrics", {}))
+        self.hotplug = HotplugConfig(data.get("hotplug", {}))
+        self.warmup = WarmupConfig(data.get("warmup", {}))
+        self.admission = AdmissionConfig(data.get("admission", {}))
+        self.deadline = DeadlineConfig(data.get("deadline", {}))
+        self.profiling = ProfilingConfig(data.get("profiling", {}))
+        self.loop_monitor = LoopMonitorConfig(data.get("loop_monitor", {}))
+        self.memory = MemoryConfig(data.get("memory", {}))
+        self.tracing = TracingConfig(data.get("tracing", {}))
 
 
 def load_config(config_path: str = "config.yaml") -> Config:
@@ -0,0 +1,87 @@
+"""Per-tool-call deadlines.
+
+``call_tool`` starts a deadline for every call (from the ``deadline``
+argument or the configured default) and every remote step clamps its own
+timeout to the remaining budget. Once the budget is spent, further commands
+are not started; :meth:`SSHManager.execute` returns exit code 124 (like
+``timeout(1)``) instead of raising, so tools fall through to returning
+whatever they gathered so far.
+"""
+
+import contextvars
+import time
+from typing import Optional
+
+# Exit code reported for commands cut short (or skipped) by the deadline
+DEADLINE_EXIT_CODE = 124
+
+
+class _Budget:
+    """Deadline of one tool call."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.exceeded = False
+
+
+_current: contextvars.ContextVar[Optional[_Budget]] = contextvars.ContextVar(
+    "tool_call_deadline", default=None
+)
+
+
+def start(seconds: Optional[float]) -> contextvars.Token:
+    """
+    Start a deadline for the current tool call.
+
+    Args:
+        seconds: Budget in seconds, or None for no deadline
+
+    Returns:
+        Token to pass to :func:`reset` when the call finishes
+    """
+    return _current.set(_Budget(seconds) if seconds else None)
+
+
+def reset(token: contextvars.Token):
+    """Restore the deadline that was active before :func:`start`."""
+    _current.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current deadline, or None without a deadline."""
+    budget = _current.get()
+    if budget is None:
+        return None
+    return max(0.0, budget.expires_at - time.monotonic())
+
+
+def clamp_timeout(timeout: Optional[float]) -> Optional[float]:
+    """
+    Limit a step timeout to the remaining budget.
+
+    Args:
+        timeout: Timeout the step would use on its own (None for no timeout)
+
+    Returns:
+        The smaller of the timeout and the remaining budget
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if timeout is None:
+        return left
+    return min(timeout, left)
+
+
+def mark_exceeded():
+    """Record that the deadline cut a step short."""
+    budget = _current.get()
+    if budget is not None:
+        budget.exceeded = True
+
+
+def exceeded() -> bool:
+    """Check if the deadline cut any step of the current call short."""
+    budget = _current.get()
+    return budget is not None and budget.exceeded
@@ -0,0 +1,161 @@
+"""Delta responses relative to a previous tool call.
+
+A client passes ``since_token`` to a tool (an empty string on the first
+call). The server keeps the last result per client, tool and argument set,
+and when the token matches returns only what was added, removed or changed
+since that result, together with a new token.
+"""
+
+import json
+import secrets
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Maximum number of (client, tool, arguments) snapshots kept
+MAX_DELTA_SNAPSHOTS = 256
+
+# Arguments that do not change what a tool returns
+_IGNORED_ARGUMENTS = {"since_token", "deadline", "profile"}
+
+
+def diff_results(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute the difference between two tool results.
+
+    Lists are compared as multisets of entries, multi-line strings line by
+    line, dictionaries recursively and everything else by value.
+
+    Args:
+        old: Previous result
+        new: Current result
+
+    Returns:
+        Dictionary with "added", "removed" and "changed" entries
+    """
+    delta: Dict[str, Dict[str, Any]] = {"added": {}, "removed": {}, "changed": {}}
+
+    for key in new.keys() - old.keys():
+        delta["added"][key] = new[key]
+    for key in old.keys() - new.keys():
+        delta["removed"][key] = old[key]
+
+    for key in new.keys() & old.keys():
+        before, after = old[key], new[key]
+        if before == after:
+            continue
+
+        if isinstance(before, dict) and isinstance(after, dict):
+            nested = diff_results(before, after)
+            for part, values in nested.items():
+                if values:
+                    delta[part][key] = values
+
+        elif isinstance(before, list) and isinstance(after, list):
+            added, removed = _diff_entries(before, after)
+            if added:
+                delta["added"][key] = added
+            if removed:
+                delta["removed"][key] = removed
+
+        elif isinstance(before, str) and isinstance(after, str) and ("\n" in before or "\n" in after):
+            added, removed = _diff_entries(before.split("\n"), after.split("\n"))
+            if added:
+                delta["added"][key] = added
+            if removed:
+                delta["removed"][key] = removed
+
+        else:
+            delta["changed"][key] = after
+
+    return delta
+
+
+def _diff_entries(before: list, after: list) -> Tuple[list, list]:
+    """Return entries added to and removed from a list, keeping order."""
+    before_counts = Counter(_entry_key(item) for item in before)
+    after_counts = Counter(_entry_key(item) for item in after)
+
+    added = []
+    for item in after:
+        key = _entry_key(item)
+        if before_counts[key] > 0:
+            before_counts[key] -= 1
+        else:
+            added.append(item)
+
+    removed = []
+    for item in before:
+        key = _entry_key(item)
+        if after_counts[key] > 0:
+            after_counts[key] -= 1
+        else:
+            removed.append(item)
+
+    return added, removed
+
+
+def _entry_key(item: Any) -> Hashable:
+    """Return a hashable identity for a list entry."""
+    if isinstance(item, (dict, list)):
+        return json.dumps(item, sort_keys=True, default=str)
+    return item
+
+
+class DeltaTracker:
+    """Keeps the last result per client and argument set for delta responses."""
+
+    def __init__(self, max_snapshots: int = MAX_DELTA_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+
+    @staticmethod
+    def scope_key(client_id: str, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Build the snapshot key for a client, tool and argument set."""
+        relevant = {k: v for k, v in arguments.items() if k not in _IGNORED_ARGUMENTS}
+        return f"{client_id}:{tool_name}:{json.dumps(relevant, sort_keys=True, default=str)}"
+
+    def respond(
+        self,
+        client_id: str,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        result: Dict[str, Any],
+        since_token: Optional[str]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Build a delta (or full) response and remember the new snapshot.
+
+        Args:
+            client_id: Identifier of the calling client session
+            tool_name: Name of the tool
+            arguments: Tool arguments
+            result: Current (already projected) tool result
+            since_token: Token from the client's previous response
+
+        Returns:
+            Tuple of (response, whether a delta was returned)
+        """
+        key = self.scope_key(client_id, tool_name, arguments)
+        token = secrets.token_hex(8)
+
+        previous = self._snapshots.pop(key, None)
+        self._snapshots[key] = (token, result)
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+
+        if previous is None or not since_token or previous[0] != since_token:
+            # Unknown, expired or first token: send everything
+            response = dict(result)
+            response["delta"] = False
+            response["token"] = token
+            return response, False
+
+        delta = diff_results(previous[1], result)
+        response = {
+            "delta": True,
+            "since_token": since_token,
+            "token": token,
+            "unchanged": not any(delta.values())
+        }
+        response.update(delta)
+        return response, True
@@ -0,0 +1,296 @@
+"""udev hotplug event stream.
+
+Keeps a persistent ``udevadm monitor`` running on the VM and parses its
+output on the host into structured add/remove/bind/unbind events. Events
+are kept in a bounded in-memory buffer that tools can query or await
+without issuing any further SSH commands.
+"""
+
+import asyncio
+import logging
+import re
+import shlex
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .metrics import get_metrics_registry
+from .ssh_manager import SSHManager
+
+logger = logging.getLogger(__name__)
+
+# Header line of an event, e.g.
+# "UDEV  [12345.678901] add      /devices/pci0000:00/.../1-1 (usb)"
+_HEADER_RE = re.compile(r"^(UDEV|KERNEL)\s+\[(\d+\.\d+)\]\s+(\w+)\s+(\S+)\s+\((\S+)\)\s*$")
+
+
+class UdevEventParser:
+    """Incremental parser for ``udevadm monitor --property`` output."""
+
+    def __init__(self):
+        self._current: Optional[Dict[str, Any]] = None
+
+    def feed(self, line: str) -> Optional[Dict[str, Any]]:
+        """
+        Feed one output line.
+
+        Args:
+            line: Line of udevadm output (without trailing newline)
+
+        Returns:
+            A completed event when the line ends one, otherwise None
+        """
+        line = line.rstrip("\n")
+
+        header = _HEADER_RE.match(line)
+        if header:
+            # A new header also terminates an event missing its blank line
+            finished = self._current
+            source, timestamp, action, devpath, subsystem = header.groups()
+            self._current = {
+                "source": source,
+                "monotonic": float(timestamp),
+                "received_at": datetime.utcnow().isoformat(),
+                "action": action,
+                "devpath": devpath,
+                "subsystem": subsystem,
+                "properties": {}
+            }
+            return _finalize(finished)
+
+        if self._current is None:
+            return None
+
+        if not line.strip():
+            finished, self._current = self._current, None
+            return _finalize(finished)
+
+        if "=" in line:
+            key, value = line.split("=", 1)
+            self._current["properties"][key.strip()] = value.strip()
+
+        return None
+
+
+def _finalize(event: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Lift commonly used properties to top-level event fields."""
+    if event is None:
+        return None
+
+    props = event["properties"]
+    for key, field in (
+        ("DEVTYPE", "devtype"),
+        ("DRIVER", "driver"),
+        ("INTERFACE", "interface"),
+        ("PRODUCT", "product"),
+        ("ID_VENDOR_ID", "vendor_id"),
+        ("ID_MODEL_ID", "model_id"),
+        ("SEQNUM", "kernel_seqnum")
+    ):
+        if key in props:
+            event[field] = props[key]
+
+    return event
+
+
+class HotplugMonitor:
+    """Persistent udev monitor with a queryable, awaitable event buffer."""
+
+    def __init__(
+        self,
+        ssh: SSHManager,
+        subsystems: Optional[List[str]] = None,
+        max_events: int = 1000
+    ):
+        self.ssh = ssh
+        self.subsystems = subsystems or ["usb", "net"]
+        self.events: deque = deque(maxlen=max_events)
+        self.metrics = get_metrics_registry()
+        self.last_seq = 0
+        self.started_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._process = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+    @property
+    def running(self) -> bool:
+        """Check if the monitor process is streaming events."""
+        return self._reader_task is not None and not self._reader_task.done()
+
+    def _command(self) -> str:
+        """Build the remote monitor command.
+
+        udevadm runs in the background and is killed once the channel's stdin
+        closes, so stopping the monitor never leaves it behind on the VM.
+        """
+        matches = " ".join(f"--subsystem-match={shlex.quote(s)}" for s in self.subsystems)
+        monitor = f"udevadm monitor --udev --property {matches}"
+        return f"sh -c {shlex.quote(f'{monitor} & pid=$!; read _; kill $pid')}"
+
+    async def start(self):
+        """Start streaming events (no-op if already running)."""
+        if self.running:
+            return
+
+        # Release the channel of a monitor process that died
+        await self._close()
+
+        self._process = await self.ssh.start_process(self._command())
+        self.started_at = datetime.utcnow().isoformat()
+        self.last_error = None
+        self._reader_task = asyncio.create_task(self._read_events(self._process))
+        self.metrics.set_gauge("hotplug_monitor_running", 1)
+        logger.info(f"Hotplug monitor started for subsystems: {', '.join(self.subsystems)}")
+
+    async def stop(self):
+        """Stop streaming events."""
+        await self._close()
+        self.metrics.set_gauge("hotplug_monitor_running", 0)
+        logger.info("Hotplug monitor stopped")
+
+    async def _close(self):
+        """Close the monitor process and cancel its reader."""
+        if self._process is not None:
+            self._process.stdin.write_eof()
+            self._process.close()
+            self._process = None
+
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+
+    async def _read_events(self, process):
+        """Parse monitor output into the event buffer until the stream ends."""
+        parser = UdevEventParser()
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                event = parser.feed(line)
+                if event is not None:
+                    await self._record(event)
+
+            stderr = (await process.stderr.read()).strip()
+            self.last_error = stderr or "udevadm monitor exited"
+            logger.warning(f"Hotplug monitor stream ended: {self.last_error}")
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Hotplug monitor failed: {e}")
+        finally:
+            self.metrics.set_gauge("hotplug_monitor_running", 0)
+
+    async def _record(self, event: Dict[str, Any]):
+        """Append an event and wake up waiters."""
+        self.last_seq += 1
+        event["seq"] = self.last_seq
+        self.events.append(event)
+        self.metrics.inc("hotplug_events_total", action=event["action"], subsystem=event["subsystem"])
+
+        async with self._changed:
+            self._changed.notify_all()
+
+    def query(
+        self,
+        since_seq: int = 0,
+        action: Optional[str] = None,
+        subsystem: Optional[str] = None,
+        match: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return buffered events matching the filters.
+
+        Args:
+            since_seq: Only events with a sequence number above this
+            action: Event action (add, remove, bind, unbind, change, ...)
+            subsystem: udev subsystem (usb, net, ...)
+            match: Regex searched in the devpath and property values
+            limit: Return at most this many (most recent) events
+
+        Returns:
+            List of events in arrival order
+        """
+        pattern = re.compile(match) if match else None
+        matched = [e for e in self.events if _matches(e, since_seq, action, subsystem, pattern)]
+        if limit is not None:
+            matched = matched[-limit:] if limit > 0 else []
+        return matched
+
+    async def wait_for(
+        self,
+        since_seq: int = 0,
+        action: Optional[str] = None,
+        subsystem: Optional[str] = None,
+        match: Optional[str] = None,
+        timeout: float = 60
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the first event matching the filters.
+
+        Already buffered events after since_seq count, so callers can pass
+        the sequence number they saw before triggering a hotplug.
+
+        Returns:
+            The matching event, or None on timeout
+        """
+        pattern = re.compile(match) if match else None
+
+        def first_match() -> Optional[Dict[str, Any]]:
+            for event in self.events:
+                if _matches(event, since_seq, action, subsystem, pattern):
+                    return event
+            return None
+
+        async def wait() -> Dict[str, Any]:
+            async with self._changed:
+                while True:
+                    event = first_match()
+                    if event is not None:
+                        return event
+                    await self._changed.wait()
+
+        try:
+            return await asyncio.wait_for(wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def status(self) -> Dict[str, Any]:
+        """Return monitor state."""
+        return {
+            "running": self.running,
+            "subsystems": self.subsystems,
+            "started_at": self.started_at,
+            "buffered_events": len(self.events),
+            "last_seq": self.last_seq,
+            "last_error": self.last_error
+        }
+
+
+def _matches(
+    event: Dict[str, Any],
+    since_seq: int,
+    action: Optional[str],
+    subsystem: Optional[str],
+    pattern: Optional["re.Pattern"]
+) -> bool:
+    """Check an event against query filters."""
+    if event["seq"] <= since_seq:
+        return False
+    if action and event["action"] != action:
+        return False
+    if subsystem and event["subsystem"] != subsystem:
+        return False
+    if pattern:
+        haystack = " ".join([event["devpath"], *event["properties"].values()])
+        if not pattern.search(haystack):
+            return False
+    return True
@@ -0,0 +1,173 @@
+"""SQLite sink for tool and command log records.
+
+The JSON/text log has to be re-parsed on every analysis. This handler
+writes the structured records emitted by :class:`ToolLogger` and
+:class:`CommandLogger`, plus every ERROR record, into indexed tables so
+``analyze_logs.py --db`` can answer stats, error and command queries with
+SQL. It runs behind the logging queue like the other handlers.
+
+Tool and command ids restart with every server process, so each process
+writes under its own ``session`` id.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from typing import Any, Dict, Optional
+
+from .metrics import command_template
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tools (
+    id INTEGER PRIMARY KEY,
+    session TEXT NOT NULL,
+    tool_id INTEGER NOT NULL,
+    tool_name TEXT NOT NULL,
+    arguments TEXT,
+    started_at REAL NOT NULL,
+    completed_at REAL,
+    duration REAL,
+    success INTEGER,
+    error TEXT,
+    trace_id TEXT
+);
+CREATE INDEX IF NOT EXISTS tools_started_at ON tools (started_at);
+CREATE INDEX IF NOT EXISTS tools_name ON tools (tool_name, started_at);
+CREATE INDEX IF NOT EXISTS tools_duration ON tools (duration);
+CREATE UNIQUE INDEX IF NOT EXISTS tools_session_id ON tools (session, tool_id);
+
+CREATE TABLE IF NOT EXISTS commands (
+    id INTEGER PRIMARY KEY,
+    session TEXT NOT NULL,
+    cmd_id INTEGER NOT NULL,
+    command TEXT NOT NULL,
+    template TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    completed_at REAL,
+    duration REAL,
+    exit_code INTEGER,
+    stdout_length INTEGER,
+    stderr_length INTEGER,
+    error TEXT,
+    trace_id TEXT
+);
+CREATE INDEX IF NOT EXISTS commands_started_at ON commands (started_at);
+CREATE INDEX IF NOT EXISTS commands_exit_code ON commands (exit_code, started_at);
+CREATE INDEX IF NOT EXISTS commands_duration ON commands (duration);
+CREATE INDEX IF NOT EXISTS commands_template ON commands (template);
+CREATE UNIQUE INDEX IF NOT EXISTS commands_session_id ON commands (session, cmd_id);
+
+CREATE TABLE IF NOT EXISTS errors (
+    id INTEGER PRIMARY KEY,
+    session TEXT NOT NULL,
+    time REAL NOT NULL,
+    level TEXT NOT NULL,
+    logger TEXT NOT NULL,
+    message TEXT NOT NULL,
+    exception_type TEXT,
+    exception_message TEXT,
+    trace_id TEXT
+);
+CREATE INDEX IF NOT EXISTS errors_time ON errors (time);
+"""
+
+
+class SQLiteLogHandler(logging.Handler):
+    """Writes tool, command and error records into SQLite tables."""
+
+    def __init__(self, db_file: str):
+        super().__init__(level=logging.INFO)
+        self.db_file = db_file
+        self.session = uuid.uuid4().hex[:12]
+        # Created here, written from the queue listener thread
+        self.db = sqlite3.connect(db_file, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord):
+        data: Dict[str, Any] = getattr(record, "extra_data", None) or {}
+        try:
+            with self._db_lock, self.db:
+                if "tool_id" in data:
+                    self._tool_record(record, data)
+                elif "cmd_id" in data:
+                    self._command_record(record, data)
+                if record.levelno >= logging.ERROR:
+                    self._error_record(record)
+        except sqlite3.Error:
+            self.handleError(record)
+
+    def _tool_record(self, record: logging.LogRecord, data: Dict[str, Any]):
+        key = (self.session, data["tool_id"])
+        if "arguments" in data:
+            self.db.execute(
+                "INSERT OR REPLACE INTO tools (session, tool_id, tool_name, arguments, started_at, trace_id)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, data["tool_name"], json.dumps(data["arguments"], default=str),
+                 record.created, getattr(record, "trace_id", None))
+            )
+        elif "duration_seconds" in data:
+            self.db.execute(
+                "UPDATE tools SET completed_at = ?, duration = ?, success = ?, error = ?"
+                " WHERE session = ? AND tool_id = ?",
+                (record.created, data["duration_seconds"], int(data.get("success", True)),
+                 _text(data.get("error")), *key)
+            )
+        elif "error_type" in data:
+            self.db.execute(
+                "UPDATE tools SET completed_at = ?, duration = ? - started_at, success = 0, error = ?"
+                " WHERE session = ? AND tool_id = ?",
+                (record.created, record.created, f"{data['error_type']}: {data['error_message']}", *key)
+            )
+
+    def _command_record(self, record: logging.LogRecord, data: Dict[str, Any]):
+        key = (self.session, data["cmd_id"])
+        if "command" in data:
+            command = (data.get("context") or {}).get("original_command") or data["command"]
+            self.db.execute(
+                "INSERT OR REPLACE INTO commands (session, cmd_id, command, template, started_at, trace_id)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, command, command_template(command), record.created,
+                 getattr(record, "trace_id", None))
+            )
+        elif "exit_code" in data:
+            self.db.execute(
+                "UPDATE commands SET completed_at = ?, duration = ?, exit_code = ?,"
+                " stdout_length = ?, stderr_length = ? WHERE session = ? AND cmd_id = ?",
+                (record.created, data["duration_seconds"], data["exit_code"],
+                 data.get("stdout_length"), data.get("stderr_length"), *key)
+            )
+        elif "error_type" in data:
+            self.db.execute(
+                "UPDATE commands SET completed_at = ?, duration = ? - started_at, error = ?"
+                " WHERE session = ? AND cmd_id = ?",
+                (record.created, record.created, f"{data['error_type']}: {data['error_message']}", *key)
+            )
+
+    def _error_record(self, record: logging.LogRecord):
+        exc_type = exc_message = None
+        if record.exc_info and record.exc_info[0]:
+            exc_type = record.exc_info[0].__name__
+            exc_message = str(record.exc_info[1])
+        self.db.execute(
+            "INSERT INTO errors (session, time, level, logger, message, exception_type, exception_message, trace_id)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.session, record.created, record.levelname, record.name, record.getMessage(),
+             exc_type, exc_message, getattr(record, "trace_id", None))
+        )
+
+    def close(self):
+        with self._db_lock:
+            self.db.close()
+        super().close()
+
+
+def _text(value: Optional[Any]) -> Optional[str]:
+    """Store non-string values (e.g. error dicts) as JSON."""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, default=str)
@@ -0,0 +1,84 @@
+"""Sampling policy for command output logging.
+
+Full stdout/stderr is what makes a failed or slow command debuggable, but
+most commands are fast, successful reads (``cat /sys/...``) whose output
+nobody looks at. The policy decides per command whether its completion
+record keeps the full output or only metadata (exit code, lengths, duration).
+
+Failures and commands slower than the threshold always keep full output.
+Fast successes follow the first rule whose pattern matches the command, or
+the default: ``full``, ``metadata``, or ``sample`` (full output for one in
+every ``sample_every`` matching commands).
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+OUTPUT_MODES = ("full", "metadata", "sample")
+
+
+class _Rule:
+    """Logging mode for commands matching a pattern."""
+
+    def __init__(self, pattern: str, success: str, sample_every: int):
+        self.pattern = re.compile(pattern)
+        self.success = success
+        self.sample_every = sample_every
+        self.seen = 0
+
+
+class CommandLogPolicy:
+    """Decides how much of a command's output to log."""
+
+    def __init__(
+        self,
+        slow_threshold: float = 5.0,
+        success: str = "full",
+        sample_every: int = 10,
+        rules: Optional[List[Dict[str, Any]]] = None
+    ):
+        """
+        Args:
+            slow_threshold: Commands running at least this long (seconds)
+                keep full output
+            success: Mode for fast successes matching no rule
+            sample_every: Sampling interval of the default mode
+            rules: Per-pattern overrides, each with ``match`` (regex searched
+                in the command), ``success`` and optional ``sample_every``
+        """
+        self.slow_threshold = slow_threshold
+        self.rules = [
+            _Rule(rule["match"], rule.get("success", "metadata"), rule.get("sample_every", sample_every))
+            for rule in rules or []
+        ]
+        self.default = _Rule("", success, sample_every)
+        self._lock = threading.Lock()
+
+    def decide(self, command: str, exit_code: int, duration: float) -> Tuple[bool, str]:
+        """
+        Decide whether to log a command's full output.
+
+        Args:
+            command: Command as requested (before sudo wrapping)
+            exit_code: Exit code
+            duration: Execution time in seconds
+
+        Returns:
+            Tuple of (keep full output, reason)
+        """
+        if exit_code != 0:
+            return True, "error"
+        if duration >= self.slow_threshold:
+            return True, "slow"
+
+        rule = next((r for r in self.rules if r.pattern.search(command)), self.default)
+        if rule.success == "full":
+            return True, "policy"
+        if rule.success == "metadata":
+            return False, "policy"
+
+        with self._lock:
+            rule.seen += 1
+            sampled = (rule.seen - 1) % rule.sample_every == 0
+        return sampled, "sampled" if sampled else "policy"
@@ -1,13 +1,38 @@
 """Logging configuration and utilities."""
 
+import atexit
+import copy
+import glob
+import gzip
 import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
 import sys
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, List, Optional
 import traceback
 
+from .blob_store import get_blob_store
+from .log_db import SQLiteLogHandler
+from .log_policy import CommandLogPolicy
+from .metrics import get_metrics_registry
+from .tracing import TraceContextFilter
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Background writer serving the queued handlers (see setup_logging)
+_listener: Optional[logging.handlers.QueueListener] = None
+
 
 class JSONFormatter(logging.Formatter):
     """Format log records as JSON for structured logging."""
@@ -15,7 +40,7 @@ class JSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON."""
         log_data = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -32,6 +57,11 @@ class JSONFormatter(logging.Formatter):
                 "traceback": traceback.format_exception(*record.exc_info)
             }
 
+        # Link the record to its trace span
+        if getattr(record, "trace_id", None):
+            log_data["trace_id"] = record.trace_id
+            log_data["span_id"] = record.span_id
+
         # Add extra fields
         if hasattr(record, "extra_data"):
             log_data["extra"] = record.extra_data
@@ -39,12 +69,151 @@ class JSONFormatter(logging.Formatter):
         return json.dumps(log_data, ensure_ascii=False)
 
 
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks the emitting thread on log I/O.
+
+    Records are handed to a bounded queue drained by a background
+    QueueListener. When the queue is full, the ``drop`` policy discards the
+    new record and counts it in ``log_records_dropped_total``; ``block``
+    waits for room instead.
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = "drop"):
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.metrics = get_metrics_registry()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the message arguments but leave formatting to the listener."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        """Queue a record according to the overflow policy."""
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.metrics.inc("log_records_dropped_total", level=record.levelname)
+
+
+class CompressingRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    """
+    File handler rotating by size and age, compressing old segments.
+
+    A rotated segment is renamed to ``<file>.<YYYYmmdd-HHMMSS>`` and then
+    compressed (gzip, or zstd when the zstandard package is installed) on a
+    background thread, so writing continues while it is squeezed. Only the
+    newest ``backup_count`` segments are kept.
+    """
+
+    _SEGMENT = re.compile(r"\.\d{8}-\d{6}(-\d+)?(\.gz|\.zst)?")
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 0,
+        max_age: float = 0,
+        backup_count: int = 10,
+        compression: str = "gzip",
+        encoding: Optional[str] = "utf-8"
+    ):
+        super().__init__(filename, mode="a", encoding=encoding, delay=False)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        if compression == "zstd" and zstandard is None:
+            logging.getLogger(__name__).warning("zstandard is not installed; compressing logs with gzip")
+            compression = "gzip"
+        self.compression = compression
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-compressor")
+
+        # Like TimedRotatingFileHandler, an existing file's age counts from its last write
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            self.segment_started = os.path.getmtime(self.baseFilename)
+        else:
+            self.segment_started = time.time()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """Check if the current segment is too large or too old."""
+        if self.stream is None:
+            self.stream = self._open()
+        if self.max_age > 0 and record.created - self.segment_started >= self.max_age:
+            return True
+        if self.max_bytes > 0 and self.stream.tell() >= self.max_bytes:
+            return True
+        return False
+
+    def doRollover(self):
+        """Close the current segment and hand it to the compressor."""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        segment = f"{self.baseFilename}.{stamp}"
+        suffix = 0
+        while glob.glob(glob.escape(segment) + "*"):
+            suffix += 1
+            segment = f"{self.baseFilename}.{stamp}-{suffix}"
+
+        if os.path.exists(self.baseFilename):
+            os.rename(self.baseFilename, segment)
+            self._compressor.submit(self._compress, segment)
+
+        self.segment_started = time.time()
+        self.stream = self._open()
+
+    def _compress(self, segment: str):
+        """Compress a rotated segment and apply the retention count."""
+        try:
+            # Compress to a temporary name so readers never see a partial file
+            if self.compression == "gzip":
+                with open(segment, "rb") as src, gzip.open(f"{segment}.gz.tmp", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.replace(f"{segment}.gz.tmp", f"{segment}.gz")
+                os.remove(segment)
+            elif self.compression == "zstd":
+                with open(segment, "rb") as src, open(f"{segment}.zst.tmp", "wb") as dst:
+                    zstandard.ZstdCompressor().copy_stream(src, dst)
+                os.replace(f"{segment}.zst.tmp", f"{segment}.zst")
+                os.remove(segment)
+        except OSError as e:
+            logging.getLogger(__name__).warning(f"Failed to compress log segment {segment}: {e}")
+
+        segments = sorted(
+            (path for path in glob.glob(glob.escape(self.baseFilename) + ".*")
+             if self._SEGMENT.fullmatch(path[len(self.baseFilename):])),
+            key=os.path.getmtime
+        )
+        for old in segments[:-self.backup_count] if self.backup_count > 0 else []:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def close(self):
+        """Close the file after pending compressions finish."""
+        self._compressor.shutdown(wait=True)
+        super().close()
+
+
 class CommandLogger:
     """Logger for SSH command execution with detailed tracking."""
 
-    def __init__(self, logger: logging.Logger):
+    def __init__(self, logger: logging.Logger, policy: Optional[CommandLogPolicy] = None):
         self.logger = logger
         self.command_counter = 0
+        self.blobs = get_blob_store()
+        self.policy = policy or CommandLogPolicy()
+        self.metrics = get_metrics_registry()
+        # Commands awaiting completion, for the output policy
+        self._pending: dict = {}
 
     def log_command_start(
         self,
@@ -65,6 +234,7 @@ class CommandLogger:
         """
         self.command_counter += 1
         cmd_id = self.command_counter
+        self._pending[cmd_id] = (context or {}).get("original_command") or command
 
         log_data = {
             "cmd_id": cmd_id,
@@ -99,7 +269,9 @@ class CommandLogger:
         exit_code: int,
         stdout: str,
         stderr: str,
-        duration: float
+        duration: float,
+        stdout_length: Optional[int] = None,
+        stderr_length: Optional[int] = None
     ):
         """
         Log command completion.
@@ -110,19 +282,34 @@ class CommandLogger:
             stdout: Standard output
             stderr: Standard error
             duration: Execution duration in seconds
+            stdout_length: Full stdout size when stdout is an excerpt
+            stderr_length: Full stderr size when stderr is an excerpt
         """
+        command = self._pending.pop(cmd_id, "")
+        full_output, reason = self.policy.decide(command, exit_code, duration)
+        self.metrics.inc("command_log_records_total", output="full" if full_output else "metadata")
+
         log_data = {
             "cmd_id": cmd_id,
             "exit_code": exit_code,
-            "stdout_length": len(stdout),
-            "stderr_length": len(stderr),
+            "stdout_length": len(stdout) if stdout_length is None else stdout_length,
+            "stderr_length": len(stderr) if stderr_length is None else stderr_length,
             "duration_seconds": round(duration, 3),
             "completed_at": datetime.utcnow().isoformat(),
+            "output_logged": "full" if full_output else "metadata",
+            "log_reason": reason,
         }
 
-        # Always include full output in log data (for JSON format)
-        log_data["stdout"] = stdout
-        log_data["stderr"] = stderr
+        # Include full output in log data (for JSON format); large outputs
+        # go to the blob store and are referenced by digest
+        for stream, text in (("stdout", stdout), ("stderr", stderr)):
+            if not full_output:
+                break
+            blob = self.blobs.put(text)
+            if blob is not None:
+                log_data[f"{stream}_blob"] = blob
+            else:
+                log_data[stream] = text
 
         level = logging.INFO if exit_code == 0 else logging.WARNING
 
@@ -133,6 +320,9 @@ class CommandLogger:
             extra={"extra_data": log_data}
         )
 
+        if not full_output:
+            return
+
         # Log stdout if present (as separate INFO message for readability)
         if stdout:
             stdout_preview = stdout[:500] if len(stdout) > 500 else stdout
@@ -157,6 +347,7 @@ class CommandLogger:
             cmd_id: Command ID
             error: Exception that occurred
         """
+        self._pending.pop(cmd_id, None)
         self.logger.error(
             f"[CMD-{cmd_id}] Command failed with error: {error}",
             extra={"extra_data": {
@@ -209,7 +400,8 @@ class ToolLogger:
         tool_name: str,
         result: Any,
         duration: float,
-        success: bool = True
+        success: bool = True,
+        extra: Optional[dict] = None
     ):
         """
         Log tool completion.
@@ -220,6 +412,7 @@ class ToolLogger:
             result: Tool result
             duration: Execution duration
             success: Whether tool succeeded
+            extra: Additional fields for the log record (e.g. profile files)
         """
         log_data = {
             "tool_id": tool_id,
@@ -235,6 +428,9 @@ class ToolLogger:
             if "error" in result:
                 log_data["error"] = result["error"]
 
+        if extra:
+            log_data.update(extra)
+
         level = logging.INFO if success else logging.ERROR
 
         self.logger.log(
@@ -243,7 +439,13 @@ class ToolLogger:
             extra={"extra_data": log_data}
         )
 
-    def log_tool_error(self, tool_id: int, tool_name: str, error: Exception):
+    def log_tool_error(
+        self,
+        tool_id: int,
+        tool_name: str,
+        error: Exception,
+        extra: Optional[dict] = None
+    ):
         """
         Log tool error.
 
@@ -251,15 +453,20 @@ class ToolLogger:
             tool_id: Tool invocation ID
             tool_name: Name of the tool
             error: Exception that occurred
+            extra: Additional fields for the log record (e.g. profile files)
         """
+        log_data = {
+            "tool_id": tool_id,
+            "tool_name": tool_name,
+            "error_type": type(error).__name__,
+            "error_message": str(error),
+        }
+        if extra:
+            log_data.update(extra)
+
         self.logger.error(
             f"[TOOL-{tool_id}] Tool {tool_name} failed: {error}",
-            extra={"extra_data": {
-                "tool_id": tool_id,
-                "tool_name": tool_name,
-                "error_type": type(error).__name__,
-                "error_message": str(error),
-            }},
+            extra={"extra_data": log_data},
             exc_info=True
         )
 
@@ -268,7 +475,16 @@ def setup_logging(
     log_level: str = "INFO",
     log_file: Optional[str] = None,
     json_format: bool = False,
-    enable_console: bool = True
+    enable_console: bool = True,
+    queue_size: int = 10000,
+    queue_overflow: str = "drop",
+    blob_dir: Optional[str] = None,
+    blob_min_size: int = 1024,
+    max_bytes: int = 0,
+    max_age: float = 0,
+    backup_count: int = 10,
+    compression: str = "gzip",
+    db_file: Optional[str] = None
 ) -> logging.Logger:
     """
     Setup logging configuration.
@@ -278,6 +494,19 @@ def setup_logging(
         log_file: Path to log file (optional)
         json_format: Use JSON format for logs
         enable_console: Enable console output
+        queue_size: Records buffered for the background writer (0 writes
+            synchronously in the logging thread)
+        queue_overflow: What to do when the queue is full: "drop" or "block"
+        blob_dir: Directory for command outputs of at least blob_min_size
+            bytes, stored once by content hash (JSON logs only; None keeps
+            outputs inline)
+        blob_min_size: Smallest output moved to the blob store
+        max_bytes: Rotate the log file at this size (0 disables)
+        max_age: Rotate the log file after this many seconds (0 disables)
+        backup_count: Rotated segments kept
+        compression: Rotated segment compression: "gzip", "zstd" or "none"
+        db_file: SQLite database receiving tool, command and error records
+            (optional)
 
     Returns:
         Configured root logger
@@ -286,7 +515,9 @@ def setup_logging(
     root_logger.setLevel(getattr(logging, log_level.upper()))
 
     # Remove existing handlers
+    shutdown_logging()
     root_logger.handlers.clear()
+    handlers: List[logging.Handler] = []
 
     # Console handler
     if enable_console:
@@ -302,7 +533,7 @@ def setup_logging(
             )
             console_handler.setFormatter(console_formatter)
 
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
     # File handler
     if log_file:
@@ -310,7 +541,16 @@ def setup_logging(
         log_path.parent.mkdir(parents=True, exist_ok=True)
 
         # 使用追加模式 'a' 而不是覆盖模式 'w'
-        file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+        if max_bytes > 0 or max_age > 0:
+            file_handler = CompressingRotatingFileHandler(
+                log_file,
+                max_bytes=max_bytes,
+                max_age=max_age,
+                backup_count=backup_count,
+                compression=compression
+            )
+        else:
+            file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
         file_handler.setLevel(logging.DEBUG)  # Always log everything to file
 
         if json_format:
@@ -322,15 +562,58 @@ def setup_logging(
             )
             file_handler.setFormatter(file_formatter)
 
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    # Structured SQLite sink
+    if db_file:
+        Path(db_file).parent.mkdir(parents=True, exist_ok=True)
+        handlers.append(SQLiteLogHandler(db_file))
+
+    if queue_size > 0 and handlers:
+        # Format and write in a background thread; the trace filter runs on
+        # the emitting side, where the current span is known
+        global _listener
+        queue_handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size), queue_overflow)
+        queue_handler.addFilter(TraceContextFilter())
+        _listener = logging.handlers.QueueListener(
+            queue_handler.queue,
+            *handlers,
+            respect_handler_level=True
+        )
+        _listener.start()
+        root_logger.addHandler(queue_handler)
+    else:
+        for handler in handlers:
+            handler.addFilter(TraceContextFilter())
+            root_logger.addHandler(handler)
+
+    # Text logs never contain full outputs, so blobs only apply to JSON
+    get_blob_store().configure(blob_dir if json_format else None, blob_min_size)
 
     return root_logger
 
 
-def get_command_logger(name: str = "ssh_commands") -> CommandLogger:
+def shutdown_logging():
+    """Stop the background log writer after flushing queued records."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    get_blob_store().close()
+
+
+atexit.register(shutdown_logging)
+
+
+def get_command_logger(
+    name: str = "ssh_commands",
+    policy: Optional[CommandLogPolicy] = None
+) -> CommandLogger:
     """Get a command logger instance."""
     logger = logging.getLogger(name)
-    return CommandLogger(logger)
+    return CommandLogger(logger, policy)
 
 
 def get_tool_logger(name: str = "mcp_tools") -> ToolLogger:
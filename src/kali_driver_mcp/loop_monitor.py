@@ -0,0 +1,150 @@
+"""Event loop lag sampler and slow-callback detector.
+
+Every tool call, SSH stream and log write shares one asyncio loop, so a
+synchronous step (a large ``json.dumps``, a file write, CSV parsing) stalls
+everything else. A sampler task measures how late the loop wakes it up, and
+a watchdog thread notices when the sampler has not run for longer than the
+threshold and captures the loop thread's stack and current task while the
+offending callback is still running.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# Frames kept from a stalled loop's stack, innermost last
+MAX_STALL_FRAMES = 30
+
+
+class LoopMonitor:
+    """Measures event loop lag and records stalls with their stacks."""
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        slow_threshold: float = 0.1,
+        max_events: int = 20
+    ):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.metrics = get_metrics_registry()
+        self.stalls: deque = deque(maxlen=max_events)
+        self.max_lag = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._current_stall: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._sampler_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """Start sampling the running loop (call from the loop thread)."""
+        if self._sampler_task is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop_event.clear()
+        self._sampler_task = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        """Stop sampling."""
+        self._stop_event.set()
+        if self._sampler_task is not None:
+            self._sampler_task.cancel()
+            try:
+                await self._sampler_task
+            except asyncio.CancelledError:
+                pass
+            self._sampler_task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def _sample(self):
+        """Measure how late the loop runs a timer of known length."""
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+
+            self.metrics.observe("event_loop_lag_seconds", lag)
+            self.max_lag = max(self.max_lag, lag)
+
+            with self._lock:
+                self._heartbeat = now
+                stall, self._current_stall = self._current_stall, None
+                if stall is not None:
+                    stall["blocked_seconds"] = round(lag, 3)
+            if stall is not None:
+                logger.warning(
+                    f"Event loop blocked for {lag:.3f}s in {stall['task']}:\n"
+                    + "".join(stall["stack"])
+                )
+
+    def _watch(self):
+        """Capture the loop thread's stack when the sampler stops running."""
+        poll = min(self.interval, self.slow_threshold) / 2
+        while not self._stop_event.wait(poll):
+            with self._lock:
+                overdue = time.monotonic() - self._heartbeat - self.interval
+                if overdue < self.slow_threshold or self._current_stall is not None:
+                    continue
+                self._current_stall = self._capture(overdue)
+                self.stalls.append(self._current_stall)
+            self.metrics.inc("event_loop_stalls_total")
+
+    def _capture(self, overdue: float) -> Dict[str, Any]:
+        """Record what the loop thread is running right now."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame)[-MAX_STALL_FRAMES:] if frame is not None else []
+
+        # current_task only reads the loop's task map, which is safe enough here
+        task = asyncio.current_task(self._loop)
+        return {
+            "detected_at": datetime.utcnow().isoformat(),
+            "blocked_seconds": round(overdue, 3),
+            "task": task.get_name() if task is not None else "<callback>",
+            "coroutine": repr(task.get_coro()) if task is not None else None,
+            "stack": stack
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return loop health statistics.
+
+        Returns:
+            Dictionary with lag settings, the worst lag seen and recent stalls
+        """
+        with self._lock:
+            stalls: List[Dict[str, Any]] = [dict(s) for s in self.stalls]
+
+        return {
+            "running": self._sampler_task is not None and not self._sampler_task.done(),
+            "interval": self.interval,
+            "slow_threshold": self.slow_threshold,
+            "max_lag_seconds": round(self.max_lag, 3),
+            "recent_stalls": stalls
+        }
+
+    def reset(self):
+        """Forget the worst lag and recorded stalls."""
+        with self._lock:
+            self.max_lag = 0.0
+            self.stalls.clear()
@@ -0,0 +1,166 @@
+"""Optional memory accounting with tracemalloc.
+
+When enabled, every tool call and SSH command is measured for the bytes it
+left allocated (net) and the highest allocation level reached while it ran
+(peak), both relative to where it started. Measurements are process-wide, so
+concurrent calls contribute to each other's numbers; nested measurements
+(commands inside a tool call) each still see their own peak.
+
+Top allocation sites, and the growth since tracking started, can be dumped
+on demand to size the server for long sessions and to spot leaks.
+"""
+
+import logging
+import threading
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from .metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+class _Measurement:
+    """Allocation window of one tool call or command."""
+
+    def __init__(self, base: int):
+        self.base = base
+        self.highest = base
+
+
+class MemoryTracker:
+    """Per-tool and per-command allocation accounting."""
+
+    def __init__(self):
+        self.metrics = get_metrics_registry()
+        self.enabled = False
+        self._active: List[_Measurement] = []
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    def start(self, frames: int = 1):
+        """
+        Start tracing allocations.
+
+        Args:
+            frames: Stack frames recorded per allocation site
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.enabled = True
+        self._baseline = self._snapshot()
+        logger.info(f"Memory tracking enabled ({frames} frame(s) per allocation)")
+
+    def stop(self):
+        """Stop tracing allocations."""
+        self.enabled = False
+        self._active.clear()
+        self._baseline = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _checkpoint(self) -> int:
+        """Fold the peak so far into every open measurement and restart it."""
+        current, peak = tracemalloc.get_traced_memory()
+        for measurement in self._active:
+            measurement.highest = max(measurement.highest, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def begin(self) -> Optional[_Measurement]:
+        """
+        Open a measurement window.
+
+        Returns:
+            Measurement handle for :meth:`end`, or None when tracking is off
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            measurement = _Measurement(self._checkpoint())
+            self._active.append(measurement)
+        return measurement
+
+    def end(self, measurement: Optional[_Measurement], kind: str, **labels: str) -> Optional[Dict[str, int]]:
+        """
+        Close a measurement window and record it.
+
+        Args:
+            measurement: Handle from :meth:`begin`
+            kind: "tool" or "command"; selects the metric names
+            **labels: Metric labels (e.g. tool or template)
+
+        Returns:
+            Dictionary with peak and net bytes, or None when tracking is off
+        """
+        if measurement is None or not self.enabled:
+            return None
+        with self._lock:
+            current = self._checkpoint()
+            if measurement in self._active:
+                self._active.remove(measurement)
+
+        usage = {
+            "peak_bytes": measurement.highest - measurement.base,
+            "net_bytes": current - measurement.base
+        }
+        self.metrics.observe(f"{kind}_memory_peak_bytes", usage["peak_bytes"], **labels)
+        self.metrics.observe(f"{kind}_memory_net_bytes", usage["net_bytes"], **labels)
+        return usage
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Report traced memory and the top allocation sites.
+
+        Args:
+            top: Number of allocation sites to list
+
+        Returns:
+            Dictionary with current and peak traced bytes, the largest
+            allocation sites and the sites that grew most since tracking began
+        """
+        if not self.enabled:
+            return {"enabled": False}
+
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = self._snapshot()
+        report = {
+            "enabled": True,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "top_allocations": [
+                {"site": _site(stat.traceback), "bytes": stat.size, "blocks": stat.count}
+                for stat in snapshot.statistics("lineno")[:top]
+            ]
+        }
+        if self._baseline is not None:
+            report["top_growth"] = [
+                {"site": _site(stat.traceback), "bytes": stat.size_diff, "blocks": stat.count_diff}
+                for stat in snapshot.compare_to(self._baseline, "lineno")[:top]
+                if stat.size_diff > 0
+            ]
+        return report
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        """Take a snapshot without tracemalloc's own allocations."""
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>")
+        ])
+
+
+def _site(traceback: tracemalloc.Traceback) -> str:
+    """Format the innermost frame of an allocation site."""
+    frame = traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+# Process-wide tracker shared by the server and SSH manager
+_tracker = MemoryTracker()
+
+
+def get_memory_tracker() -> MemoryTracker:
+    """Get the process-wide memory tracker."""
+    return _tracker
@@ -0,0 +1,280 @@
+"""In-process metrics registry.
+
+Collects counters, gauges and latency histograms for tool calls and SSH
+commands so the server can report where time goes. Exposed through the
+``server_stats`` tool and optionally dumped in Prometheus text format.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Maximum number of distinct command templates tracked before folding
+# new ones into a single "<other>" series
+MAX_COMMAND_TEMPLATES = 500
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_QUOTED_RE = re.compile(r"'[^']*'|\"[^\"]*\"")
+_BASE64_RE = re.compile(r"(?<![\w/+])[A-Za-z0-9+/]{40,}={0,2}")
+_SYS_NET_RE = re.compile(r"/sys/class/net/[^/\s]+")
+_SYS_STAT_RE = re.compile(r"/statistics/\w+")
+_MODULE_RE = re.compile(r"\b(insmod|rmmod|modprobe|modinfo)(\s+-\w+)*\s+(?!-)\S+")
+_PATH_RE = re.compile(r"(?<![\w<>])/(?!sys/|proc/|dev/|etc/|usr/|lib/|bin/|sbin/|var/log/)[\w.\-/]*")
+_MAC_RE = re.compile(r"\b[0-9A-Fa-f]{2}(:[0-9A-Fa-f]{2}){5}\b")
+_IFACE_RE = re.compile(r"\b(wlan\d+\w*|eth\d+|en[ops]\d+\w*|wl[ops]\d+\w*|wlx[0-9a-f]{12})\b")
+_NUMBER_RE = re.compile(r"(?<![\w<])\d+(\.\d+)?\b(?!>)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def command_template(command: str) -> str:
+    """
+    Normalize a shell command into a low-cardinality template.
+
+    Strips quoted arguments, encoded scripts, paths, interface names, MAC
+    addresses, module names and numbers, e.g. ``cat /sys/class/net/wlan0/statistics/rx_bytes``
+    becomes ``cat /sys/class/net/<if>/statistics/<stat>``.
+
+    Args:
+        command: Shell command
+
+    Returns:
+        Normalized command template
+    """
+    template = _QUOTED_RE.sub("<str>", command)
+    template = _BASE64_RE.sub("<b64>", template)
+    template = _SYS_NET_RE.sub("/sys/class/net/<if>", template)
+    template = _SYS_STAT_RE.sub("/statistics/<stat>", template)
+    template = _MODULE_RE.sub(lambda m: f"{m.group(1)}{m.group(2) or ''} <module>", template)
+    template = _PATH_RE.sub("<path>", template)
+    template = _MAC_RE.sub("<mac>", template)
+    template = _IFACE_RE.sub("<if>", template)
+    template = _NUMBER_RE.sub("<n>", template)
+    template = _SPACE_RE.sub(" ", template).strip()
+    return template[:200]
+
+
+class Histogram:
+    """Latency histogram over a sliding window of recent samples."""
+
+    def __init__(self, window: int = 1024):
+        self.samples: deque = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Record a sample."""
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Return the p-th percentile (0-100) of the windowed samples."""
+        return _percentile(sorted(self.samples), p)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return summary statistics."""
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else None,
+            "max": round(self.max, 6),
+            "p50": _percentile(ordered, 50),
+            "p95": _percentile(ordered, 95),
+            "p99": _percentile(ordered, 99)
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters, gauges and histograms."""
+
+    def __init__(self, histogram_window: int = 1024):
+        self.histogram_window = histogram_window
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._templates: set = set()
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Increment a counter."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Set a gauge to an absolute value."""
+        key = self._key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def add_gauge(self, name: str, delta: float, **labels):
+        """Add a delta (positive or negative) to a gauge."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[key] = series.get(key, 0) + delta
+
+    def observe(self, name: str, value: float, **labels):
+        """Record a histogram sample."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.histogram_window)
+            histogram.observe(value)
+
+    def record_cache(self, cache: str, hit: bool):
+        """Record a cache lookup outcome."""
+        self.inc("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+    def command_template(self, command: str) -> str:
+        """Return the template for a command, bounding template cardinality."""
+        template = command_template(command)
+        with self._lock:
+            if template in self._templates:
+                return template
+            if len(self._templates) >= MAX_COMMAND_TEMPLATES:
+                return "<other>"
+            self._templates.add(template)
+        return template
+
+    def reset(self):
+        """
+        Clear counters, histograms and templates.
+
+        Gauges track live state (calls and commands in flight, admission
+        queue) and are kept, so calls finishing after the reset still bring
+        them back to zero.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._templates.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return all metrics as a JSON-serializable dictionary.
+
+        Unlabeled series are reported as plain values, labeled series as a
+        mapping of ``"label=value,..."`` to value.
+        """
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            histograms = {
+                name: {key: h.snapshot() for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "counters": {name: _flatten(series) for name, series in counters.items()},
+            "gauges": {name: _flatten(series) for name, series in gauges.items()},
+            "histograms": {name: _flatten(series) for name, series in histograms.items()},
+            "cache_hit_ratios": _cache_hit_ratios(counters.get("cache_requests_total", {}))
+        }
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        lines = []
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_prom_labels(key)} {value}")
+
+            for name, series in sorted(self._gauges.items()):
+                lines.append(f"# TYPE {name} gauge")
+                for key, value in series.items():
+                    lines.append(f"{name}{_prom_labels(key)} {value}")
+
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} summary")
+                for key, histogram in series.items():
+                    for quantile in (0.5, 0.95, 0.99):
+                        value = histogram.percentile(quantile * 100)
+                        if value is not None:
+                            labels = _prom_labels(key + (("quantile", str(quantile)),))
+                            lines.append(f"{name}{labels} {value}")
+                    lines.append(f"{name}_sum{_prom_labels(key)} {histogram.total}")
+                    lines.append(f"{name}_count{_prom_labels(key)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Atomically write the Prometheus text dump to a file."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_suffix(target.suffix + ".tmp")
+        tmp_path.write_text(self.to_prometheus(), encoding="utf-8")
+        tmp_path.replace(target)
+
+
+def _percentile(ordered: list, p: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    return round(ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)], 6)
+
+
+def _flatten(series: Dict[LabelKey, Any]) -> Any:
+    """Collapse a labeled series into a plain value or label-string mapping."""
+    if list(series.keys()) == [()]:
+        return series[()]
+    return {",".join(f"{k}={v}" for k, v in key): value for key, value in series.items()}
+
+
+def _cache_hit_ratios(series: Dict[LabelKey, float]) -> Dict[str, Any]:
+    """Compute hit ratios from cache_requests_total counters."""
+    totals: Dict[str, Dict[str, float]] = {}
+    for key, value in series.items():
+        labels = dict(key)
+        totals.setdefault(labels.get("cache", ""), {})[labels.get("result", "")] = value
+
+    ratios = {}
+    for cache, counts in totals.items():
+        hits = counts.get("hit", 0)
+        total = hits + counts.get("miss", 0)
+        ratios[cache] = {
+            "hits": hits,
+            "misses": total - hits,
+            "hit_ratio": round(hits / total, 4) if total else None
+        }
+    return ratios
+
+
+def _prom_labels(key: LabelKey) -> str:
+    """Format a label key for Prometheus output."""
+    if not key:
+        return ""
+    parts = []
+    for k, v in key:
+        escaped = v.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f'{k}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    return _registry
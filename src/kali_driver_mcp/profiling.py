@@ -0,0 +1,165 @@
+"""On-demand profiling of individual tool calls.
+
+A profiled call is wrapped in ``cProfile`` (deterministic, written as a
+``.pstats`` file) and/or a sampling profiler that snapshots the event loop
+thread's stack at a fixed interval (written as ``.collapsed`` folded stacks
+for flame graph tools). Sampling shows where the loop thread actually spends
+its time, including the selector wait that stands for SSH round trips, with
+far less overhead than cProfile.
+
+Both profilers observe the whole event loop thread, so concurrent tool calls
+show up in each other's profiles; only one call is profiled at a time.
+"""
+
+import cProfile
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Frames kept per sampled stack, innermost last
+MAX_STACK_DEPTH = 64
+
+_active_lock = threading.Lock()
+
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's stack into folded-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="tool-profiler-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[_fold(frame)] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _fold(frame) -> str:
+    """Render a stack as ``outer;...;inner`` function names."""
+    names: List[str] = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class ToolProfile:
+    """Profile of a single tool call."""
+
+    def __init__(
+        self,
+        tool_name: str,
+        output_dir: str,
+        mode: str = "sampling",
+        sample_interval: float = 0.005
+    ):
+        self.tool_name = tool_name
+        self.output_dir = output_dir
+        self.mode = mode
+        self.sample_interval = sample_interval
+        self.active = False
+        self._profiler: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_StackSampler] = None
+
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        base = os.path.join(output_dir, f"{stamp}-{tool_name}")
+        self.files: Dict[str, str] = {}
+        if mode in ("cprofile", "both"):
+            self.files["pstats"] = f"{base}.pstats"
+        if mode in ("sampling", "both"):
+            self.files["collapsed"] = f"{base}.collapsed"
+
+    def start(self) -> bool:
+        """
+        Start profiling the calling (event loop) thread.
+
+        Returns:
+            False if another call is already being profiled
+        """
+        if not _active_lock.acquire(blocking=False):
+            logger.warning(f"Not profiling {self.tool_name}: another tool call is being profiled")
+            self.files = {}
+            return False
+
+        if "pstats" in self.files:
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError as e:
+                # Another profiler (e.g. a debugger) owns the profiling hook
+                logger.warning(f"Not profiling {self.tool_name}: {e}")
+                self.files = {}
+                _active_lock.release()
+                return False
+
+        self.active = True
+        if "collapsed" in self.files:
+            self._sampler = _StackSampler(threading.get_ident(), self.sample_interval)
+            self._sampler.start()
+        return True
+
+    def stop(self):
+        """Stop profiling and write the profile files."""
+        if not self.active:
+            return
+
+        try:
+            if self._profiler is not None:
+                self._profiler.disable()
+            if self._sampler is not None:
+                self._sampler.stop()
+
+            os.makedirs(self.output_dir, exist_ok=True)
+            if self._profiler is not None:
+                self._profiler.dump_stats(self.files["pstats"])
+            if self._sampler is not None:
+                with open(self.files["collapsed"], "w") as f:
+                    for stack, count in self._sampler.samples.most_common():
+                        f.write(f"{stack} {count}\n")
+
+            logger.info(f"Profile of {self.tool_name} written to {', '.join(self.files.values())}")
+
+        except OSError as e:
+            logger.warning(f"Failed to write profile of {self.tool_name}: {e}")
+        finally:
+            self.active = False
+            _active_lock.release()
+
+
+def should_profile(
+    tool_name: str,
+    requested: Optional[bool],
+    enabled: bool,
+    tools: List[str]
+) -> bool:
+    """
+    Decide whether to profile a tool call.
+
+    Args:
+        tool_name: Name of the tool
+        requested: Value of the ``profile`` tool argument, if given
+        enabled: Whether profiling is enabled for every tool
+        tools: Tools profiled on every call
+
+    Returns:
+        True if the call should be profiled
+    """
+    if requested is not None:
+        return requested
+    return enabled or tool_name in tools
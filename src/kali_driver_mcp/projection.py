@@ -0,0 +1,128 @@
+"""Field projection and summary modes for tool responses.
+
+Every tool accepts a common ``fields`` argument (a list of top-level or
+dotted keys such as ``"interface_data.state"``) and a ``summary`` flag.
+Tools that fetch optional data from the VM consult :func:`wants` so that
+unrequested fields are never fetched; the server then applies
+:func:`project_result` and :func:`summarize_result` to every response.
+
+Summary mode reports counts of every field, so it needs the full result:
+it shrinks the response but saves no remote work or latency. Combine it
+with ``fields`` to avoid fetching data that is not needed.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Set
+
+# Keys kept by every projection so failures stay visible
+ALWAYS_KEPT_FIELDS = ("success", "error")
+
+# Strings longer than this (or spanning lines) are reduced in summary mode
+SUMMARY_MAX_TEXT = 200
+
+
+def parse_fields(fields: Optional[Iterable[str]]) -> Optional[Set[str]]:
+    """
+    Normalize the ``fields`` tool argument.
+
+    Args:
+        fields: List of field names, or None for all fields
+
+    Returns:
+        Set of field names, or None when every field is wanted
+    """
+    if not fields:
+        return None
+    return {f.strip() for f in fields if f and f.strip()}
+
+
+def wants(fields: Optional[Set[str]], path: str) -> bool:
+    """
+    Check whether a (possibly dotted) result field was requested.
+
+    A field is wanted when no projection is active, when it or one of its
+    parents was requested, or when one of its children was requested.
+
+    Args:
+        fields: Requested fields from :func:`parse_fields`
+        path: Dotted field path, e.g. ``"interface_data.driver_info"``
+
+    Returns:
+        True if the field should be fetched
+    """
+    if fields is None:
+        return True
+    for field in fields:
+        if path == field or path.startswith(field + ".") or field.startswith(path + "."):
+            return True
+    return False
+
+
+def project_result(result: Dict[str, Any], fields: Optional[Set[str]]) -> Dict[str, Any]:
+    """
+    Keep only the requested fields of a tool result.
+
+    Args:
+        result: Tool result dictionary
+        fields: Requested fields from :func:`parse_fields`
+
+    Returns:
+        Projected result dictionary
+    """
+    if fields is None or not isinstance(result, dict):
+        return result
+
+    projected: Dict[str, Any] = {}
+    for key in ALWAYS_KEPT_FIELDS:
+        if key in result:
+            projected[key] = result[key]
+
+    for field in sorted(fields):
+        source: Any = result
+        target = projected
+        parts = field.split(".")
+        for i, part in enumerate(parts):
+            if not isinstance(source, dict) or part not in source:
+                break
+            source = source[part]
+            if i == len(parts) - 1:
+                target[part] = source
+            else:
+                existing = target.get(part)
+                if not isinstance(existing, dict):
+                    existing = target[part] = {}
+                target = existing
+
+    return projected
+
+
+def summarize_result(result: Any) -> Any:
+    """
+    Reduce a tool result to counts and key values.
+
+    Lists become ``<key>_count``, multi-line or long strings become
+    ``<key>_lines``, nested dictionaries are summarized recursively and
+    scalars are kept as-is. Errors are kept, truncated to their first line.
+    Runs on the finished result, after the tool fetched it.
+
+    Args:
+        result: Tool result dictionary
+
+    Returns:
+        Summarized result dictionary
+    """
+    if not isinstance(result, dict):
+        return result
+
+    summary: Dict[str, Any] = {}
+    for key, value in result.items():
+        if key == "error" and isinstance(value, str):
+            summary[key] = value.split("\n", 1)[0][:SUMMARY_MAX_TEXT]
+        elif isinstance(value, list):
+            summary[f"{key}_count"] = len(value)
+        elif isinstance(value, dict):
+            summary[key] = summarize_result(value)
+        elif isinstance(value, str) and ("\n" in value or len(value) > SUMMARY_MAX_TEXT):
+            summary[f"{key}_lines"] = value.count("\n") + 1
+        else:
+            summary[key] = value
+    return summary
@@ -4,6 +4,7 @@ This server provides tools for debugging network card drivers in a Kali Linux VM
 """
 
 import asyncio
+import json
 import logging
 import sys
 import time
@@ -13,9 +14,20 @@ from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
+from . import deadline
 from .config import Config, load_config
 from .ssh_manager import SSHManager
-from .logging_config import setup_logging, get_tool_logger
+from .logging_config import setup_logging, shutdown_logging, get_tool_logger
+from .metrics import get_metrics_registry
+from .projection import parse_fields, project_result, summarize_result
+from .delta import DeltaTracker
+from .profiling import ToolProfile, should_profile
+from .loop_monitor import LoopMonitor
+from .memory import get_memory_tracker
+from .tracing import get_tracer
+from .hotplug import HotplugMonitor
+from .admission import AdmissionController, AdmissionRejected
+from .cache import ResultCache, is_cacheable, INVALIDATING_TOOLS
 from .tools.kernel_info import get_kernel_info
 from .tools.file_ops import file_operations
 from .tools.code_sync import verify_shared_folder
@@ -25,9 +37,47 @@ from .tools.log_viewer import view_logs
 from .tools.network_info import get_network_info
 from .tools.network_monitor import manage_monitor_mode
 from .tools.packet_capture import capture_packets
+from .tools.driver_pipeline import run_driver_pipeline
+from .tools.server_stats import get_server_stats
+from .tools.wait_condition import wait_for_condition, CONDITIONS
+from .tools.hotplug_events import manage_hotplug_events
+from .tools.execute_command import execute_command
 
 logger = logging.getLogger(__name__)
 
+# Tools served from in-process state that must not open an SSH connection
+LOCAL_TOOLS = {"server_stats"}
+
+# Minimum seconds between MCP progress notifications of one call
+PROGRESS_INTERVAL = 0.5
+
+# Arguments accepted by every tool, handled centrally in call_tool
+COMMON_TOOL_PROPERTIES = {
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Only return (and only fetch) these result fields; dotted paths select nested fields (e.g. 'interface_data.state')"
+    },
+    "summary": {
+        "type": "boolean",
+        "description": "Return counts and key values instead of raw output blobs. Only shrinks the response: the full result is still fetched from the VM (use 'fields' to skip remote work)",
+        "default": False
+    },
+    "since_token": {
+        "type": "string",
+        "description": "Token from a previous response; returns only added/removed/changed entries since then. Pass an empty string to get a first token"
+    },
+    "deadline": {
+        "type": "number",
+        "description": "Seconds the whole call may take; remote steps share this budget and partial results are returned when it runs out",
+        "exclusiveMinimum": 0
+    },
+    "profile": {
+        "type": "boolean",
+        "description": "Profile this call and record the profile file paths in the tool log"
+    }
+}
+
 
 class KaliDriverMCPServer:
     """MCP Server for Kali driver debugging."""
@@ -41,12 +91,40 @@ class KaliDriverMCPServer:
             log_level=self.config.logging.level,
             log_file=self.config.logging.file,
             json_format=self.config.logging.json_format,
-            enable_console=self.config.logging.enable_console
+            enable_console=self.config.logging.enable_console,
+            queue_size=self.config.logging.queue_size,
+            queue_overflow=self.config.logging.queue_overflow,
+            blob_dir=self.config.logging.blob_dir,
+            blob_min_size=self.config.logging.blob_min_size,
+            max_bytes=self.config.logging.max_bytes,
+            max_age=self.config.logging.max_age_hours * 3600,
+            backup_count=self.config.logging.backup_count,
+            compression=self.config.logging.compression,
+            db_file=self.config.logging.db_file
         )
 
         self.ssh_manager: Optional[SSHManager] = None
+        self.hotplug_monitor: Optional[HotplugMonitor] = None
+        self.result_cache = ResultCache(self.config.warmup.cache_ttl)
+        self.loop_monitor: Optional[LoopMonitor] = None
+        self.admission = AdmissionController(
+            max_concurrent=self.config.admission.max_concurrent,
+            tool_limits=self.config.admission.tool_limits,
+            max_queue=self.config.admission.max_queue,
+            queue_timeout=self.config.admission.queue_timeout,
+            wait_tools=self.config.admission.wait_tools
+        )
         self.server = Server("kali-driver-mcp")
         self.tool_logger = get_tool_logger() if self.config.logging.log_tools else None
+        self.metrics = get_metrics_registry()
+        self.metrics.histogram_window = self.config.metrics.histogram_window
+        self.memory = get_memory_tracker()
+        if self.config.memory.enabled:
+            self.memory.start(self.config.memory.frames)
+        self.tracer = get_tracer()
+        if self.config.tracing.enabled:
+            self.tracer.configure(self.config.tracing.file, self.config.tracing.service_name)
+        self.delta_tracker = DeltaTracker()
 
         # Register handlers
         self._register_handlers()
@@ -57,7 +135,7 @@ class KaliDriverMCPServer:
         @self.server.list_tools()
         async def list_tools() -> list[Tool]:
             """List available tools."""
-            return [
+            tools = [
                 Tool(
                     name="kernel_info",
                     description="Get kernel version and configuration information from Kali VM",
@@ -173,7 +251,7 @@ class KaliDriverMCPServer:
                             },
                             "module_path": {
                                 "type": "string",
-                                "description": "Optional path to .ko file or directory for make install"
+                                "description": "Optional path to .ko file (insmod load and reload) or directory for make install"
                             }
                         },
                         "required": ["operation"]
@@ -288,35 +366,265 @@ class KaliDriverMCPServer:
                             }
                         }
                     }
+                ),
+                Tool(
+                    name="driver_pipeline",
+                    description="Build, reload and verify a driver in one call (compile, reload, new dmesg lines, interface changes)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "module_name": {
+                                "type": "string",
+                                "description": "Module name (without .ko extension)"
+                            },
+                            "target": {
+                                "type": "string",
+                                "description": "Specific make target (default: all)"
+                            },
+                            "clean": {
+                                "type": "boolean",
+                                "description": "Force clean build",
+                                "default": False
+                            },
+                            "directory": {
+                                "type": "string",
+                                "description": "Subdirectory to compile in (relative to vm_path)"
+                            },
+                            "parameters": {
+                                "type": "object",
+                                "description": "Module parameters (key=value pairs)",
+                                "additionalProperties": {"type": "string"}
+                            },
+                            "interface": {
+                                "type": "string",
+                                "description": "Interface whose state is reported after load"
+                            },
+                            "filter_pattern": {
+                                "type": "string",
+                                "description": "Regex pattern to filter new kernel messages"
+                            }
+                        },
+                        "required": ["module_name"]
+                    }
+                ),
+                Tool(
+                    name="wait_condition",
+                    description="Block server-side until a VM condition holds (interface present/up, module loaded, dmesg regex, file exists) or a timeout expires, using event watchers instead of polling",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "condition": {
+                                "type": "string",
+                                "enum": CONDITIONS,
+                                "description": "Condition to wait for"
+                            },
+                            "target": {
+                                "type": "string",
+                                "description": "Interface name, module name or absolute file path (not used by dmesg_match)"
+                            },
+                            "pattern": {
+                                "type": "string",
+                                "description": "Extended regex to match against new kernel messages (dmesg_match)"
+                            },
+                            "timeout": {
+                                "type": "integer",
+                                "description": "Maximum seconds to wait",
+                                "minimum": 1,
+                                "maximum": 3600,
+                                "default": 60
+                            },
+                            "include_existing": {
+                                "type": "boolean",
+                                "description": "For dmesg_match, also match messages already in the ring buffer",
+                                "default": False
+                            }
+                        },
+                        "required": ["condition"]
+                    }
+                ),
+                Tool(
+                    name="hotplug_events",
+                    description="Query or await udev hotplug events (USB/net add, remove, bind, unbind) from a persistent udevadm monitor, without polling",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "operation": {
+                                "type": "string",
+                                "enum": ["start", "stop", "status", "query", "wait"],
+                                "description": "Operation to perform (query and wait start the monitor if needed)",
+                                "default": "query"
+                            },
+                            "since_seq": {
+                                "type": "integer",
+                                "description": "Only consider events with a sequence number above this",
+                                "minimum": 0,
+                                "default": 0
+                            },
+                            "action": {
+                                "type": "string",
+                                "description": "Event action filter (add, remove, bind, unbind, change)"
+                            },
+                            "subsystem": {
+                                "type": "string",
+                                "description": "Subsystem filter (e.g. usb, net)"
+                            },
+                            "match": {
+                                "type": "string",
+                                "description": "Regex searched in the devpath and event properties (e.g. vendor id)"
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum number of events returned by query",
+                                "minimum": 1,
+                                "default": 100
+                            },
+                            "timeout": {
+                                "type": "integer",
+                                "description": "Seconds to wait for a matching event (wait operation)",
+                                "minimum": 1,
+                                "maximum": 3600,
+                                "default": 60
+                            }
+                        }
+                    }
+                ),
+                Tool(
+                    name="execute_command",
+                    description="Run an ad-hoc shell command on the VM (e.g. 'perf stat', 'cat /proc/interrupts'), streaming progress and keeping the head and tail of its output",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "command": {
+                                "type": "string",
+                                "description": "Shell command (or multi-line script) to run"
+                            },
+                            "use_sudo": {
+                                "type": "boolean",
+                                "description": "Run with root privileges",
+                                "default": False
+                            },
+                            "timeout": {
+                                "type": "integer",
+                                "description": "Seconds before the command is killed on the VM",
+                                "minimum": 1,
+                                "maximum": 3600,
+                                "default": 30
+                            },
+                            "head_lines": {
+                                "type": "integer",
+                                "description": "Lines kept from the start of stdout and stderr",
+                                "minimum": 0,
+                                "default": 100
+                            },
+                            "tail_lines": {
+                                "type": "integer",
+                                "description": "Lines kept from the end of stdout and stderr",
+                                "minimum": 0,
+                                "default": 100
+                            }
+                        },
+                        "required": ["command"]
+                    }
+                ),
+                Tool(
+                    name="server_stats",
+                    description="Report server performance metrics (tool/command latency percentiles, bytes transferred, SSH connects, cache hit ratios, in-flight counts, event loop lag and stalls)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "reset": {
+                                "type": "boolean",
+                                "description": "Clear counters and histograms after reporting (in-flight gauges are kept)",
+                                "default": False
+                            },
+                            "memory_top": {
+                                "type": "integer",
+                                "description": "Include this many top allocation sites and the sites that grew most (requires memory tracking)",
+                                "minimum": 0,
+                                "default": 0
+                            }
+                        }
+                    }
                 )
             ]
 
+            for tool in tools:
+                tool.inputSchema["properties"].update(COMMON_TOOL_PROPERTIES)
+
+            return tools
+
         @self.server.call_tool()
         async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             """Handle tool calls."""
             logger.info(f"Tool called: {name} with arguments: {arguments}")
+            arguments = arguments or {}
+            fields = parse_fields(arguments.get("fields"))
+            root_span = self.tracer.start_span(f"tool/{name}", tool=name)
 
-            # Log tool start
-            tool_id = None
-            if self.tool_logger:
-                tool_id = self.tool_logger.log_tool_start(name, arguments or {})
+            # Wait for a free slot, or fail fast when the server is saturated
+            admitted = name not in LOCAL_TOOLS
+            if admitted:
+                try:
+                    with self.tracer.span("admission.wait"):
+                        await self.admission.acquire(name)
+                except AdmissionRejected as e:
+                    logger.warning(f"Rejected tool {name}: {e}")
+                    self.tracer.end_span(root_span, error=str(e))
+                    self.metrics.inc("tool_calls_total", tool=name, outcome="rejected")
+                    rejection = {"success": False, "error": str(e), "retry_after": e.retry_after}
+                    return [TextContent(type="text", text=json.dumps(rejection, indent=2))]
 
+            tool_id = None
             start_time = time.time()
             success = False
+            span_error = None
+            deadline_token = None
+            profile = None
+            log_extra = None
+            memory_window = None
+            mutating = False
+            self.metrics.add_gauge("tools_in_flight", 1, tool=name)
 
+            # Everything after admission runs inside the try, so the slot and
+            # the in-flight gauge are released whatever fails
             try:
+                # Log tool start
+                if self.tool_logger:
+                    tool_id = self.tool_logger.log_tool_start(name, arguments or {})
+                    if root_span:
+                        root_span.set_attribute("tool.id", tool_id)
+
+                deadline_token = deadline.start(
+                    arguments.get("deadline") or self.config.deadline.for_tool(name)
+                )
+
+                # Profile the whole call, JSON encoding included
+                profiling = self.config.profiling
+                if should_profile(name, arguments.get("profile"), profiling.enabled, profiling.tools):
+                    profile = ToolProfile(name, profiling.output_dir, profiling.mode, profiling.sample_interval)
+                    profile.start()
+                if profile and profile.files:
+                    log_extra = {"profile_files": list(profile.files.values())}
+                memory_window = self.memory.begin()
+
                 # Ensure SSH connection is established
-                if not self.ssh_manager:
+                if name not in LOCAL_TOOLS and not self.ssh_manager:
                     self.ssh_manager = SSHManager(self.config)
                     await self.ssh_manager.connect()
 
                 # Route to appropriate tool
                 result = None
 
+                # Tools that change modules or interfaces make cached reads stale
+                if name in INVALIDATING_TOOLS and not is_cacheable(name, arguments):
+                    self.result_cache.begin_mutation()
+                    mutating = True
+
                 if name == "kernel_info":
-                    result = await get_kernel_info(
-                        self.config,
-                        self.ssh_manager,
+                    result = await self._read_cached(
+                        name,
+                        get_kernel_info,
+                        fields,
                         detail_level=arguments.get("detail_level", "basic")
                     )
 
@@ -348,9 +656,7 @@ class KaliDriverMCPServer:
                     )
 
                 elif name == "driver_load":
-                    result = await manage_driver(
-                        self.config,
-                        self.ssh_manager,
+                    driver_params = dict(
                         operation=arguments["operation"],
                         module_name=arguments.get("module_name", ""),
                         parameters=arguments.get("parameters"),
@@ -358,6 +664,15 @@ class KaliDriverMCPServer:
                         use_modprobe=arguments.get("use_modprobe", True),
                         module_path=arguments.get("module_path")
                     )
+                    if is_cacheable(name, driver_params):
+                        result = await self._read_cached(name, manage_driver, fields, **driver_params)
+                    else:
+                        result = await manage_driver(
+                            self.config,
+                            self.ssh_manager,
+                            fields=fields,
+                            **driver_params
+                        )
 
                 elif name == "log_viewer":
                     result = await view_logs(
@@ -371,9 +686,10 @@ class KaliDriverMCPServer:
                     )
 
                 elif name == "network_info":
-                    result = await get_network_info(
-                        self.config,
-                        self.ssh_manager,
+                    result = await self._read_cached(
+                        name,
+                        get_network_info,
+                        fields,
                         interface=arguments.get("interface", "all"),
                         detail_level=arguments.get("detail_level", "basic"),
                         info_type=arguments.get("info_type", "status")
@@ -394,12 +710,94 @@ class KaliDriverMCPServer:
                         channel=arguments.get("channel"),
                         bssid=arguments.get("bssid"),
                         duration=arguments.get("duration"),
-                        output_prefix=arguments.get("output_prefix", "capture")
+                        output_prefix=arguments.get("output_prefix", "capture"),
+                        fields=fields
+                    )
+
+                elif name == "driver_pipeline":
+                    result = await run_driver_pipeline(
+                        self.config,
+                        self.ssh_manager,
+                        module_name=arguments["module_name"],
+                        target=arguments.get("target"),
+                        clean=arguments.get("clean", False),
+                        directory=arguments.get("directory"),
+                        parameters=arguments.get("parameters"),
+                        interface=arguments.get("interface"),
+                        filter_pattern=arguments.get("filter_pattern")
+                    )
+
+                elif name == "wait_condition":
+                    result = await wait_for_condition(
+                        self.config,
+                        self.ssh_manager,
+                        condition=arguments["condition"],
+                        target=arguments.get("target"),
+                        pattern=arguments.get("pattern"),
+                        timeout=arguments.get("timeout", 60),
+                        include_existing=arguments.get("include_existing", False)
+                    )
+
+                elif name == "hotplug_events":
+                    result = await manage_hotplug_events(
+                        self.config,
+                        self._get_hotplug_monitor(),
+                        operation=arguments.get("operation", "query"),
+                        since_seq=arguments.get("since_seq", 0),
+                        action=arguments.get("action"),
+                        subsystem=arguments.get("subsystem"),
+                        match=arguments.get("match"),
+                        limit=arguments.get("limit", 100),
+                        timeout=arguments.get("timeout", 60)
+                    )
+
+                elif name == "execute_command":
+                    result = await execute_command(
+                        self.config,
+                        self.ssh_manager,
+                        command=arguments["command"],
+                        use_sudo=arguments.get("use_sudo", False),
+                        timeout=arguments.get("timeout", 30),
+                        head_lines=arguments.get("head_lines", 100),
+                        tail_lines=arguments.get("tail_lines", 100),
+                        progress=self._progress_reporter()
+                    )
+
+                elif name == "server_stats":
+                    result = await get_server_stats(
+                        self.config,
+                        self.metrics,
+                        reset=arguments.get("reset", False),
+                        loop_monitor=self.loop_monitor,
+                        memory=self.memory,
+                        memory_top=arguments.get("memory_top", 0)
                     )
 
                 else:
                     raise ValueError(f"Unknown tool: {name}")
 
+                # Apply field projection and summary mode
+                result = project_result(result, fields)
+                if arguments.get("summary"):
+                    result = summarize_result(result)
+
+                # Flag results cut short by the call's deadline
+                if deadline.exceeded() and isinstance(result, dict):
+                    result["deadline_exceeded"] = True
+                    self.metrics.inc("tool_deadline_exceeded_total", tool=name)
+
+                # Reduce to a delta against this client's previous result
+                since_token = arguments.get("since_token")
+                if since_token is not None and isinstance(result, dict):
+                    result, is_delta = self.delta_tracker.respond(
+                        self._client_id(),
+                        name,
+                        arguments,
+                        result,
+                        since_token
+                    )
+                    self.metrics.record_cache("delta", is_delta)
+
                 # Mark as successful
                 success = True
                 duration = time.time() - start_time
@@ -411,47 +809,229 @@ class KaliDriverMCPServer:
                         tool_name=name,
                         result=result,
                         duration=duration,
-                        success=success
+                        success=success,
+                        extra=log_extra
                     )
 
                 # Format result as text
-                import json
-                result_text = json.dumps(result, indent=2, ensure_ascii=False)
+                encode_start = time.time()
+                with self.tracer.span("encode"):
+                    result_text = json.dumps(result, indent=2, ensure_ascii=False)
+
+                self.metrics.observe("tool_encode_duration_seconds", time.time() - encode_start, tool=name)
+                self.metrics.observe("tool_duration_seconds", duration, tool=name)
+                self.metrics.inc("tool_calls_total", tool=name, outcome="ok")
+                self.metrics.inc("tool_response_bytes_total", len(result_text), tool=name)
 
                 return [TextContent(type="text", text=result_text)]
 
             except Exception as e:
                 duration = time.time() - start_time
+                span_error = f"{type(e).__name__}: {e}"
                 logger.error(f"Error executing tool {name}: {e}", exc_info=True)
+                self.metrics.observe("tool_duration_seconds", duration, tool=name)
+                self.metrics.inc("tool_calls_total", tool=name, outcome="error")
 
                 # Log tool error
                 if self.tool_logger and tool_id is not None:
                     self.tool_logger.log_tool_error(
                         tool_id=tool_id,
                         tool_name=name,
-                        error=e
+                        error=e,
+                        extra=log_extra
                     )
 
                 error_msg = f"Error executing {name}: {str(e)}"
                 return [TextContent(type="text", text=error_msg)]
 
+            finally:
+                self.metrics.add_gauge("tools_in_flight", -1, tool=name)
+                if admitted:
+                    self.admission.release(name)
+                if mutating:
+                    self.result_cache.end_mutation()
+                self.memory.end(memory_window, "tool", tool=name)
+                if profile:
+                    profile.stop()
+                if deadline_token is not None:
+                    deadline.reset(deadline_token)
+                self.tracer.end_span(root_span, error=span_error)
+
+    async def _read_cached(self, name: str, func, fields, **params) -> dict:
+        """
+        Run a read-only tool through the result cache.
+
+        A projected call (fields set) fetches only what it needs unless a
+        full result is already cached or being prefetched. Calls reading
+        counters (interface statistics) always go to the VM.
+        """
+        cached = self.result_cache.has(name, params)
+        if not is_cacheable(name, params) or (fields is not None and not cached):
+            return await func(self.config, self.ssh_manager, fields=fields, **params)
+
+        async def fetch():
+            result = await func(self.config, self.ssh_manager, **params)
+            if deadline.exceeded():
+                # Keeps partial results out of the cache
+                result["deadline_exceeded"] = True
+            return result
+
+        result, hit = await self.result_cache.get_or_fetch(name, params, fetch)
+        self.metrics.record_cache("results", hit)
+        return result
+
+    async def _prefetch(self, name: str, func, **params) -> dict:
+        """Fetch a read-only tool result for the first call that asks for it."""
+        async def fetch():
+            return await func(self.config, self.ssh_manager, **params)
+
+        return await self.result_cache.prefetch(name, params, fetch)
+
+    async def _warm_up(self):
+        """Connect, pre-elevate and prefetch while the MCP session initializes."""
+        warmup = self.config.warmup
+        start_time = time.time()
+
+        if warmup.enabled:
+            try:
+                await self.ssh_manager.connect()
+                if warmup.pre_elevate and self.config.vm.use_sudo:
+                    # Primes the sudo timestamp and checks root access once
+                    await self.ssh_manager.execute("true", needs_root=True)
+            except Exception as e:
+                logger.warning(f"Warm-up connect failed, deferring to first tool call: {e}")
+                return
+
+            prefetches = {
+                "kernel_info": lambda: self._prefetch(
+                    "kernel_info", get_kernel_info, detail_level="basic"
+                ),
+                "interfaces": lambda: self._prefetch(
+                    "network_info", get_network_info,
+                    interface="all", detail_level="basic", info_type="status"
+                ),
+                "modules": lambda: self._prefetch(
+                    "driver_load", manage_driver,
+                    operation="list", module_name="", parameters=None,
+                    force=False, use_modprobe=True, module_path=None
+                )
+            }
+            results = await asyncio.gather(
+                *(prefetches[target]() for target in warmup.prefetch),
+                return_exceptions=True
+            )
+            for target, outcome in zip(warmup.prefetch, results):
+                if isinstance(outcome, Exception):
+                    logger.warning(f"Warm-up prefetch of {target} failed: {outcome}")
+
+        # Verify shared folder if configured
+        if self.config.shared_folder.verify_mount:
+            logger.info("Verifying shared folder mount...")
+            try:
+                sync_result = await verify_shared_folder(self.config, self.ssh_manager)
+                if sync_result.get("ready"):
+                    logger.info(f"Shared folder ready: {sync_result['vm_path']}")
+                else:
+                    logger.warning(f"Shared folder not ready: {sync_result}")
+            except Exception as e:
+                logger.warning(f"Shared folder verification failed: {e}")
+
+        # Start the hotplug event stream if configured
+        if self.config.hotplug.autostart:
+            try:
+                await self._get_hotplug_monitor().start()
+            except Exception as e:
+                logger.warning(f"Failed to start hotplug monitor: {e}")
+
+        duration = time.time() - start_time
+        self.metrics.observe("warmup_duration_seconds", duration)
+        logger.info(f"Warm-up finished in {duration:.2f}s")
+
+    def _progress_reporter(self):
+        """
+        Build a callback sending MCP progress notifications for this call.
+
+        Returns:
+            Coroutine taking (lines received, latest line), or None when the
+            client did not ask for progress
+        """
+        try:
+            context = self.server.request_context
+        except LookupError:
+            return None
+        token = context.meta.progressToken if context.meta else None
+        if token is None:
+            return None
+
+        last_sent = 0.0
+
+        async def report(lines: int, latest: str):
+            nonlocal last_sent
+            now = time.monotonic()
+            if now - last_sent < PROGRESS_INTERVAL:
+                return
+            last_sent = now
+            await context.session.send_progress_notification(
+                token,
+                lines,
+                message=latest[:200],
+                related_request_id=str(context.request_id)
+            )
+
+        return report
+
+    def _get_hotplug_monitor(self) -> HotplugMonitor:
+        """Get the hotplug monitor, creating it on first use."""
+        if self.hotplug_monitor is None:
+            self.hotplug_monitor = HotplugMonitor(
+                self.ssh_manager,
+                subsystems=self.config.hotplug.subsystems,
+                max_events=self.config.hotplug.max_events
+            )
+        return self.hotplug_monitor
+
+    def _client_id(self) -> str:
+        """Identify the calling client session for per-client state."""
+        try:
+            return str(id(self.server.request_context.session))
+        except LookupError:
+            return "default"
+
+    async def _dump_metrics_periodically(self):
+        """Rewrite the Prometheus metrics file at the configured interval."""
+        interval = self.config.metrics.prometheus_interval
+        path = self.config.metrics.prometheus_file
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.metrics.write_prometheus(path)
+            except OSError as e:
+                logger.warning(f"Failed to write Prometheus metrics to {path}: {e}")
+
     async def run(self):
         """Run the MCP server."""
         logger.info("Starting Kali Driver MCP Server...")
 
+        metrics_task = None
+        warmup_task = None
+        if self.config.loop_monitor.enabled:
+            self.loop_monitor = LoopMonitor(
+                interval=self.config.loop_monitor.interval,
+                slow_threshold=self.config.loop_monitor.slow_threshold,
+                max_events=self.config.loop_monitor.max_events
+            )
+            self.loop_monitor.start()
+        if self.config.metrics.prometheus_file and self.config.metrics.prometheus_interval > 0:
+            metrics_task = asyncio.create_task(self._dump_metrics_periodically())
+
         try:
             # Initialize SSH connection
             self.ssh_manager = SSHManager(self.config)
             logger.info(f"Connecting to VM at {self.config.vm.host}:{self.config.vm.port}")
 
-            # Verify shared folder if configured
-            if self.config.shared_folder.verify_mount:
-                logger.info("Verifying shared folder mount...")
-                sync_result = await verify_shared_folder(self.config, self.ssh_manager)
-                if sync_result.get("ready"):
-                    logger.info(f"Shared folder ready: {sync_result['vm_path']}")
-                else:
-                    logger.warning(f"Shared folder not ready: {sync_result}")
+            # Warm up concurrently with MCP initialization
+            warmup_task = asyncio.create_task(self._warm_up())
 
             # Run the server
             async with stdio_server() as (read_stream, write_stream):
@@ -465,6 +1045,14 @@ class KaliDriverMCPServer:
             raise
         finally:
             # Clean up
+            if metrics_task:
+                metrics_task.cancel()
+            if warmup_task:
+                warmup_task.cancel()
+            if self.loop_monitor:
+                await self.loop_monitor.stop()
+            if self.hotplug_monitor:
+                await self.hotplug_monitor.stop()
             if self.ssh_manager:
                 logger.info("Closing SSH connection...")
                 await self.ssh_manager.close()
@@ -489,6 +1077,8 @@ def main():
     except Exception as e:
         logger.error(f"Failed to start server: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        shutdown_logging()
 
 
 if __name__ == "__main__":
@@ -2,15 +2,32 @@
 
 import asyncio
 import asyncssh
+import base64
+import secrets
 import time
-from typing import Optional, Tuple
+from typing import Awaitable, Callable, Optional, Tuple
 import logging
 
+from . import deadline
 from .config import Config
 from .logging_config import get_command_logger
+from .log_policy import CommandLogPolicy
+from .memory import get_memory_tracker
+from .tracing import get_tracer, SPAN_KIND_CLIENT
+from .metrics import get_metrics_registry
 
 logger = logging.getLogger(__name__)
 
+# Seconds between the remote TERM and KILL when a command times out
+TIMEOUT_KILL_GRACE = 2
+
+# Exit codes of ``timeout`` when it stopped the command (TERM, then KILL)
+REMOTE_TIMEOUT_EXIT_CODES = (124, 128 + 9)
+
+# Extra seconds the local side waits beyond the remote kill, so the remote
+# timeout (not the local one) decides a streamed command's outcome
+STREAM_WAIT_MARGIN = 1
+
 
 class SSHConnectionError(Exception):
     """SSH connection error."""
@@ -38,7 +55,19 @@ class SSHManager:
         self.config = config
         self._connection: Optional[asyncssh.SSHClientConnection] = None
         self._lock = asyncio.Lock()
-        self.cmd_logger = get_command_logger() if config.logging.log_commands else None
+        self.cmd_logger = None
+        if config.logging.log_commands:
+            policy = config.logging.command_policy
+            self.cmd_logger = get_command_logger(policy=CommandLogPolicy(
+                slow_threshold=policy.slow_threshold,
+                success=policy.success,
+                sample_every=policy.sample_every,
+                rules=policy.rules
+            ))
+        self.metrics = get_metrics_registry()
+        self.memory = get_memory_tracker()
+        self.tracer = get_tracer()
+        self._has_connected = False
 
     async def connect(self) -> asyncssh.SSHClientConnection:
         """Get or create SSH connection."""
@@ -48,6 +77,7 @@ class SSHManager:
                 return self._connection
 
             # Create new connection
+            start_time = time.time()
             try:
                 logger.info(f"Connecting to {self.config.vm.host}:{self.config.vm.port}")
 
@@ -69,10 +99,18 @@ class SSHManager:
                     )
 
                 logger.info("SSH connection established")
+
+                self.metrics.inc("ssh_connects_total")
+                if self._has_connected:
+                    self.metrics.inc("ssh_reconnects_total")
+                self._has_connected = True
+                self.metrics.observe("ssh_connect_duration_seconds", time.time() - start_time)
+
                 return self._connection
 
             except Exception as e:
                 logger.error(f"Failed to connect to VM: {e}")
+                self.metrics.inc("ssh_connect_errors_total")
                 raise SSHConnectionError(f"Failed to connect to VM: {e}")
 
     async def execute(
@@ -80,7 +118,8 @@ class SSHManager:
         command: str,
         timeout: Optional[int] = 30,
         check: bool = False,
-        needs_root: bool = False
+        needs_root: bool = False,
+        log_command: Optional[str] = None
     ) -> CommandResult:
         """
         Execute command on remote VM.
@@ -90,6 +129,8 @@ class SSHManager:
             timeout: Command timeout in seconds (None for no timeout)
             check: If True, raise exception on non-zero exit code
             needs_root: If True, execute with root privileges (uses sudo if configured)
+            log_command: Command to record as the original command, for
+                callers that already wrapped command with sudo
 
         Returns:
             CommandResult with stdout, stderr, and exit code
@@ -98,13 +139,39 @@ class SSHManager:
             SSHConnectionError: If connection fails
             asyncio.TimeoutError: If command times out
             RuntimeError: If check=True and command fails
+
+        A command cut short (or never started) because the enclosing tool
+        call's deadline ran out returns exit code 124 instead of raising.
         """
-        conn = await self.connect()
+        # Never run past the deadline of the enclosing tool call
+        requested_timeout = timeout
+        timeout = deadline.clamp_timeout(timeout)
+        deadline_bound = timeout is not None and (requested_timeout is None or timeout < requested_timeout)
+        if timeout is not None and timeout <= 0:
+            deadline.mark_exceeded()
+            self.metrics.inc("ssh_commands_skipped_total", reason="deadline")
+            return CommandResult("", "Deadline exceeded before command started", deadline.DEADLINE_EXIT_CODE)
+
+        # Template the original command so sudo passwords never reach metrics
+        template = self.metrics.command_template(command)
+        span = self.tracer.start_span(
+            "ssh.execute",
+            kind=SPAN_KIND_CLIENT,
+            **{"command.template": template, "command.timeout": timeout, "command.needs_root": needs_root}
+        )
+        try:
+            with self.tracer.span("ssh.connect"):
+                conn = await self.connect()
+        except Exception as e:
+            self.tracer.end_span(span, error=str(e))
+            raise
 
         # Wrap command with sudo if needed
         original_command = command
+        sudo_method = None
         if needs_root and self.config.vm.use_sudo:
             command = self._wrap_with_sudo(command)
+            sudo_method = self.config.vm.sudo_method
 
         # Log command start
         cmd_id = None
@@ -115,26 +182,43 @@ class SSHManager:
                 context={
                     "check": check,
                     "needs_root": needs_root,
-                    "original_command": original_command if needs_root else None
+                    "original_command": log_command or (original_command if needs_root else None)
                 }
             )
+            if span is not None:
+                span.set_attribute("command.id", cmd_id)
+
+        self.metrics.add_gauge("ssh_commands_in_flight", 1)
+        self.metrics.inc("ssh_bytes_sent_total", len(command))
+        memory_window = self.memory.begin()
+        completed = False
+        span_error = None
 
         start_time = time.time()
 
         try:
             logger.debug(f"Executing command: {command}")
 
-            # Run command with timeout
-            if timeout:
-                result = await asyncio.wait_for(
-                    conn.run(command, check=False),
-                    timeout=timeout
-                )
-            else:
-                result = await conn.run(command, check=False)
+            # Run command with timeout; sudo elevation happens inside this round trip
+            with self.tracer.span("ssh.remote", kind=SPAN_KIND_CLIENT, **{"sudo.method": sudo_method}) as remote:
+                if timeout:
+                    result = await asyncio.wait_for(
+                        conn.run(command, check=False),
+                        timeout=timeout
+                    )
+                else:
+                    result = await conn.run(command, check=False)
+                if remote is not None:
+                    remote.set_attribute("command.exit_code", result.exit_status or 0)
 
             duration = time.time() - start_time
 
+            # Counts decoded characters, which matches bytes for ASCII output
+            self.metrics.inc(
+                "ssh_bytes_received_total",
+                len(result.stdout or "") + len(result.stderr or "")
+            )
+
             cmd_result = CommandResult(
                 stdout=result.stdout.strip() if result.stdout else "",
                 stderr=result.stderr.strip() if result.stderr else "",
@@ -147,6 +231,14 @@ class SSHManager:
                 f"stderr length: {len(cmd_result.stderr)}"
             )
 
+            self.metrics.observe("ssh_command_duration_seconds", duration, template=template)
+            self.metrics.inc(
+                "ssh_commands_total",
+                template=template,
+                outcome="ok" if cmd_result.success else "error"
+            )
+            completed = True
+
             # Log command completion
             if self.cmd_logger and cmd_id is not None:
                 self.cmd_logger.log_command_end(
@@ -167,25 +259,260 @@ class SSHManager:
 
         except asyncio.TimeoutError:
             duration = time.time() - start_time
-            logger.error(f"Command timed out after {timeout}s: {command}")
+            span_error = "deadline exceeded" if deadline_bound else "timeout"
+            logger.error(f"Command timed out after {timeout:.1f}s: {command}")
+            self.metrics.observe("ssh_command_duration_seconds", duration, template=template)
+            self.metrics.inc(
+                "ssh_commands_total",
+                template=template,
+                outcome="deadline" if deadline_bound else "timeout"
+            )
 
             # Log timeout error
             if self.cmd_logger and cmd_id is not None:
                 self.cmd_logger.log_command_error(
                     cmd_id=cmd_id,
-                    error=asyncio.TimeoutError(f"Command timed out after {timeout}s")
+                    error=asyncio.TimeoutError(f"Command timed out after {timeout:.1f}s")
                 )
+
+            if deadline_bound:
+                # Let the tool return what it has gathered so far
+                deadline.mark_exceeded()
+                return CommandResult("", "Deadline exceeded", deadline.DEADLINE_EXIT_CODE)
             raise
 
         except Exception as e:
             duration = time.time() - start_time
+            span_error = str(e)
             logger.error(f"Command execution failed: {e}")
+            if not completed:
+                self.metrics.inc("ssh_commands_total", template=template, outcome="exception")
 
             # Log execution error
             if self.cmd_logger and cmd_id is not None:
                 self.cmd_logger.log_command_error(cmd_id=cmd_id, error=e)
             raise
 
+        finally:
+            self.memory.end(memory_window, "command", template=template)
+            self.metrics.add_gauge("ssh_commands_in_flight", -1)
+            self.tracer.end_span(span, error=span_error)
+
+    async def execute_script(
+        self,
+        script: str,
+        timeout: Optional[int] = 30,
+        needs_root: bool = False,
+        remote_timeout: Optional[int] = None
+    ) -> CommandResult:
+        """
+        Execute a multi-line shell script on remote VM.
+
+        The script is shipped base64-encoded to a temporary file and run
+        with ``sh``, so shell variables and quotes inside it survive every
+        sudo method (``su -c "..."`` would otherwise expand them as the
+        login user).
+
+        Args:
+            script: Shell script source
+            timeout: Local command timeout in seconds (None for no timeout)
+            needs_root: If True, run the script with root privileges
+            remote_timeout: If set, the VM kills the script (and everything
+                it started) after this many seconds
+
+        Returns:
+            CommandResult with stdout, stderr, and exit code
+        """
+        if remote_timeout:
+            # Keep the remote kill within the tool call's deadline too
+            remote_timeout = deadline.clamp_timeout(remote_timeout)
+        command = self._script_command(script, needs_root, remote_timeout)
+        # Log the script itself; the wrapped command may carry the sudo password
+        return await self.execute(command, timeout=timeout, log_command=script)
+
+    async def stream_script(
+        self,
+        script: str,
+        on_output: Callable[[str, str], Awaitable[None]],
+        timeout: int = 30,
+        needs_root: bool = False,
+        logged_output: Optional[Callable[[], Tuple[str, str]]] = None
+    ) -> int:
+        """
+        Run a shell script on remote VM, streaming its output line by line.
+
+        The script runs under a remote ``timeout`` and is killed on the VM
+        even when the channel close is not delivered. The local wait allows
+        for the remote kill, so a timeout is reported when the remote
+        ``timeout`` fired; the local one only catches a stuck channel.
+
+        Args:
+            script: Shell script source
+            on_output: Coroutine called with ("stdout" or "stderr", line) for every line
+            timeout: Seconds before the script is killed
+            needs_root: If True, run the script with root privileges
+            logged_output: Returns the (stdout, stderr) text to put in the
+                command log, e.g. the head and tail the caller kept; the
+                logged lengths are the full stream sizes either way
+
+        Returns:
+            Exit code of the script
+
+        Raises:
+            asyncio.TimeoutError: If the script did not finish in time
+        """
+        requested_timeout = timeout
+        timeout = deadline.clamp_timeout(timeout)
+        if timeout <= 0:
+            deadline.mark_exceeded()
+            raise asyncio.TimeoutError("Deadline exceeded before command started")
+
+        command = self._script_command(script, needs_root, remote_timeout=timeout)
+        template = self.metrics.command_template(script)
+
+        cmd_id = None
+        if self.cmd_logger:
+            cmd_id = self.cmd_logger.log_command_start(
+                command=script,
+                timeout=timeout,
+                context={"needs_root": needs_root, "streaming": True}
+            )
+
+        span = self.tracer.start_span(
+            "ssh.stream",
+            kind=SPAN_KIND_CLIENT,
+            **{"command.template": template, "command.timeout": timeout, "command.needs_root": needs_root}
+        )
+        try:
+            process = await self.start_process(command)
+        except Exception as e:
+            logger.error(f"Failed to start streaming command: {e}")
+            self.metrics.inc("ssh_commands_total", template=template, outcome="exception")
+            if self.cmd_logger and cmd_id is not None:
+                self.cmd_logger.log_command_error(cmd_id=cmd_id, error=e)
+            self.tracer.end_span(span, error=str(e))
+            raise
+
+        self.metrics.add_gauge("ssh_commands_in_flight", 1)
+        self.metrics.inc("ssh_bytes_sent_total", len(command))
+        received = {"stdout": 0, "stderr": 0}
+        span_error = None
+        start_time = time.time()
+
+        async def pump(stream, name: str):
+            while True:
+                line = await stream.readline()
+                if not line:
+                    return
+                received[name] += len(line)
+                await on_output(name, line.rstrip("\n"))
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(pump(process.stdout, "stdout"), pump(process.stderr, "stderr")),
+                timeout=timeout + TIMEOUT_KILL_GRACE + STREAM_WAIT_MARGIN
+            )
+            await asyncio.wait_for(process.wait_closed(), timeout=TIMEOUT_KILL_GRACE)
+            exit_code = process.returncode if process.returncode is not None else -1
+
+            duration = time.time() - start_time
+            if exit_code in REMOTE_TIMEOUT_EXIT_CODES and duration >= timeout:
+                raise asyncio.TimeoutError()
+
+            self.metrics.observe("ssh_command_duration_seconds", duration, template=template)
+            self.metrics.inc("ssh_commands_total", template=template, outcome="ok" if exit_code == 0 else "error")
+            if self.cmd_logger and cmd_id is not None:
+                stdout, stderr = logged_output() if logged_output else ("", "")
+                self.cmd_logger.log_command_end(
+                    cmd_id=cmd_id,
+                    exit_code=exit_code,
+                    stdout=stdout,
+                    stderr=stderr,
+                    duration=duration,
+                    stdout_length=received["stdout"],
+                    stderr_length=received["stderr"]
+                )
+            if span is not None:
+                span.set_attribute("command.exit_code", exit_code)
+            return exit_code
+
+        except asyncio.TimeoutError:
+            if timeout < requested_timeout:
+                deadline.mark_exceeded()
+            span_error = "timeout"
+            logger.error(f"Streaming command timed out after {timeout:.1f}s")
+            self.metrics.observe("ssh_command_duration_seconds", time.time() - start_time, template=template)
+            self.metrics.inc("ssh_commands_total", template=template, outcome="timeout")
+            if self.cmd_logger and cmd_id is not None:
+                self.cmd_logger.log_command_error(
+                    cmd_id=cmd_id,
+                    error=asyncio.TimeoutError(f"Command timed out after {timeout}s")
+                )
+            raise
+
+        except Exception as e:
+            span_error = str(e)
+            logger.error(f"Streaming command failed: {e}")
+            self.metrics.inc("ssh_commands_total", template=template, outcome="exception")
+            if self.cmd_logger and cmd_id is not None:
+                self.cmd_logger.log_command_error(cmd_id=cmd_id, error=e)
+            raise
+
+        finally:
+            # Closing the channel also signals the remote side to give up
+            process.close()
+            self.metrics.inc("ssh_bytes_received_total", received["stdout"] + received["stderr"])
+            self.metrics.add_gauge("ssh_commands_in_flight", -1)
+            self.tracer.end_span(span, error=span_error)
+
+    def _script_command(
+        self,
+        script: str,
+        needs_root: bool,
+        remote_timeout: Optional[int]
+    ) -> str:
+        """Build a command that ships a script base64-encoded and runs it."""
+        path = f"/tmp/kali-driver-mcp-{secrets.token_hex(6)}.sh"
+        encoded = base64.b64encode(script.encode()).decode()
+
+        run_cmd = f"sh {path}"
+        if remote_timeout:
+            run_cmd = f"timeout -k {TIMEOUT_KILL_GRACE} {remote_timeout:g} {run_cmd}"
+        if needs_root and self.config.vm.use_sudo:
+            run_cmd = self._wrap_with_sudo(run_cmd)
+
+        return (
+            f"echo {encoded} | base64 -d > {path} && {run_cmd}; "
+            f"status=$?; rm -f {path}; exit $status"
+        )
+
+    async def start_process(
+        self,
+        command: str,
+        needs_root: bool = False
+    ) -> asyncssh.SSHClientProcess:
+        """
+        Start a long-running command on remote VM.
+
+        Unlike execute(), output is not collected or logged; the caller reads
+        the process streams and is responsible for closing it.
+
+        Args:
+            command: Command to start
+            needs_root: If True, execute with root privileges (uses sudo if configured)
+
+        Returns:
+            asyncssh process handle with stdin, stdout and stderr streams
+        """
+        conn = await self.connect()
+
+        if needs_root and self.config.vm.use_sudo:
+            command = self._wrap_with_sudo(command)
+
+        logger.info(f"Starting long-running command: {command}")
+        self.metrics.inc("ssh_processes_started_total")
+        return await conn.create_process(command)
+
     def _wrap_with_sudo(self, command: str) -> str:
         """
         Wrap command with sudo based on configuration.
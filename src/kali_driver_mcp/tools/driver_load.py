@@ -1,7 +1,8 @@
 """Driver loading/unloading tool."""
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
 from ..config import Config
+from ..projection import wants
 from ..ssh_manager import SSHManager
 
 
@@ -13,7 +14,8 @@ async def manage_driver(
     parameters: Optional[Dict[str, str]] = None,
     force: bool = False,
     use_modprobe: bool = True,
-    module_path: Optional[str] = None
+    module_path: Optional[str] = None,
+    fields: Optional[Set[str]] = None
 ) -> Dict[str, Any]:
     """
     Load, unload, or get info about kernel modules.
@@ -26,7 +28,8 @@ async def manage_driver(
         parameters: Module parameters (key=value pairs)
         force: Force unload
         use_modprobe: Use modprobe instead of insmod (default: True)
-        module_path: Optional path to .ko file (for insmod)
+        module_path: Optional path to .ko file (for insmod and reload)
+        fields: Optional set of result fields to fetch (default: all)
 
     Returns:
         Dictionary with operation results
@@ -121,7 +124,8 @@ async def manage_driver(
         unload_result = await ssh.execute(f"rmmod {module_name}", needs_root=True)
 
         # Then load
-        module_path = f"{vm_path}/{module_name}.ko"
+        if not module_path:
+            module_path = f"{vm_path}/{module_name}.ko"
         load_cmd = f"insmod {module_path}"
         if parameters:
             params_str = " ".join([f"{k}={v}" for k, v in parameters.items()])
@@ -136,7 +140,8 @@ async def manage_driver(
             result["error"] = load_result.stderr
 
     elif operation == "info":
-        # First try to get info from file
+        # modinfo also checks that the module exists, so it runs even when
+        # only the loaded state was requested
         module_path = f"{vm_path}/{module_name}.ko"
         file_info_cmd = f"modinfo {module_path} 2>/dev/null || modinfo {module_name}"
 
@@ -144,21 +149,24 @@ async def manage_driver(
 
         if info_result.success:
             result["success"] = True
-            result["info"] = info_result.stdout
-
-            # Parse key information
-            info_dict = {}
-            for line in info_result.stdout.split("\n"):
-                if ":" in line:
-                    key, value = line.split(":", 1)
-                    info_dict[key.strip()] = value.strip()
-            result["parsed_info"] = info_dict
+            if wants(fields, "info"):
+                result["info"] = info_result.stdout
+
+            if wants(fields, "parsed_info"):
+                # Parse key information
+                info_dict = {}
+                for line in info_result.stdout.split("\n"):
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        info_dict[key.strip()] = value.strip()
+                result["parsed_info"] = info_dict
         else:
             result["error"] = "Module information not available"
 
         # Check if module is loaded
-        lsmod_result = await ssh.execute(f"lsmod | grep '^{module_name} '")
-        result["loaded"] = lsmod_result.success
+        if wants(fields, "loaded"):
+            lsmod_result = await ssh.execute(f"lsmod | grep '^{module_name} '")
+            result["loaded"] = lsmod_result.success
 
     elif operation == "list":
         # List all loaded modules
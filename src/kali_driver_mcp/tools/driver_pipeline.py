@@ -0,0 +1,222 @@
+"""Build-load-verify pipeline tool.
+
+Runs the usual driver inner loop (compile, reload, read new kernel messages,
+check interfaces) server-side in a single tool call. Independent steps are
+overlapped: the dmesg/interface baseline is taken while the build runs, and
+the post-load kernel messages and interface state are fetched together.
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, Optional, List
+from ..config import Config
+from ..ssh_manager import SSHManager
+from .driver_compile import compile_driver
+from .driver_load import manage_driver
+
+# Number of trailing build output lines returned when the build fails
+BUILD_ERROR_TAIL_LINES = 30
+
+
+async def run_driver_pipeline(
+    config: Config,
+    ssh: SSHManager,
+    module_name: str,
+    target: Optional[str] = None,
+    clean: bool = False,
+    directory: Optional[str] = None,
+    parameters: Optional[Dict[str, str]] = None,
+    interface: Optional[str] = None,
+    filter_pattern: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Compile, reload and verify a driver module in one call.
+
+    Args:
+        config: Configuration object
+        ssh: SSH manager
+        module_name: Module name (without .ko extension)
+        target: Optional specific make target (default: all)
+        clean: Force clean build
+        directory: Subdirectory to compile in (relative to vm_path)
+        parameters: Module parameters (key=value pairs)
+        interface: Optional interface whose state is reported after load
+        filter_pattern: Optional regex applied to the new kernel messages
+
+    Returns:
+        Dictionary with per-phase results and timings
+    """
+    pipeline_start = time.time()
+    timings: Dict[str, float] = {}
+
+    result: Dict[str, Any] = {
+        "module_name": module_name,
+        "success": False,
+        "failed_phase": None,
+        "timings": timings
+    }
+
+    # Phase 1: build, overlapped with the dmesg/interface baseline
+    build_result, baseline = await asyncio.gather(
+        _timed(timings, "build", compile_driver(
+            config,
+            ssh,
+            target=target,
+            clean=clean,
+            directory=directory
+        )),
+        _timed(timings, "snapshot", _take_snapshot(ssh))
+    )
+
+    result["build"] = {
+        "success": build_result["success"],
+        "exit_code": build_result.get("exit_code"),
+        "cleaned": build_result["cleaned"],
+        "artifacts": build_result["artifacts"]
+    }
+
+    if not build_result["success"]:
+        error = build_result.get("error", "")
+        result["build"]["error"] = _tail(error, BUILD_ERROR_TAIL_LINES)
+        result["failed_phase"] = "build"
+        timings["total"] = round(time.time() - pipeline_start, 3)
+        return result
+
+    # Phase 2: reload the freshly built module
+    module_path = _built_module_path(
+        config.shared_folder.vm_path,
+        module_name,
+        directory,
+        build_result["artifacts"]
+    )
+    load_result = await _timed(timings, "load", manage_driver(
+        config,
+        ssh,
+        operation="reload",
+        module_name=module_name,
+        parameters=parameters,
+        module_path=module_path
+    ))
+
+    result["load"] = {
+        "success": load_result["success"],
+        "module_path": module_path,
+        "message": load_result.get("message"),
+        "error": load_result.get("error")
+    }
+
+    # Phase 3: new kernel messages and interface state, fetched together.
+    # Run even if the load failed, since dmesg usually explains why.
+    new_messages, interfaces = await _timed(timings, "verify", asyncio.gather(
+        _new_kernel_messages(
+            ssh,
+            baseline["dmesg_timestamp"],
+            config.logging.max_lines,
+            filter_pattern
+        ),
+        _list_interfaces(ssh)
+    ))
+
+    result["kernel_messages"] = new_messages
+    result["interfaces"] = {
+        "current": interfaces,
+        "added": sorted(set(interfaces) - set(baseline["interfaces"])),
+        "removed": sorted(set(baseline["interfaces"]) - set(interfaces))
+    }
+
+    if interface:
+        state_result = await ssh.execute(f"cat /sys/class/net/{interface}/operstate 2>/dev/null")
+        result["interfaces"]["target"] = {
+            "name": interface,
+            "present": state_result.success,
+            "state": state_result.stdout if state_result.success else None
+        }
+
+    if load_result["success"]:
+        result["success"] = True
+    else:
+        result["failed_phase"] = "load"
+
+    timings["total"] = round(time.time() - pipeline_start, 3)
+    return result
+
+
+def _built_module_path(vm_path: str, module_name: str, directory: Optional[str], artifacts: List[str]) -> str:
+    """Path of the .ko the build produced for a module (build directory by default)."""
+    # Kernel module names treat '-' and '_' alike
+    wanted = f"{module_name}.ko".replace("-", "_")
+    for artifact in artifacts:
+        if artifact.rsplit("/", 1)[-1].replace("-", "_") == wanted:
+            return artifact
+    build_dir = f"{vm_path}/{directory}" if directory else vm_path
+    return f"{build_dir}/{module_name}.ko"
+
+
+async def _timed(timings: Dict[str, float], phase: str, awaitable):
+    """Await a phase and record its wall time in seconds."""
+    start_time = time.time()
+    try:
+        return await awaitable
+    finally:
+        timings[phase] = round(time.time() - start_time, 3)
+
+
+async def _take_snapshot(ssh: SSHManager) -> Dict[str, Any]:
+    """Record the last dmesg timestamp and the current interface names."""
+    dmesg_result, interfaces = await asyncio.gather(
+        ssh.execute("dmesg | tail -n 1", needs_root=True),
+        _list_interfaces(ssh)
+    )
+
+    return {
+        "dmesg_timestamp": _parse_dmesg_timestamp(dmesg_result.stdout) if dmesg_result.success else None,
+        "interfaces": interfaces
+    }
+
+
+async def _list_interfaces(ssh: SSHManager) -> List[str]:
+    """List network interface names."""
+    list_result = await ssh.execute("ls /sys/class/net/")
+    if list_result.success:
+        return list_result.stdout.split()
+    return []
+
+
+async def _new_kernel_messages(
+    ssh: SSHManager,
+    since_timestamp: Optional[float],
+    max_lines: int,
+    filter_pattern: Optional[str] = None
+) -> List[str]:
+    """Fetch kernel messages logged after the baseline timestamp."""
+    if since_timestamp is None:
+        # No baseline (empty or unreadable ring buffer): return everything
+        cmd = "dmesg"
+    else:
+        cmd = f"dmesg | awk -F'[][]' '$2 + 0 > {since_timestamp}'"
+
+    if filter_pattern:
+        cmd += f" | grep -E '{filter_pattern}'"
+
+    cmd += f" | tail -n {max_lines}"
+
+    exec_result = await ssh.execute(cmd, needs_root=True)
+    if exec_result.success and exec_result.stdout:
+        return exec_result.stdout.split("\n")
+    return []
+
+
+def _parse_dmesg_timestamp(line: str) -> Optional[float]:
+    """Extract the seconds-since-boot timestamp from a raw dmesg line."""
+    line = line.strip()
+    if not line.startswith("[") or "]" not in line:
+        return None
+    try:
+        return float(line[1:line.index("]")].strip())
+    except ValueError:
+        return None
+
+
+def _tail(text: str, lines: int) -> str:
+    """Return the last N lines of text."""
+    return "\n".join(text.split("\n")[-lines:])
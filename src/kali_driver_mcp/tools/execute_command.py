@@ -2,72 +2,128 @@
 
 This tool allows executing any shell command on the Kali VM.
 Use with caution as it has full system access (via sudo).
+
+Output is streamed line by line: only the first ``head_lines`` and last
+``tail_lines`` lines of each stream are kept, so long-running diagnostics
+(``perf stat``, ``dmesg -w``, ``cat /proc/interrupts``) cannot flood the
+response, and the command is killed on the VM when it times out.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any
+import time
+from collections import deque
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+from ..config import Config
 from ..ssh_manager import SSHManager
 
 logger = logging.getLogger(__name__)
 
+# Longest single output line kept, in characters
+MAX_LINE_LENGTH = 4096
+
+
+class OutputBuffer:
+    """Keeps the head and tail lines of a stream."""
+
+    def __init__(self, head_lines: int, tail_lines: int):
+        self.head_lines = head_lines
+        self.head: List[str] = []
+        self.tail: deque = deque(maxlen=tail_lines)
+        self.total_lines = 0
+
+    def add(self, line: str):
+        """Record one output line."""
+        self.total_lines += 1
+        if len(line) > MAX_LINE_LENGTH:
+            line = line[:MAX_LINE_LENGTH] + "..."
+        if len(self.head) < self.head_lines:
+            self.head.append(line)
+        elif self.tail.maxlen:
+            self.tail.append(line)
+
+    @property
+    def omitted_lines(self) -> int:
+        """Number of lines dropped between head and tail."""
+        return self.total_lines - len(self.head) - len(self.tail)
+
+    def text(self) -> str:
+        """Return the kept output with a marker where lines were dropped."""
+        lines = list(self.head)
+        if self.omitted_lines:
+            lines.append(f"... [{self.omitted_lines} lines omitted] ...")
+        lines.extend(self.tail)
+        return "\n".join(lines).strip()
+
 
 async def execute_command(
-    ssh_manager: SSHManager,
+    config: Config,
+    ssh: SSHManager,
     command: str,
     use_sudo: bool = False,
-    timeout: int = 30
+    timeout: int = 30,
+    head_lines: int = 100,
+    tail_lines: int = 100,
+    progress: Optional[Callable[[int, str], Awaitable[None]]] = None
 ) -> Dict[str, Any]:
     """
     Execute a shell command on the Kali VM.
 
     Args:
-        ssh_manager: SSH connection manager
+        config: Configuration object
+        ssh: SSH manager
         command: Command to execute
-        use_sudo: Whether to run with sudo
-        timeout: Command timeout in seconds
+        use_sudo: Whether to run with root privileges
+        timeout: Seconds before the command is killed on the VM
+        head_lines: Lines kept from the start of each stream
+        tail_lines: Lines kept from the end of each stream
+        progress: Optional coroutine called with (lines received, latest line)
 
     Returns:
         Result containing command output and status
     """
-    try:
-        # Prepare command
-        if use_sudo:
-            # Already handled by ssh_manager's execute_command
-            pass
+    result = {"command": command, "success": False}
+    buffers = {
+        "stdout": OutputBuffer(head_lines, tail_lines),
+        "stderr": OutputBuffer(head_lines, tail_lines)
+    }
 
-        # Execute command
-        exit_code, stdout, stderr = await ssh_manager.execute_command(
+    async def on_output(stream: str, line: str):
+        buffers[stream].add(line)
+        if progress:
+            await progress(buffers["stdout"].total_lines + buffers["stderr"].total_lines, line)
+
+    start_time = time.time()
+    try:
+        exit_code = await ssh.stream_script(
             command,
-            timeout=timeout
+            on_output,
+            timeout=timeout,
+            needs_root=use_sudo,
+            logged_output=lambda: (buffers["stdout"].text(), buffers["stderr"].text())
         )
+        result["exit_code"] = exit_code
+        result["success"] = exit_code == 0
 
-        success = exit_code == 0
-
-        result = {
-            "success": success,
-            "exit_code": exit_code,
-            "stdout": stdout.strip() if stdout else "",
-            "stderr": stderr.strip() if stderr else "",
-            "command": command
-        }
-
-        if not success:
+        if not result["success"]:
             result["error"] = f"Command exited with code {exit_code}"
-            if stderr:
-                result["error"] += f": {stderr.strip()}"
-
-        return result
 
     except asyncio.TimeoutError:
-        return {
-            "success": False,
-            "error": f"Command timed out after {timeout} seconds",
-            "command": command
-        }
+        result["timed_out"] = True
+        result["error"] = f"Command timed out after {timeout} seconds and was killed"
+
     except Exception as e:
         logger.error(f"Command execution failed: {e}")
-        return {
-            "success": False,
-            "error": str(e),
-            "command": command
-        }
+        result["error"] = str(e)
+
+    result["duration"] = round(time.time() - start_time, 3)
+    for stream, buffer in buffers.items():
+        result[stream] = buffer.text()
+        result[f"{stream}_lines"] = buffer.total_lines
+        if buffer.omitted_lines:
+            result[f"{stream}_truncated"] = True
+
+    if result.get("exit_code") and result["stderr"]:
+        result["error"] += f": {result['stderr'].splitlines()[-1]}"
+
+    return result
@@ -0,0 +1,84 @@
+"""udev hotplug event tool."""
+
+from typing import Dict, Any, Optional
+from .. import deadline
+from ..config import Config
+from ..hotplug import HotplugMonitor
+
+
+async def manage_hotplug_events(
+    config: Config,
+    monitor: HotplugMonitor,
+    operation: str = "query",
+    since_seq: int = 0,
+    action: Optional[str] = None,
+    subsystem: Optional[str] = None,
+    match: Optional[str] = None,
+    limit: Optional[int] = 100,
+    timeout: int = 60
+) -> Dict[str, Any]:
+    """
+    Start, stop, query or await the udev hotplug event stream.
+
+    Args:
+        config: Configuration object
+        monitor: Hotplug monitor
+        operation: "start", "stop", "status", "query", or "wait"
+        since_seq: Only consider events with a sequence number above this
+        action: Event action filter (add, remove, bind, unbind, change)
+        subsystem: Subsystem filter (usb, net, ...)
+        match: Regex searched in the devpath and event properties
+        limit: Maximum number of events returned by query
+        timeout: Seconds to wait for a matching event (wait operation)
+
+    Returns:
+        Dictionary with monitor status and events
+    """
+    result = {"operation": operation, "success": False}
+
+    if operation in ("query", "wait") and not monitor.running:
+        # Querying implies interest in the stream, so start it on demand
+        await monitor.start()
+
+    if operation == "start":
+        await monitor.start()
+        result["success"] = True
+
+    elif operation == "stop":
+        await monitor.stop()
+        result["success"] = True
+
+    elif operation == "status":
+        result["success"] = True
+
+    elif operation == "query":
+        result["events"] = monitor.query(
+            since_seq=since_seq,
+            action=action,
+            subsystem=subsystem,
+            match=match,
+            limit=limit
+        )
+        result["success"] = True
+
+    elif operation == "wait":
+        event = await monitor.wait_for(
+            since_seq=since_seq,
+            action=action,
+            subsystem=subsystem,
+            match=match,
+            timeout=deadline.clamp_timeout(timeout)
+        )
+        result["success"] = True
+        result["matched"] = event is not None
+        if event is not None:
+            result["event"] = event
+        else:
+            result["timed_out"] = True
+
+    else:
+        result["error"] = f"Unknown operation: {operation}"
+        return result
+
+    result["status"] = monitor.status()
+    return result
@@ -1,14 +1,16 @@
 """Kernel information tool."""
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Set
 from ..config import Config
+from ..projection import wants
 from ..ssh_manager import SSHManager
 
 
 async def get_kernel_info(
     config: Config,
     ssh: SSHManager,
-    detail_level: str = "basic"
+    detail_level: str = "basic",
+    fields: Optional[Set[str]] = None
 ) -> Dict[str, Any]:
     """
     Get kernel version and configuration information.
@@ -17,6 +19,7 @@ async def get_kernel_info(
         config: Configuration object
         ssh: SSH manager
         detail_level: "basic" or "full"
+        fields: Optional set of result fields to fetch (default: all)
 
     Returns:
         Dictionary with kernel information
@@ -24,38 +27,44 @@ async def get_kernel_info(
     result = {}
 
     # Always get basic info
-    version_result = await ssh.execute("uname -r")
-    if version_result.success:
-        result["version"] = version_result.stdout
+    if wants(fields, "version"):
+        version_result = await ssh.execute("uname -r")
+        if version_result.success:
+            result["version"] = version_result.stdout
 
-    arch_result = await ssh.execute("uname -m")
-    if arch_result.success:
-        result["architecture"] = arch_result.stdout
+    if wants(fields, "architecture"):
+        arch_result = await ssh.execute("uname -m")
+        if arch_result.success:
+            result["architecture"] = arch_result.stdout
 
     if detail_level == "full":
         # Full system info
-        full_result = await ssh.execute("uname -a")
-        if full_result.success:
-            result["full_info"] = full_result.stdout
+        if wants(fields, "full_info"):
+            full_result = await ssh.execute("uname -a")
+            if full_result.success:
+                result["full_info"] = full_result.stdout
 
         # Detailed version
-        proc_version = await ssh.execute("cat /proc/version")
-        if proc_version.success:
-            result["proc_version"] = proc_version.stdout
+        if wants(fields, "proc_version"):
+            proc_version = await ssh.execute("cat /proc/version")
+            if proc_version.success:
+                result["proc_version"] = proc_version.stdout
 
         # Kernel build date
-        build_date = await ssh.execute("uname -v")
-        if build_date.success:
-            result["build_date"] = build_date.stdout
+        if wants(fields, "build_date"):
+            build_date = await ssh.execute("uname -v")
+            if build_date.success:
+                result["build_date"] = build_date.stdout
 
         # Loaded modules count
-        modules_count = await ssh.execute("lsmod | wc -l")
-        if modules_count.success:
-            try:
-                # Subtract 1 for header line
-                count = int(modules_count.stdout.strip()) - 1
-                result["loaded_modules_count"] = count
-            except ValueError:
-                result["loaded_modules_count"] = 0
+        if wants(fields, "loaded_modules_count"):
+            modules_count = await ssh.execute("lsmod | wc -l")
+            if modules_count.success:
+                try:
+                    # Subtract 1 for header line
+                    count = int(modules_count.stdout.strip()) - 1
+                    result["loaded_modules_count"] = count
+                except ValueError:
+                    result["loaded_modules_count"] = 0
 
     return result
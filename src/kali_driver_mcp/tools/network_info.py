@@ -1,7 +1,8 @@
 """Network interface information tool."""
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
 from ..config import Config
+from ..projection import wants
 from ..ssh_manager import SSHManager
 
 
@@ -10,7 +11,8 @@ async def get_network_info(
     ssh: SSHManager,
     interface: str = "all",
     detail_level: str = "basic",
-    info_type: str = "status"
+    info_type: str = "status",
+    fields: Optional[Set[str]] = None
 ) -> Dict[str, Any]:
     """
     Query network interface information.
@@ -21,6 +23,7 @@ async def get_network_info(
         interface: Interface name or "all"
         detail_level: "basic", "detailed", or "statistics"
         info_type: "status", "driver", "settings", or "stats"
+        fields: Optional set of result fields to fetch (default: all)
 
     Returns:
         Dictionary with network interface information
@@ -32,22 +35,28 @@ async def get_network_info(
     }
 
     if interface == "all":
-        # List all interfaces
-        cmd = "ip link"
-        exec_result = await ssh.execute(cmd)
-
-        if exec_result.success:
+        # List all interfaces (the raw "ip link" output is skipped when
+        # only the interface names were requested)
+        if wants(fields, "output"):
+            cmd = "ip link"
+            exec_result = await ssh.execute(cmd)
+
+            if exec_result.success:
+                result["success"] = True
+                result["output"] = exec_result.stdout
+            else:
+                result["success"] = False
+                result["error"] = exec_result.stderr
+                return result
+        else:
             result["success"] = True
-            result["output"] = exec_result.stdout
 
-            # Also list interface names
+        # Also list interface names
+        if wants(fields, "interfaces"):
             list_cmd = "ls /sys/class/net/"
             list_result = await ssh.execute(list_cmd)
             if list_result.success:
                 result["interfaces"] = list_result.stdout.split()
-        else:
-            result["success"] = False
-            result["error"] = exec_result.stderr
 
     else:
         # Specific interface
@@ -55,43 +64,48 @@ async def get_network_info(
 
         if info_type == "status" or detail_level in ["detailed", "statistics"]:
             # Get link status
-            link_cmd = f"ip link show {interface}"
-            link_result = await ssh.execute(link_cmd)
-            if link_result.success:
-                interface_data["link_info"] = link_result.stdout
+            if wants(fields, "interface_data.link_info"):
+                link_cmd = f"ip link show {interface}"
+                link_result = await ssh.execute(link_cmd)
+                if link_result.success:
+                    interface_data["link_info"] = link_result.stdout
 
             # Get addresses
-            addr_cmd = f"ip addr show {interface}"
-            addr_result = await ssh.execute(addr_cmd)
-            if addr_result.success:
-                interface_data["addr_info"] = addr_result.stdout
+            if wants(fields, "interface_data.addr_info"):
+                addr_cmd = f"ip addr show {interface}"
+                addr_result = await ssh.execute(addr_cmd)
+                if addr_result.success:
+                    interface_data["addr_info"] = addr_result.stdout
 
             # Get operational state
-            state_cmd = f"cat /sys/class/net/{interface}/operstate 2>/dev/null"
-            state_result = await ssh.execute(state_cmd)
-            if state_result.success:
-                interface_data["state"] = state_result.stdout
+            if wants(fields, "interface_data.state"):
+                state_cmd = f"cat /sys/class/net/{interface}/operstate 2>/dev/null"
+                state_result = await ssh.execute(state_cmd)
+                if state_result.success:
+                    interface_data["state"] = state_result.stdout
 
             # Get MAC address
-            mac_cmd = f"cat /sys/class/net/{interface}/address 2>/dev/null"
-            mac_result = await ssh.execute(mac_cmd)
-            if mac_result.success:
-                interface_data["mac_address"] = mac_result.stdout
+            if wants(fields, "interface_data.mac_address"):
+                mac_cmd = f"cat /sys/class/net/{interface}/address 2>/dev/null"
+                mac_result = await ssh.execute(mac_cmd)
+                if mac_result.success:
+                    interface_data["mac_address"] = mac_result.stdout
 
-        if info_type == "driver" or detail_level == "detailed":
+        if (info_type == "driver" or detail_level == "detailed") and wants(fields, "interface_data.driver_info"):
             # Get driver information using ethtool
             driver_cmd = f"ethtool -i {interface} 2>/dev/null"
             driver_result = await ssh.execute(driver_cmd)
             if driver_result.success:
                 interface_data["driver_info"] = driver_result.stdout
 
-        if info_type == "stats" or detail_level == "statistics":
+        if (info_type == "stats" or detail_level == "statistics") and wants(fields, "interface_data.statistics"):
             # Get statistics
             stats_cmd = f"ip -s link show {interface}"
             stats_result = await ssh.execute(stats_cmd)
             if stats_result.success:
                 interface_data["statistics"] = stats_result.stdout
 
+        if (info_type == "stats" or detail_level == "statistics") and wants(fields, "interface_data.detailed_stats"):
             # Get detailed stats from sysfs
             rx_packets_cmd = f"cat /sys/class/net/{interface}/statistics/rx_packets 2>/dev/null"
             tx_packets_cmd = f"cat /sys/class/net/{interface}/statistics/tx_packets 2>/dev/null"
@@ -112,12 +126,13 @@ async def get_network_info(
                 }
 
         # Check if it's a wireless interface
-        wireless_check = await ssh.execute(f"iw dev {interface} info 2>/dev/null")
-        if wireless_check.success:
-            interface_data["wireless"] = True
-            interface_data["wireless_info"] = wireless_check.stdout
-        else:
-            interface_data["wireless"] = False
+        if wants(fields, "interface_data.wireless") or wants(fields, "interface_data.wireless_info"):
+            wireless_check = await ssh.execute(f"iw dev {interface} info 2>/dev/null")
+            if wireless_check.success:
+                interface_data["wireless"] = True
+                interface_data["wireless_info"] = wireless_check.stdout
+            else:
+                interface_data["wireless"] = False
 
         result["success"] = True
         result["interface_data"] = interface_data
@@ -1,10 +1,15 @@
 """Packet capture tool (airodump-ng)."""
 
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
+from .. import deadline
 from ..config import Config
+from ..projection import wants
 from ..ssh_manager import SSHManager
 
+# Seconds of the tool call deadline kept for reading the capture files
+RESULT_READ_RESERVE = 5
+
 
 async def capture_packets(
     config: Config,
@@ -12,7 +17,8 @@ async def capture_packets(
     channel: Optional[int] = None,
     bssid: Optional[str] = None,
     duration: Optional[int] = None,
-    output_prefix: str = "capture"
+    output_prefix: str = "capture",
+    fields: Optional[Set[str]] = None
 ) -> Dict[str, Any]:
     """
     Capture wireless packets using airodump-ng.
@@ -24,6 +30,7 @@ async def capture_packets(
         bssid: Optional specific AP MAC address
         duration: Optional duration override (seconds)
         output_prefix: Filename prefix for capture files
+        fields: Optional set of result fields to fetch (default: all)
 
     Returns:
         Dictionary with capture results
@@ -31,6 +38,7 @@ async def capture_packets(
     monitor_interface = config.network.monitor_interface
     capture_channel = channel or config.network.default_channel
     capture_duration = duration or config.capture.default_duration
+    requested_duration = capture_duration
     output_dir = config.capture.output_dir
     output_format = config.capture.output_format
     update_interval = config.capture.update_interval
@@ -51,6 +59,13 @@ async def capture_packets(
         result["error"] = f"Monitor interface {monitor_interface} not found. Run network_monitor start first."
         return result
 
+    # Shorten the capture so its results can still be read within the deadline
+    left = deadline.remaining()
+    if left is not None and left - RESULT_READ_RESERVE < capture_duration:
+        capture_duration = max(1, int(left - RESULT_READ_RESERVE))
+        result["duration"] = capture_duration
+        result["requested_duration"] = requested_duration
+
     # Ensure output directory exists
     mkdir_cmd = f"mkdir -p {output_dir}"
     await ssh.execute(mkdir_cmd)
@@ -92,6 +107,12 @@ async def capture_packets(
         result["success"] = True
         result["output"] = exec_result.stdout
 
+        # Only touch the capture files for fields that need them
+        want_csv = wants(fields, "csv_data") or wants(fields, "networks")
+        want_count = wants(fields, "packets_captured")
+        if not (wants(fields, "capture_files") or want_csv or want_count):
+            return result
+
         # List generated files
         list_cmd = f"ls -lh {output_dir}/{output_prefix}* 2>/dev/null"
         list_result = await ssh.execute(list_cmd)
@@ -111,19 +132,21 @@ async def capture_packets(
 
         # Parse CSV file if it exists
         csv_files = [f for f in result.get("capture_files", []) if f["filename"].endswith(".csv")]
-        if csv_files:
+        if csv_files and want_csv:
             csv_path = csv_files[0]["filename"]
             csv_cmd = f"cat {csv_path}"
             csv_result = await ssh.execute(csv_cmd)
 
             if csv_result.success:
-                result["csv_data"] = csv_result.stdout
+                if wants(fields, "csv_data"):
+                    result["csv_data"] = csv_result.stdout
                 # Parse networks from CSV
-                result["networks"] = _parse_airodump_csv(csv_result.stdout)
+                if wants(fields, "networks"):
+                    result["networks"] = _parse_airodump_csv(csv_result.stdout)
 
         # Count packets in cap file if exists
         cap_files = [f for f in result.get("capture_files", []) if f["filename"].endswith(".cap")]
-        if cap_files:
+        if cap_files and want_count:
             cap_path = cap_files[0]["filename"]
             count_cmd = f"tcpdump -r {cap_path} 2>/dev/null | wc -l"
             count_result = await ssh.execute(count_cmd)
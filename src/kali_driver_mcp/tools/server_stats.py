@@ -0,0 +1,56 @@
+"""Server statistics tool."""
+
+from typing import Dict, Any, Optional
+from ..config import Config
+from ..loop_monitor import LoopMonitor
+from ..memory import MemoryTracker
+from ..metrics import MetricsRegistry
+
+
+async def get_server_stats(
+    config: Config,
+    metrics: MetricsRegistry,
+    reset: bool = False,
+    loop_monitor: Optional[LoopMonitor] = None,
+    memory: Optional[MemoryTracker] = None,
+    memory_top: int = 0
+) -> Dict[str, Any]:
+    """
+    Report in-process performance metrics.
+
+    Args:
+        config: Configuration object
+        metrics: Metrics registry
+        reset: Clear counters and histograms after taking the snapshot
+            (gauges of live state are kept)
+        loop_monitor: Event loop monitor, if running
+        memory: Memory tracker
+        memory_top: If positive, include this many top allocation sites
+
+    Returns:
+        Dictionary with counters, gauges, latency histograms, cache hit ratios,
+        event loop health and (on request) allocation sites
+    """
+    result = metrics.snapshot()
+
+    if loop_monitor is not None:
+        result["event_loop"] = loop_monitor.stats()
+
+    if memory is not None and memory_top > 0:
+        result["memory"] = memory.report(top=memory_top)
+
+    # Refresh the Prometheus dump so it matches what was returned
+    if config.metrics.prometheus_file:
+        try:
+            metrics.write_prometheus(config.metrics.prometheus_file)
+            result["prometheus_file"] = config.metrics.prometheus_file
+        except OSError as e:
+            result["prometheus_error"] = str(e)
+
+    if reset:
+        metrics.reset()
+        if loop_monitor is not None:
+            loop_monitor.reset()
+        result["reset"] = True
+
+    return result
@@ -0,0 +1,190 @@
+"""Server-side wait-for-condition tool.
+
+Blocks until a predicate holds on the VM or a timeout expires, so agents do
+not have to poll with repeated tool calls. Each wait is a single remote
+script driven by an event source (``ip monitor``, ``udevadm monitor``,
+``dmesg -W`` or ``inotifywait``): the predicate is checked once after the
+watcher is subscribed and again on every event, never on a timer.
+"""
+
+import posixpath
+import shlex
+import time
+from typing import Dict, Any, Optional
+from ..config import Config
+from ..ssh_manager import SSHManager
+
+CONDITIONS = [
+    "interface_present",
+    "interface_absent",
+    "interface_up",
+    "module_loaded",
+    "module_unloaded",
+    "dmesg_match",
+    "file_exists"
+]
+
+# Extra seconds the local SSH timeout allows beyond the remote one
+TIMEOUT_GRACE_SECONDS = 10
+
+# Exit codes of the watch script
+_EXIT_MATCHED = 0
+_EXIT_SETUP_FAILED = 2
+_EXIT_WATCHER_ENDED = 3
+_EXIT_TIMEOUT = 124
+
+_WATCH_SCRIPT = """\
+f=$(mktemp -u /tmp/kali-driver-mcp-wait.XXXXXX)
+mkfifo "$f" || exit {setup_failed}
+trap 'trap "" TERM; kill "$w" 2>/dev/null; rm -f "$f"' EXIT
+trap 'exit {timed_out}' TERM
+{watcher} > "$f" 2>/dev/null &
+w=$!
+exec 3< "$f"
+sleep 0.1
+if {check}; then echo MATCHED; exit 0; fi
+while read -r line <&3; do
+    if {line_check}; then printf 'MATCHED %s\\n' "$line"; exit 0; fi
+done
+exit {watcher_ended}
+"""
+
+
+async def wait_for_condition(
+    config: Config,
+    ssh: SSHManager,
+    condition: str,
+    target: Optional[str] = None,
+    pattern: Optional[str] = None,
+    timeout: int = 60,
+    include_existing: bool = False
+) -> Dict[str, Any]:
+    """
+    Wait on the VM until a condition holds or the timeout expires.
+
+    Args:
+        config: Configuration object
+        ssh: SSH manager
+        condition: One of CONDITIONS
+        target: Interface name, module name or absolute file path the condition applies to
+        pattern: Extended regex for "dmesg_match"
+        timeout: Maximum seconds to wait
+        include_existing: For "dmesg_match", also match messages already in the ring buffer
+
+    Returns:
+        Dictionary with match status and time waited
+    """
+    result = {
+        "condition": condition,
+        "target": target,
+        "timeout": timeout,
+        "matched": False,
+        "timed_out": False
+    }
+
+    if condition not in CONDITIONS:
+        result["error"] = f"Unknown condition: {condition}"
+        return result
+
+    if condition == "dmesg_match":
+        if not pattern:
+            result["error"] = "pattern is required for dmesg_match"
+            return result
+        result["pattern"] = pattern
+    elif not target:
+        result["error"] = f"target is required for {condition}"
+        return result
+    elif condition == "file_exists" and not posixpath.isabs(target):
+        result["error"] = f"target must be an absolute path for file_exists: {target}"
+        return result
+
+    script = build_watch_script(condition, target, pattern, include_existing)
+
+    start_time = time.time()
+    exec_result = await ssh.execute_script(
+        script,
+        timeout=timeout + TIMEOUT_GRACE_SECONDS,
+        needs_root=True,
+        remote_timeout=timeout
+    )
+    result["waited_seconds"] = round(time.time() - start_time, 3)
+
+    if exec_result.exit_code == _EXIT_MATCHED:
+        result["matched"] = True
+        if condition == "dmesg_match":
+            result["matched_line"] = exec_result.stdout.split("\n")[-1][len("MATCHED"):].strip()
+    elif exec_result.exit_code == _EXIT_TIMEOUT:
+        result["timed_out"] = True
+    elif exec_result.exit_code == _EXIT_WATCHER_ENDED:
+        result["error"] = f"Event watcher exited unexpectedly: {exec_result.stderr}".rstrip(": ")
+    else:
+        result["error"] = exec_result.stderr or f"Wait failed with exit code {exec_result.exit_code}"
+
+    return result
+
+
+def build_watch_script(
+    condition: str,
+    target: Optional[str],
+    pattern: Optional[str] = None,
+    include_existing: bool = False
+) -> str:
+    """
+    Build the remote watch script for a condition.
+
+    Args:
+        condition: One of CONDITIONS
+        target: Interface name, module name or absolute file path
+        pattern: Extended regex for "dmesg_match"
+        include_existing: For "dmesg_match", replay the existing ring buffer
+
+    Returns:
+        Shell script source
+    """
+    if condition in ("interface_present", "interface_absent", "interface_up"):
+        watcher = "ip monitor link"
+        sys_path = shlex.quote(f"/sys/class/net/{target}")
+        if condition == "interface_present":
+            check = f"test -e {sys_path}"
+        elif condition == "interface_absent":
+            check = f"! test -e {sys_path}"
+        else:
+            check = f"grep -qx up {sys_path}/operstate 2>/dev/null"
+        line_check = check
+
+    elif condition in ("module_loaded", "module_unloaded"):
+        # /proc/modules always uses underscores
+        module = shlex.quote(f"^{target.replace('-', '_')} ")
+        watcher = "udevadm monitor --kernel --subsystem-match=module"
+        check = f"grep -q {module} /proc/modules"
+        if condition == "module_unloaded":
+            check = f"! {check}"
+        line_check = check
+
+    elif condition == "dmesg_match":
+        watcher = "dmesg -w" if include_existing else "dmesg -W"
+        check = "false"
+        line_check = f"printf '%s\\n' \"$line\" | grep -qE {shlex.quote(pattern)}"
+
+    else:  # file_exists
+        path = shlex.quote(target)
+        directory = shlex.quote(posixpath.dirname(target))
+        # Fall back to a slow tick when inotify-tools is missing or the parent
+        # directory does not exist yet (there is nothing to watch)
+        watcher = (
+            f"if command -v inotifywait >/dev/null && test -d {directory}; "
+            f"then exec inotifywait -m -q -e create -e moved_to {directory}; "
+            "else while sleep 0.5; do echo tick; done; fi"
+        )
+        watcher = f"sh -c {shlex.quote(watcher)}"
+        check = f"test -e {path}"
+        line_check = check
+
+    return _WATCH_SCRIPT.format(
+        watcher=watcher,
+        check=check,
+        line_check=line_check,
+        setup_failed=_EXIT_SETUP_FAILED,
+        watcher_ended=_EXIT_WATCHER_ENDED,
+        timed_out=_EXIT_TIMEOUT
+    )
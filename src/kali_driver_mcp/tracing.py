@@ -0,0 +1,244 @@
+"""Hierarchical trace spans from tool calls down to SSH commands.
+
+The current span lives in a contextvar, so a span started in ``call_tool``
+becomes the parent of the admission wait, SSH connect and remote execution
+spans started further down the same task. Finished traces are appended to a
+local file as OTLP/JSON lines (one ``ExportTraceServiceRequest`` per trace),
+which OpenTelemetry collectors and trace viewers can import.
+
+Log records carry the current trace and span ids (see
+:class:`TraceContextFilter`), linking ``TOOL-n`` and ``CMD-n`` log lines to
+their spans.
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Traces waiting for their root span; older ones are flushed incomplete
+MAX_PENDING_TRACES = 256
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self._token: Optional[contextvars.Token] = None
+
+    def set_attribute(self, key: str, value: Any):
+        """Set a span attribute."""
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Render the span in OTLP/JSON form."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": _STATUS_ERROR, "message": self.error} if self.error else {"code": _STATUS_OK}
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convert attributes to OTLP key/value pairs."""
+    converted = []
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        converted.append({"key": key, "value": typed})
+    return converted
+
+
+class Tracer:
+    """Creates spans and exports finished traces to an OTLP/JSON lines file."""
+
+    def __init__(self):
+        self.enabled = False
+        self.file: Optional[str] = None
+        self.service_name = "kali-driver-mcp"
+        self._pending: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, file: str, service_name: str = "kali-driver-mcp"):
+        """
+        Enable tracing.
+
+        Args:
+            file: Path of the OTLP/JSON lines file traces are appended to
+            service_name: ``service.name`` resource attribute
+        """
+        self.file = file
+        self.service_name = service_name
+        self.enabled = True
+        directory = os.path.dirname(file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def start_span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        start_ns: Optional[int] = None,
+        **attributes: Any
+    ) -> Optional[Span]:
+        """
+        Start a span as a child of the current one and make it current.
+
+        Returns:
+            The span, or None when tracing is disabled
+        """
+        if not self.enabled:
+            return None
+
+        parent = _current_span.get()
+        span = Span(
+            name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            parent_span_id=parent.span_id if parent else None,
+            kind=kind,
+            attributes=attributes,
+            start_ns=start_ns
+        )
+        span._token = _current_span.set(span)
+        return span
+
+    def end_span(self, span: Optional[Span], error: Optional[str] = None):
+        """
+        Finish a span and restore its parent as the current span.
+
+        Args:
+            span: Span from :meth:`start_span` (None is ignored)
+            error: Error message marking the span as failed
+        """
+        if span is None:
+            return
+
+        span.end_ns = time.time_ns()
+        if error:
+            span.error = error
+        try:
+            _current_span.reset(span._token)
+        except ValueError:
+            # Ended from another context (e.g. a task spawned by the span)
+            pass
+        self._finish(span)
+
+    @contextlib.contextmanager
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Context manager around :meth:`start_span` and :meth:`end_span`."""
+        span = self.start_span(name, kind=kind, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, error=f"{type(e).__name__}: {e}")
+            raise
+        else:
+            self.end_span(span)
+
+    def _finish(self, span: Span):
+        """Buffer a finished span and export its trace once the root ends."""
+        ready: List[List[Span]] = []
+        with self._lock:
+            self._pending.setdefault(span.trace_id, []).append(span)
+            if span.parent_span_id is None:
+                ready.append(self._pending.pop(span.trace_id))
+            while len(self._pending) > MAX_PENDING_TRACES:
+                ready.append(self._pending.popitem(last=False)[1])
+
+        for spans in ready:
+            self._export(spans)
+
+    def _export(self, spans: List[Span]):
+        """Append one trace as an OTLP/JSON line."""
+        request = {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": _otlp_attributes({"service.name": self.service_name})
+                },
+                "scopeSpans": [{
+                    "scope": {"name": "kali_driver_mcp"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+        try:
+            with open(self.file, "a") as f:
+                f.write(json.dumps(request) + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to export trace to {self.file}: {e}")
+
+
+def current_span() -> Optional[Span]:
+    """Return the span active in the current context."""
+    return _current_span.get()
+
+
+class TraceContextFilter(logging.Filter):
+    """Stamps log records with the current trace and span ids."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = _current_span.get()
+        record.trace_id = span.trace_id if span else None
+        record.span_id = span.span_id if span else None
+        return True
+
+
+# Process-wide tracer shared by the server and SSH manager
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer."""
+    return _tracer
@@ -9,21 +9,28 @@ from typing import Dict, Any
 from unittest.mock import AsyncMock, MagicMock
 from kali_driver_mcp.config import Config
 from kali_driver_mcp.ssh_manager import SSHManager, CommandResult
-from kali_driver_mcp.logging_config import setup_logging
+from kali_driver_mcp.logging_config import setup_logging, shutdown_logging
+
+
+@pytest.fixture(scope="session")
+def session_log_file(tmp_path_factory) -> Path:
+    """Return the application log file of the test session (outside the repo)."""
+    return tmp_path_factory.mktemp("logs") / "kali-driver-mcp.log"
 
 
 @pytest.fixture(scope="session", autouse=True)
-def configure_logging():
+def configure_logging(session_log_file):
     """Configure logging for all tests - runs automatically."""
-    # 设置应用程序日志（会写入 logs/kali-driver-mcp.log）
+    # 设置应用程序日志（写入临时目录，不污染仓库）
     setup_logging(
         log_level="DEBUG",
-        log_file="logs/kali-driver-mcp.log",
+        log_file=str(session_log_file),
         json_format=False,
         enable_console=False  # pytest 会处理控制台输出
     )
     yield
     # 测试结束后清理
+    shutdown_logging()
     logging.shutdown()
 
 
@@ -0,0 +1,87 @@
+"""Unit tests for tool call admission control."""
+
+import asyncio
+import pytest
+from kali_driver_mcp.admission import AdmissionController, AdmissionRejected
+
+
+@pytest.mark.unit
+class TestAdmissionController:
+    """Test concurrency limits, queueing and rejection."""
+
+    @pytest.mark.asyncio
+    async def test_queued_call_admitted_on_release(self):
+        """Test a call over the global limit waits for a free slot."""
+        admission = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=5)
+        await admission.acquire("kernel_info")
+
+        waiting = asyncio.create_task(admission.acquire("network_info"))
+        await asyncio.sleep(0)
+        assert admission.queue_depth == 1
+        assert not waiting.done()
+
+        admission.release("kernel_info")
+        await waiting
+
+        assert admission.active == 1
+        assert admission.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_per_tool_limit_does_not_block_other_tools(self):
+        """Test a saturated tool leaves room for other tools."""
+        admission = AdmissionController(
+            max_concurrent=4,
+            tool_limits={"packet_capture": 1},
+            queue_timeout=5
+        )
+        await admission.acquire("packet_capture")
+
+        blocked = asyncio.create_task(admission.acquire("packet_capture"))
+        await asyncio.sleep(0)
+        await admission.acquire("kernel_info")
+
+        assert not blocked.done()
+        assert admission.active == 2
+
+        admission.release("packet_capture")
+        await blocked
+
+    @pytest.mark.asyncio
+    async def test_wait_tools_outside_global_limit(self):
+        """Test idle waiting tools neither take nor need global slots."""
+        admission = AdmissionController(max_concurrent=1, max_queue=0, wait_tools={"wait_condition": 2})
+        await admission.acquire("wait_condition")
+        await admission.acquire("wait_condition")
+        await admission.acquire("kernel_info")
+
+        assert admission.active == 1
+        with pytest.raises(AdmissionRejected):
+            await admission.acquire("wait_condition")
+
+        admission.release("wait_condition")
+        await admission.acquire("wait_condition")
+        assert admission.active == 1
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_with_retry_after(self):
+        """Test calls are rejected immediately when the queue is full."""
+        admission = AdmissionController(max_concurrent=1, max_queue=0)
+        await admission.acquire("driver_compile")
+
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await admission.acquire("driver_compile")
+
+        assert exc_info.value.retry_after >= 1
+
+    @pytest.mark.asyncio
+    async def test_queue_deadline(self):
+        """Test a queued call is rejected once its deadline passes."""
+        admission = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.05)
+        await admission.acquire("driver_compile")
+
+        with pytest.raises(AdmissionRejected, match="Timed out"):
+            await admission.acquire("kernel_info")
+
+        assert admission.queue_depth == 0
+        admission.release("driver_compile")
+        assert admission.active == 0
@@ -0,0 +1,382 @@
+"""Unit tests for the analyze_logs.py scan engine."""
+
+import gzip
+import importlib.util
+import argparse
+import json
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from kali_driver_mcp.log_db import SCHEMA
+
+_spec = importlib.util.spec_from_file_location(
+    "analyze_logs", Path(__file__).resolve().parents[2] / "analyze_logs.py"
+)
+analyze_logs = importlib.util.module_from_spec(_spec)
+# Registered so worker processes can unpickle its reports
+sys.modules["analyze_logs"] = analyze_logs
+_spec.loader.exec_module(analyze_logs)
+
+
+def write_log(path, start, count):
+    """Write JSON command records, with some unparsable continuation lines."""
+    lines = []
+    for i in range(start, start + count):
+        level = "WARNING" if i % 5 == 0 else "INFO"
+        lines.append(json.dumps({
+            "timestamp": f"2024-01-01T12:00:{i % 60:02d}Z",
+            "level": level,
+            "message": f"[CMD-{i}] Completed with exit code {int(level == 'WARNING')} in 0.100s",
+            "extra": {"cmd_id": i, "exit_code": int(level == "WARNING")}
+        }))
+        lines.append("file1.c")
+    text = "\n".join(lines) + "\n"
+    if path.suffix == ".gz":
+        with gzip.open(path, "wt") as f:
+            f.write(text)
+    else:
+        path.write_text(text)
+
+
+@pytest.mark.unit
+class TestScanEngine:
+    """Test single-pass reports over split and rotated logs."""
+
+    def test_byte_ranges_match_sequential_scan(self, tmp_path):
+        """Test splitting a file across workers gives the same reports."""
+        log_file = tmp_path / "server.log"
+        write_log(log_file, 0, 500)
+
+        sequential = analyze_logs.run_reports([log_file], ["stats", "commands"], limit=10)
+        parallel = analyze_logs.run_reports(
+            [log_file], ["stats", "commands"], limit=10, jobs=2, chunk_size=997
+        )
+
+        assert len(analyze_logs.plan_tasks([log_file], 2, 997)) > 10
+        assert parallel[0].stats == sequential[0].stats
+        assert sequential[0].stats["total_lines"] == 1000
+        assert parallel[1].count == sequential[1].count == 500
+        assert list(parallel[1].recent) == list(sequential[1].recent)
+        assert parallel[1].recent[-1]["cmd_id"] == 499
+
+    def test_rotated_segments_and_spooled_output(self, tmp_path):
+        """Test compressed segments are read oldest first and fully exported."""
+        log_file = tmp_path / "server.log"
+        write_log(tmp_path / "server.log.20240101-000000.gz", 0, 50)
+        write_log(log_file, 50, 50)
+
+        log_files = analyze_logs.rotated_segments(log_file) + [log_file]
+        [commands] = analyze_logs.run_reports(
+            log_files, ["commands"], limit=5, spool_dir=str(tmp_path)
+        )
+        output = tmp_path / "commands.json"
+        analyze_logs.write_output(output, [commands])
+
+        exported = json.loads(output.read_text())
+        assert len(commands.recent) == 5
+        assert [c["cmd_id"] for c in exported] == list(range(100))
+
+    def test_truncated_report_says_so(self, tmp_path, capsys):
+        """Test a report cut to --limit says how many entries were left out."""
+        log_file = tmp_path / "server.log"
+        write_log(log_file, 0, 20)
+
+        [commands] = analyze_logs.run_reports([log_file], ["commands"], limit=5)
+        commands.render()
+
+        assert "Showing last 5 of 20 entries" in capsys.readouterr().out
+
+
+@pytest.mark.unit
+class TestLatencyReport:
+    """Test per-template duration percentiles."""
+
+    def test_percentiles_by_template(self, tmp_path):
+        """Test commands are grouped by template, even across byte ranges."""
+        log_file = tmp_path / "server.log"
+        lines = []
+        for i in range(1, 101):
+            iface = "wlan0" if i % 2 else "eth1"
+            lines.append(json.dumps({
+                "level": "INFO",
+                "message": f"[CMD-{i}] Starting command: cat /sys/class/net/{iface}/statistics/rx_bytes",
+                "extra": {"cmd_id": i, "command": f"cat /sys/class/net/{iface}/statistics/rx_bytes"}
+            }))
+            lines.append(json.dumps({
+                "level": "INFO",
+                "message": f"[CMD-{i}] Completed with exit code 0 in {i / 100:.3f}s",
+                "extra": {"cmd_id": i, "exit_code": 0, "duration_seconds": i / 100}
+            }))
+        log_file.write_text("\n".join(lines) + "\n")
+
+        [report] = analyze_logs.run_reports([log_file], ["latency"], jobs=2, chunk_size=1500)
+
+        assert not report.orphans
+        [(template, latency)] = report.templates.items()
+        assert template == "cat /sys/class/net/<if>/statistics/<stat>"
+        assert latency.count == 100
+        assert latency.total == pytest.approx(50.5)
+        assert latency.max == 1.0
+        assert latency.percentile(50) == pytest.approx(0.5, rel=0.05)
+        assert latency.percentile(95) == pytest.approx(0.95, rel=0.05)
+        assert latency.percentile(99) == pytest.approx(0.99, rel=0.05)
+
+
+@pytest.mark.unit
+class TestCriticalPathReport:
+    """Test tool call time attribution."""
+
+    def test_remote_host_and_savings(self, tmp_path):
+        """Test commands are attributed by trace id across overlapping calls."""
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        records = []
+
+        def record(offset, message, trace_id):
+            records.append((offset, json.dumps({
+                "timestamp": (base + timedelta(seconds=offset)).isoformat() + "Z",
+                "level": "INFO",
+                "message": message,
+                "trace_id": trace_id
+            })))
+
+        # Three sequential 1s commands with 0.5s gaps in a 5s call
+        record(0.0, "[TOOL-1] Invoking tool: get_interface_stats", "a")
+        for i, start in enumerate((0.5, 2.0, 3.5), 1):
+            record(start, f"[CMD-{i}] Starting command: ip link show wlan{i}", "a")
+            record(start + 1, f"[CMD-{i}] Completed with exit code 0 in 1.000s", "a")
+        record(5.0, "[TOOL-1] Tool get_interface_stats completed in 5.000s", "a")
+        # A call overlapping the first one
+        record(1.0, "[TOOL-2] Invoking tool: load_driver", "b")
+        record(1.2, "[CMD-4] Starting command: modprobe ath9k", "b")
+        record(1.4, "[CMD-4] Completed with exit code 0 in 0.200s", "b")
+        record(1.5, "[TOOL-2] Tool load_driver completed in 0.500s", "b")
+
+        log_file = tmp_path / "server.log"
+        log_file.write_text("\n".join(line for _, line in sorted(records)) + "\n")
+
+        [report] = analyze_logs.run_reports([log_file], ["critical_path"], jobs=2, chunk_size=200)
+
+        assert report.unattributed == 0
+        stats = report.tools["get_interface_stats"]
+        assert (stats.calls, stats.commands) == (1, 3)
+        assert stats.wall == pytest.approx(5.0)
+        assert stats.remote == pytest.approx(3.0)
+        assert stats.host == pytest.approx(2.0)
+        assert stats.parallel_savings == pytest.approx(2.0)
+        assert stats.batch_savings == pytest.approx(3.0)
+        load = report.tools["load_driver"]
+        assert (load.commands, load.remote, load.parallel_savings) == (1, pytest.approx(0.2), 0)
+
+
+@pytest.mark.unit
+class TestChromeTrace:
+    """Test Chrome trace export."""
+
+    def test_tool_tracks_and_command_slices(self, tmp_path):
+        """Test calls get a track each, with their commands nested in them."""
+        records = [
+            ("00.000", "[TOOL-1] Invoking tool: load_driver", {}),
+            ("00.100", "[CMD-1] Starting command: modprobe ath9k", {}),
+            ("00.400", "[CMD-1] Completed with exit code 0 in 0.300s",
+             {"cmd_id": 1, "exit_code": 0, "stdout_length": 12, "stderr_length": 0}),
+            ("00.500", "[TOOL-1] Tool load_driver completed in 0.500s", {}),
+            ("01.000", "[CMD-2] Starting command: uname -r", {}),
+            ("02.000", "[TOOL-2] Invoking tool: compile_driver", {}),
+            ("02.100", "[CMD-3] Starting command: make -C /lib/modules/6.1/build", {}),
+        ]
+        log_file = tmp_path / "server.log"
+        log_file.write_text("\n".join(
+            json.dumps({"timestamp": f"2024-01-01T12:00:{ts}Z", "level": "INFO", "message": message, "extra": extra})
+            for ts, message, extra in records
+        ) + "\n")
+        output = tmp_path / "trace.json"
+
+        written = analyze_logs.export_chrome_trace([log_file], output)
+
+        events = json.loads(output.read_text())
+        assert written == len(events)
+        slices = {event["args"].get("cmd_id", event["name"]): event for event in events if event["ph"] == "X"}
+        tool, modprobe = slices["load_driver"], slices[1]
+        assert tool["dur"] == pytest.approx(500000)
+        assert modprobe["tid"] == tool["tid"]
+        assert tool["ts"] < modprobe["ts"] < modprobe["ts"] + modprobe["dur"] < tool["ts"] + tool["dur"]
+        assert modprobe["args"]["exit_code"] == 0
+        assert modprobe["args"]["stdout_length"] == 12
+        # Still running at the end of the log
+        assert slices[2]["args"]["incomplete"]
+        assert slices[2]["tid"] not in (tool["tid"], slices["compile_driver"]["tid"])
+        assert slices[3]["tid"] == slices["compile_driver"]["tid"] != tool["tid"]
+        assert slices["compile_driver"]["dur"] == pytest.approx(100000)
+
+
+    def test_overlapping_commands_get_own_tracks(self, tmp_path):
+        """Test slices on one track always nest."""
+        records = [
+            ("00.000", "[CMD-1] Starting command: dmesg -w"),
+            ("01.000", "[CMD-2] Starting command: uname -r"),
+            ("01.500", "[CMD-2] Completed with exit code 0 in 0.500s"),
+            ("02.000", "[CMD-1] Completed with exit code 0 in 2.000s"),
+            ("03.000", "[CMD-3] Starting command: lsmod"),
+            ("03.200", "[CMD-3] Completed with exit code 0 in 0.200s"),
+        ]
+        log_file = tmp_path / "server.log"
+        log_file.write_text("\n".join(
+            json.dumps({"timestamp": f"2024-01-01T12:00:{ts}Z", "level": "INFO", "message": message})
+            for ts, message in records
+        ) + "\n")
+        output = tmp_path / "trace.json"
+
+        analyze_logs.export_chrome_trace([log_file], output)
+
+        events = json.loads(output.read_text())
+        tracks = {event["args"]["cmd_id"]: event["tid"] for event in events if event["ph"] == "X"}
+        assert tracks[1] != tracks[2]
+        assert tracks[3] == tracks[1]
+        names = [event["args"]["name"] for event in events if event["name"] == "thread_name"]
+        assert names == ["commands (no tool call) #1", "commands (no tool call) #2"]
+
+    def test_sudo_password_not_exported(self, tmp_path):
+        """Test commands are exported as requested, never with the sudo password."""
+        wrapped = 'echo "s3cret" | sudo -S modprobe ath9k'
+        log_file = tmp_path / "server.log"
+        log_file.write_text("\n".join([
+            json.dumps({
+                "timestamp": "2024-01-01T12:00:00Z",
+                "level": "INFO",
+                "message": f"[CMD-1] Starting command: {wrapped}",
+                "extra": {"cmd_id": 1, "command": wrapped, "context": {"original_command": "modprobe ath9k"}}
+            }),
+            json.dumps({
+                "timestamp": "2024-01-01T12:00:01Z",
+                "level": "INFO",
+                "message": "[CMD-1] Completed with exit code 0 in 0.500s"
+            }),
+            f"2024-01-01 12:00:02 - ssh_commands - INFO - log_command_start:83 - [CMD-2] Starting command: {wrapped}",
+            "2024-01-01 12:00:03 - ssh_commands - INFO - log_command_end:130 - [CMD-2] Completed with exit code 0 in 0.100s",
+        ]) + "\n")
+        output = tmp_path / "trace.json"
+
+        analyze_logs.export_chrome_trace([log_file], output)
+
+        assert "s3cret" not in output.read_text()
+        commands = [event["args"]["command"] for event in json.loads(output.read_text()) if event["ph"] == "X"]
+        assert commands == ["modprobe ath9k", "sudo -S modprobe ath9k"]
+
+
+@pytest.mark.unit
+class TestFollow:
+    """Test tailing across rotation and rolling metrics."""
+
+    def test_tail_reads_new_lines_across_rotation(self, tmp_path):
+        """Test only appended lines are returned, including after rotation."""
+        log_file = tmp_path / "server.log"
+        log_file.write_text("old line\n")
+        tail = analyze_logs.LogTail(log_file)
+
+        with open(log_file, "a") as f:
+            f.write("first\nsecond (partial")
+        assert tail.read_lines() == ["first"]
+
+        with open(log_file, "a") as f:
+            f.write(")\nlast before rotation\n")
+        log_file.rename(tmp_path / "server.log.20240101-000000")
+        log_file.write_text("after rotation\n")
+
+        assert tail.read_lines() == ["second (partial)", "last before rotation", "after rotation"]
+        tail.close()
+
+    def test_rolling_metrics(self):
+        """Test in-flight tools, rates and percentiles over the window."""
+        stats = analyze_logs.LiveStats(window=10)
+        stats.feed({"message": "[TOOL-3] Invoking tool: driver_compile"}, now=100)
+        stats.feed({"message": "[TOOL-4] Invoking tool: kernel_info"}, now=100)
+        stats.feed({"message": "[TOOL-4] Tool kernel_info completed in 0.2s"}, now=101)
+        stats.feed({"message": "[CMD-1] Completed with exit code 0 in 5.000s"}, now=90)
+        for i in range(2, 12):
+            stats.feed({"message": f"[CMD-{i}] Completed with exit code {int(i == 2)} in 0.{i:03d}s"}, now=101)
+
+        snapshot = stats.snapshot(now=105)
+        assert [(tool_id, name) for tool_id, name, _ in snapshot["tools_in_flight"]] == [(3, "driver_compile")]
+        assert snapshot["commands_per_second"] == 1.0
+        assert snapshot["error_rate"] == 0.1
+        assert snapshot["p99"] == 0.011
+        assert snapshot["total_commands"] == 11
+
+
+@pytest.mark.unit
+class TestTimeWindow:
+    """Test --since/--until seeking."""
+
+    def write_timed_log(self, path, minutes):
+        """One record per second over the given minutes, each with a continuation line."""
+        with open(path, "w") as f:
+            for second in range(minutes * 60):
+                timestamp = datetime(2024, 1, 1, 14, 0) + timedelta(seconds=second)
+                f.write(json.dumps({
+                    "timestamp": timestamp.isoformat() + "Z",
+                    "level": "INFO",
+                    "message": f"[CMD-{second}] Completed with exit code 0 in 0.010s"
+                }) + "\n")
+                f.write("STDOUT line\n")
+
+    def test_seek_finds_exact_record(self, tmp_path):
+        """Test the binary search lands on the first record in the window."""
+        log_file = tmp_path / "server.log"
+        self.write_timed_log(log_file, 10)
+
+        offset = analyze_logs.seek_time(log_file, datetime(2024, 1, 1, 14, 2))
+
+        with open(log_file, "rb") as f:
+            f.seek(offset)
+            assert json.loads(f.readline())["timestamp"] == "2024-01-01T14:02:00Z"
+
+    def test_window_across_workers_and_segments(self, tmp_path):
+        """Test split ranges and skipped segments count only records in the window."""
+        old = tmp_path / "server.log.20240101-000000.gz"
+        with gzip.open(old, "wt") as f:
+            f.write(json.dumps({"timestamp": "2024-01-01T13:00:00Z", "level": "ERROR", "message": "old"}) + "\n")
+        log_file = tmp_path / "server.log"
+        self.write_timed_log(log_file, 10)
+
+        [stats] = analyze_logs.run_reports(
+            [old, log_file],
+            ["stats"],
+            jobs=2,
+            chunk_size=2000,
+            since=datetime(2024, 1, 1, 14, 2),
+            until=datetime(2024, 1, 1, 14, 5)
+        )
+
+        assert stats.stats["commands"] == 181
+        assert stats.stats["total_lines"] == 362
+        assert stats.stats["errors"] == 0
+        assert (tmp_path / analyze_logs.SEGMENT_INDEX).exists()
+
+
+@pytest.mark.unit
+class TestDatabaseQueries:
+    """Test --db queries."""
+
+    def test_time_window(self, tmp_path):
+        """Test --since/--until select commands by their UTC start time."""
+        db = sqlite3.connect(tmp_path / "log.db")
+        db.executescript(SCHEMA)
+        start = datetime(2024, 1, 1, 12, 0, 0)
+        for i in range(10):
+            db.execute(
+                "INSERT INTO commands (session, cmd_id, command, template, started_at, duration, exit_code)"
+                " VALUES ('s', ?, 'uname -r', 'uname -r', ?, 0.1, 0)",
+                (i, analyze_logs.utc_epoch(start + timedelta(minutes=i)))
+            )
+        output = tmp_path / "commands.json"
+        args = argparse.Namespace(
+            failed=False, min_duration=None, tool=None, limit=100, output=output,
+            since=start + timedelta(minutes=3), until=start + timedelta(minutes=5)
+        )
+
+        analyze_logs.db_commands(db, args)
+
+        assert sorted(c["cmd_id"] for c in json.loads(output.read_text())) == [3, 4, 5]
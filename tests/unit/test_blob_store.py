@@ -0,0 +1,56 @@
+"""Unit tests for the command output blob store."""
+
+import logging
+import os
+
+import pytest
+from kali_driver_mcp.blob_store import BlobStore, blob_path
+from kali_driver_mcp.logging_config import CommandLogger
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Return a blob store writing to a temporary directory."""
+    store = BlobStore()
+    store.configure(str(tmp_path / "blobs"), min_size=64)
+    yield store
+    store.close()
+
+
+@pytest.mark.unit
+class TestBlobStore:
+    """Test content addressing, deduplication and log references."""
+
+    def test_small_output_stays_inline(self, store):
+        """Test outputs below the threshold are not stored."""
+        assert store.put("Linux kali 6.6.9-amd64") is None
+
+    def test_identical_outputs_stored_once(self, store):
+        """Test the same output is written once and read back intact."""
+        lsmod = "Module                  Size  Used by\n" + "snd_hda_intel 57344 2\n" * 500
+
+        first = store.put(lsmod)
+        second = store.put(lsmod)
+        store.flush()
+
+        assert first == second
+        assert first["size"] == len(lsmod)
+        assert first["preview"] == lsmod[:200]
+        assert store.get(first["sha256"]) == lsmod
+        blobs = [f for _, _, files in os.walk(store.directory) for f in files]
+        assert blobs == [f"{first['sha256']}.gz"]
+        assert os.path.getsize(blob_path(store.directory, first["sha256"])) < len(lsmod) / 10
+
+    def test_command_log_references_blob(self, store, caplog):
+        """Test command records carry the digest instead of the output."""
+        command_logger = CommandLogger(logging.getLogger("ssh_commands"))
+        command_logger.blobs = store
+        dmesg = "[    0.000000] Linux version 6.6.9-amd64\n" * 100
+
+        with caplog.at_level(logging.INFO, logger="ssh_commands"):
+            command_logger.log_command_end(1, 0, dmesg, "", 0.25)
+
+        record = next(r for r in caplog.records if "Completed" in r.getMessage())
+        assert "stdout" not in record.extra_data
+        assert record.extra_data["stdout_blob"]["size"] == len(dmesg)
+        assert record.extra_data["stderr"] == ""
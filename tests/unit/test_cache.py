@@ -0,0 +1,125 @@
+"""Unit tests for the tool result cache."""
+
+import asyncio
+import pytest
+from kali_driver_mcp.cache import ResultCache, is_cacheable
+
+
+def counting_fetch(result):
+    """Return a fetch factory and a list recording its calls."""
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return dict(result)
+
+    return fetch, calls
+
+
+@pytest.mark.unit
+class TestResultCache:
+    """Test cached and shared tool result fetches."""
+
+    @pytest.mark.asyncio
+    async def test_hit_after_fetch(self):
+        """Test a second call with the same parameters is served from cache."""
+        cache = ResultCache(ttl=30)
+        fetch, calls = counting_fetch({"success": True, "modules": ["cfg80211"]})
+
+        first, first_hit = await cache.get_or_fetch("driver_load", {"operation": "list"}, fetch)
+        second, second_hit = await cache.get_or_fetch("driver_load", {"operation": "list"}, fetch)
+
+        assert (first_hit, second_hit) == (False, True)
+        assert second == first
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_fetch(self):
+        """Test a call arriving during an in-flight fetch waits for it."""
+        cache = ResultCache(ttl=30)
+        fetch, calls = counting_fetch({"kernel_version": "6.6.9-amd64"})
+
+        (_, first_hit), (result, hit) = await asyncio.gather(
+            cache.get_or_fetch("kernel_info", {}, fetch),
+            cache.get_or_fetch("kernel_info", {}, fetch)
+        )
+
+        assert (first_hit, hit) == (False, True)
+        assert result["kernel_version"] == "6.6.9-amd64"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_prefetch_served_once(self):
+        """Test a prefetched result only serves the first call."""
+        cache = ResultCache(ttl=0)
+        fetch, calls = counting_fetch({"success": True, "modules": ["cfg80211"]})
+
+        prefetch = asyncio.ensure_future(cache.prefetch("driver_load", {"operation": "list"}, fetch))
+        await asyncio.sleep(0)
+        first, first_hit = await cache.get_or_fetch("driver_load", {"operation": "list"}, fetch)
+        _, second_hit = await cache.get_or_fetch("driver_load", {"operation": "list"}, fetch)
+        await prefetch
+
+        assert first["modules"] == ["cfg80211"]
+        assert (first_hit, second_hit) == (True, False)
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_reads_overlapping_mutation_not_stored(self):
+        """Test reads during or started before a state change are not cached."""
+        cache = ResultCache(ttl=30)
+        fetch, calls = counting_fetch({"success": True})
+
+        before = asyncio.ensure_future(cache.get_or_fetch("kernel_info", {}, fetch))
+        await asyncio.sleep(0)
+        cache.begin_mutation()
+        await cache.get_or_fetch("kernel_info", {}, fetch)
+        await before
+        assert not cache.has("kernel_info", {})
+
+        cache.end_mutation()
+        await cache.get_or_fetch("kernel_info", {}, fetch)
+        assert cache.has("kernel_info", {})
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_failures_and_invalidation_refetch(self):
+        """Test failed results are not cached and invalidation drops entries."""
+        cache = ResultCache(ttl=30)
+        failing, failing_calls = counting_fetch({"success": False, "error": "ssh down"})
+        fetch, calls = counting_fetch({"success": True})
+
+        await cache.get_or_fetch("network_info", {}, failing)
+        assert not cache.has("network_info", {})
+
+        await cache.get_or_fetch("network_info", {}, fetch)
+        assert cache.has("network_info", {})
+
+        cache.invalidate()
+        _, hit = await cache.get_or_fetch("network_info", {}, fetch)
+
+        assert hit is False
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_disables_cache(self):
+        """Test a TTL of zero always fetches."""
+        cache = ResultCache(ttl=0)
+        fetch, calls = counting_fetch({"success": True})
+
+        await cache.get_or_fetch("kernel_info", {}, fetch)
+        _, hit = await cache.get_or_fetch("kernel_info", {}, fetch)
+
+        assert hit is False
+        assert len(calls) == 2
+
+    def test_is_cacheable(self):
+        """Test only read-only operations are cacheable."""
+        assert is_cacheable("kernel_info")
+        assert is_cacheable("driver_load", {"operation": "list"})
+        assert not is_cacheable("driver_load", {"operation": "reload"})
+        assert not is_cacheable("network_monitor", {"operation": "status"})
+        assert is_cacheable("network_info", {"info_type": "status", "detail_level": "basic"})
+        assert not is_cacheable("network_info", {"info_type": "stats"})
+        assert not is_cacheable("network_info", {"detail_level": "statistics"})
@@ -2,7 +2,7 @@
 
 import pytest
 from pathlib import Path
-from kali_driver_mcp.config import Config, VMConfig, SharedFolderConfig, BuildConfig
+from kali_driver_mcp.config import Config, ConfigError, VMConfig, SharedFolderConfig, BuildConfig
 
 
 def test_config_load_from_dict(test_config_data):
@@ -137,3 +137,100 @@ def test_config_sudo_with_password(test_config_data):
 
     assert config.vm.use_sudo is True
     assert config.vm.sudo_password == "sudo-pass"
+
+
+def test_metrics_config_defaults(test_config):
+    """Test metrics configuration defaults."""
+    assert test_config.metrics.histogram_window == 1024
+    assert test_config.metrics.prometheus_file is None
+    assert test_config.metrics.prometheus_interval == 0
+
+
+def test_hotplug_config_defaults(test_config):
+    """Test hotplug configuration defaults."""
+    assert test_config.hotplug.autostart is False
+    assert test_config.hotplug.subsystems == ["usb", "net"]
+    assert test_config.hotplug.max_events == 1000
+
+
+def test_warmup_config_defaults(test_config):
+    """Test warm-up configuration defaults."""
+    assert test_config.warmup.enabled is True
+    assert test_config.warmup.pre_elevate is True
+    assert test_config.warmup.prefetch == ["kernel_info", "interfaces", "modules"]
+    assert test_config.warmup.cache_ttl == 0
+
+
+def test_warmup_config_unknown_prefetch(test_config_data):
+    """Test unknown prefetch targets are rejected."""
+    config_data = test_config_data.copy()
+    config_data["warmup"] = {"prefetch": ["kernel_info", "firmware"]}
+
+    with pytest.raises(ConfigError, match="firmware"):
+        Config.from_dict(config_data)
+
+
+def test_admission_config_defaults(test_config):
+    """Test admission control configuration defaults."""
+    assert test_config.admission.max_concurrent == 8
+    assert test_config.admission.tool_limits == {}
+    assert test_config.admission.max_queue == 32
+    assert test_config.admission.queue_timeout == 30
+    assert test_config.admission.wait_tools == {"wait_condition": 4, "hotplug_events": 4}
+
+
+def test_deadline_config(test_config_data):
+    """Test per-tool deadlines fall back to the default."""
+    config_data = test_config_data.copy()
+    config_data["deadline"] = {"default": 60, "tools": {"driver_compile": 600}}
+
+    config = Config.from_dict(config_data)
+
+    assert config.deadline.for_tool("driver_compile") == 600
+    assert config.deadline.for_tool("kernel_info") == 60
+
+
+def test_profiling_config_defaults(test_config):
+    """Test profiling is off by default."""
+    assert test_config.profiling.enabled is False
+    assert test_config.profiling.tools == []
+    assert test_config.profiling.mode == "sampling"
+
+
+def test_loop_monitor_config_defaults(test_config):
+    """Test event loop monitor defaults."""
+    assert test_config.loop_monitor.enabled is True
+    assert test_config.loop_monitor.interval == 0.1
+    assert test_config.loop_monitor.slow_threshold == 0.1
+
+
+def test_memory_config_defaults(test_config):
+    """Test memory tracking is off by default."""
+    assert test_config.memory.enabled is False
+    assert test_config.memory.frames == 1
+
+
+def test_tracing_config_defaults(test_config):
+    """Test tracing is off by default and exports to the home directory."""
+    assert test_config.tracing.enabled is False
+    assert test_config.tracing.file.endswith("traces.jsonl")
+    assert not test_config.tracing.file.startswith("~")
+    assert test_config.tracing.service_name == "kali-driver-mcp"
+
+
+def test_logging_queue_overflow_validation(test_config_data):
+    """Test the log queue overflow policy must be known."""
+    config_data = test_config_data.copy()
+    config_data["logging"] = {"queue_overflow": "spill"}
+
+    with pytest.raises(ConfigError, match="queue_overflow"):
+        Config.from_dict(config_data)
+
+
+def test_command_log_policy_validation(test_config_data):
+    """Test command log policy rules are validated."""
+    config_data = test_config_data.copy()
+    config_data["logging"] = {"command_policy": {"rules": [{"match": "cat /sys/(", "success": "metadata"}]}}
+
+    with pytest.raises(ConfigError, match="pattern"):
+        Config.from_dict(config_data)
@@ -0,0 +1,81 @@
+"""Unit tests for per-tool-call deadlines."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from kali_driver_mcp import deadline
+from kali_driver_mcp.ssh_manager import SSHManager
+
+
+def slow_connection(seconds):
+    """Return a fake SSH connection whose commands take a while."""
+    async def run(*args, **kwargs):
+        await asyncio.sleep(seconds)
+        return MagicMock(stdout="done", stderr="", exit_status=0)
+
+    conn = MagicMock()
+    conn.run = run
+    return conn
+
+
+@pytest.mark.unit
+class TestDeadline:
+    """Test deadline budgets and their effect on SSH commands."""
+
+    def test_clamp_timeout(self):
+        """Test step timeouts are limited to the remaining budget."""
+        assert deadline.clamp_timeout(30) == 30
+
+        token = deadline.start(5)
+        try:
+            assert deadline.clamp_timeout(30) <= 5
+            assert deadline.clamp_timeout(1) == 1
+            assert deadline.clamp_timeout(None) <= 5
+        finally:
+            deadline.reset(token)
+
+        assert deadline.remaining() is None
+
+    @pytest.mark.asyncio
+    async def test_execute_returns_partial_on_deadline(self, test_config):
+        """Test a command cut by the deadline returns exit code 124."""
+        ssh = SSHManager(test_config)
+        ssh.connect = AsyncMock(return_value=slow_connection(1))
+
+        token = deadline.start(0.05)
+        try:
+            result = await ssh.execute("make -j4", timeout=300)
+            assert result.exit_code == deadline.DEADLINE_EXIT_CODE
+            assert deadline.exceeded()
+        finally:
+            deadline.reset(token)
+
+    @pytest.mark.asyncio
+    async def test_execute_skipped_after_deadline(self, test_config):
+        """Test commands are not started once the budget is spent."""
+        ssh = SSHManager(test_config)
+        ssh.connect = AsyncMock()
+
+        token = deadline.start(0.01)
+        try:
+            await asyncio.sleep(0.02)
+            result = await ssh.execute("uname -r")
+        finally:
+            deadline.reset(token)
+
+        assert result.exit_code == deadline.DEADLINE_EXIT_CODE
+        ssh.connect.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_own_timeout_still_raises(self, test_config):
+        """Test a step timeout shorter than the budget still raises."""
+        ssh = SSHManager(test_config)
+        ssh.connect = AsyncMock(return_value=slow_connection(1))
+
+        token = deadline.start(30)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await ssh.execute("sleep 100", timeout=0.05)
+            assert not deadline.exceeded()
+        finally:
+            deadline.reset(token)
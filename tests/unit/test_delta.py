@@ -0,0 +1,80 @@
+"""Unit tests for delta responses."""
+
+import pytest
+from kali_driver_mcp.delta import DeltaTracker, diff_results
+
+
+@pytest.mark.unit
+class TestDiffResults:
+    """Test result diffing."""
+
+    def test_list_entries(self):
+        """Test added and removed list entries."""
+        old = {"success": True, "modules": ["a 1 0", "b 2 0"]}
+        new = {"success": True, "modules": ["b 2 0", "c 3 0"]}
+
+        delta = diff_results(old, new)
+
+        assert delta["added"] == {"modules": ["c 3 0"]}
+        assert delta["removed"] == {"modules": ["a 1 0"]}
+        assert delta["changed"] == {}
+
+    def test_nested_and_scalar_changes(self):
+        """Test nested dictionaries, multi-line strings and scalars."""
+        old = {"interface_data": {"state": "down", "link_info": "l1\nl2"}, "total": 2}
+        new = {"interface_data": {"state": "up", "link_info": "l1\nl3"}, "total": 3}
+
+        delta = diff_results(old, new)
+
+        assert delta["changed"] == {"interface_data": {"state": "up"}, "total": 3}
+        assert delta["added"] == {"interface_data": {"link_info": ["l3"]}}
+        assert delta["removed"] == {"interface_data": {"link_info": ["l2"]}}
+
+
+@pytest.mark.unit
+class TestDeltaTracker:
+    """Test DeltaTracker class."""
+
+    def test_first_call_returns_full_result(self):
+        """Test an empty token returns the full result and a new token."""
+        tracker = DeltaTracker()
+        response, is_delta = tracker.respond("c1", "driver_load", {"operation": "list"}, {"modules": ["a"]}, "")
+
+        assert is_delta is False
+        assert response["modules"] == ["a"]
+        assert response["token"]
+
+    def test_matching_token_returns_delta(self):
+        """Test a matching token returns only the changes."""
+        tracker = DeltaTracker()
+        args = {"operation": "list", "since_token": ""}
+        first, _ = tracker.respond("c1", "driver_load", args, {"modules": ["a"]}, "")
+
+        args = {"operation": "list", "since_token": first["token"]}
+        second, is_delta = tracker.respond("c1", "driver_load", args, {"modules": ["a", "b"]}, first["token"])
+
+        assert is_delta is True
+        assert second["added"] == {"modules": ["b"]}
+        assert second["unchanged"] is False
+        assert second["token"] != first["token"]
+
+    def test_snapshots_are_per_client_and_arguments(self):
+        """Test tokens do not leak across clients or argument sets."""
+        tracker = DeltaTracker()
+        first, _ = tracker.respond("c1", "network_info", {"interface": "all"}, {"x": 1}, "")
+
+        _, other_client = tracker.respond("c2", "network_info", {"interface": "all"}, {"x": 1}, first["token"])
+        _, other_args = tracker.respond("c1", "network_info", {"interface": "wlan0"}, {"x": 1}, first["token"])
+
+        assert other_client is False
+        assert other_args is False
+
+    def test_snapshot_limit(self):
+        """Test old snapshots are evicted."""
+        tracker = DeltaTracker(max_snapshots=2)
+        first, _ = tracker.respond("c1", "t", {"n": 1}, {"x": 1}, "")
+        tracker.respond("c1", "t", {"n": 2}, {"x": 1}, "")
+        tracker.respond("c1", "t", {"n": 3}, {"x": 1}, "")
+
+        _, is_delta = tracker.respond("c1", "t", {"n": 1}, {"x": 1}, first["token"])
+        assert is_delta is False
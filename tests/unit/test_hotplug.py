@@ -0,0 +1,141 @@
+"""Unit tests for the udev hotplug event stream."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from kali_driver_mcp.hotplug import HotplugMonitor, UdevEventParser
+
+UDEVADM_OUTPUT = """\
+monitor will print the received events for:
+UDEV - the event which udev sends out after rule processing
+
+UDEV  [8123.456789] add      /devices/pci0000:00/0000:00:14.0/usb1/1-1 (usb)
+ACTION=add
+DEVPATH=/devices/pci0000:00/0000:00:14.0/usb1/1-1
+SUBSYSTEM=usb
+DEVTYPE=usb_device
+PRODUCT=bda/8812/0
+ID_VENDOR_ID=0bda
+ID_MODEL_ID=8812
+SEQNUM=4211
+
+UDEV  [8123.901234] add      /devices/pci0000:00/0000:00:14.0/usb1/1-1/1-1:1.0/net/wlan1 (net)
+ACTION=add
+SUBSYSTEM=net
+INTERFACE=wlan1
+SEQNUM=4215
+
+UDEV  [8124.000001] bind     /devices/pci0000:00/0000:00:14.0/usb1/1-1/1-1:1.0 (usb)
+ACTION=bind
+DRIVER=rtl8812au
+SEQNUM=4216
+"""
+
+
+def parse(output):
+    """Feed udevadm output through the parser and collect events."""
+    parser = UdevEventParser()
+    events = [parser.feed(line) for line in output.split("\n")]
+    return [e for e in events if e is not None]
+
+
+async def monitor_with_events(output=UDEVADM_OUTPUT):
+    """Create a monitor with parsed events already recorded."""
+    monitor = HotplugMonitor(ssh=None, max_events=10)
+    for event in parse(output + "\n"):
+        await monitor._record(event)
+    return monitor
+
+
+@pytest.mark.unit
+class TestUdevEventParser:
+    """Test udevadm monitor output parsing."""
+
+    def test_parse_events(self):
+        """Test headers and properties become structured events."""
+        events = parse(UDEVADM_OUTPUT + "\n")
+
+        assert [e["action"] for e in events] == ["add", "add", "bind"]
+        usb = events[0]
+        assert usb["subsystem"] == "usb"
+        assert usb["monotonic"] == 8123.456789
+        assert usb["devtype"] == "usb_device"
+        assert usb["vendor_id"] == "0bda"
+        assert usb["model_id"] == "8812"
+        assert usb["kernel_seqnum"] == "4211"
+        assert events[1]["interface"] == "wlan1"
+        assert events[2]["driver"] == "rtl8812au"
+
+    def test_header_terminates_previous_event(self):
+        """Test an event without a trailing blank line is still emitted."""
+        parser = UdevEventParser()
+        parser.feed("UDEV  [1.000000] remove   /devices/x/net/wlan1 (net)")
+        parser.feed("INTERFACE=wlan1")
+
+        event = parser.feed("UDEV  [2.000000] remove   /devices/x (usb)")
+
+        assert event["action"] == "remove"
+        assert event["interface"] == "wlan1"
+
+
+@pytest.mark.unit
+class TestHotplugMonitor:
+    """Test buffered event queries and waits."""
+
+    @pytest.mark.asyncio
+    async def test_query_filters(self):
+        """Test filtering by sequence, action, subsystem and regex."""
+        monitor = await monitor_with_events()
+
+        assert len(monitor.query()) == 3
+        assert [e["seq"] for e in monitor.query(since_seq=1)] == [2, 3]
+        assert monitor.query(action="bind")[0]["driver"] == "rtl8812au"
+        assert monitor.query(subsystem="net")[0]["interface"] == "wlan1"
+        assert [e["seq"] for e in monitor.query(match="0bda")] == [1]
+        assert [e["seq"] for e in monitor.query(limit=1)] == [3]
+
+    @pytest.mark.asyncio
+    async def test_wait_for_buffered_event(self):
+        """Test waiting returns an event that arrived before the call."""
+        monitor = await monitor_with_events()
+
+        event = await monitor.wait_for(since_seq=0, subsystem="net", timeout=1)
+
+        assert event["interface"] == "wlan1"
+
+    @pytest.mark.asyncio
+    async def test_wait_for_timeout(self):
+        """Test waiting for an event that never arrives."""
+        monitor = await monitor_with_events()
+
+        event = await monitor.wait_for(since_seq=3, action="remove", timeout=0.05)
+
+        assert event is None
+        assert monitor.status()["last_seq"] == 3
+
+    @pytest.mark.asyncio
+    async def test_restart_closes_dead_process(self):
+        """Test restarting after the monitor process died closes its channel."""
+        def process():
+            proc = MagicMock()
+            proc.stdout.readline = AsyncMock(return_value="")
+            proc.stderr.read = AsyncMock(return_value="udevadm: killed")
+            return proc
+
+        first, second = process(), process()
+        ssh = MagicMock()
+        ssh.start_process = AsyncMock(side_effect=[first, second])
+        monitor = HotplugMonitor(ssh=ssh)
+
+        await monitor.start()
+        await asyncio.sleep(0)
+        assert not monitor.running
+        assert monitor.last_error == "udevadm: killed"
+
+        await monitor.start()
+
+        first.close.assert_called_once()
+        second.close.assert_not_called()
+        await monitor.stop()
+        second.close.assert_called_once()
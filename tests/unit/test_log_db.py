@@ -0,0 +1,86 @@
+"""Unit tests for the SQLite log sink."""
+
+import logging
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from kali_driver_mcp.config import Config
+from kali_driver_mcp.log_db import SQLiteLogHandler
+from kali_driver_mcp.logging_config import CommandLogger, ToolLogger
+from kali_driver_mcp.ssh_manager import SSHManager
+
+
+@pytest.fixture
+def sink(tmp_path):
+    """Route tool and command loggers into a temporary database."""
+    handler = SQLiteLogHandler(str(tmp_path / "logs.db"))
+    logger = logging.getLogger("test_log_db")
+    logger.addHandler(handler)
+    logger.propagate = False
+    yield handler, ToolLogger(logger), CommandLogger(logger)
+    logger.removeHandler(handler)
+    handler.close()
+
+
+@pytest.mark.unit
+class TestSQLiteLogHandler:
+    """Test tool, command and error records land in their tables."""
+
+    def test_command_lifecycle(self, sink):
+        """Test a command row is completed with exit code and duration."""
+        handler, _, commands = sink
+        cmd_id = commands.log_command_start(
+            "sudo -n cat /sys/class/net/wlan0/operstate",
+            timeout=30,
+            context={"original_command": "cat /sys/class/net/wlan0/operstate"}
+        )
+        commands.log_command_end(cmd_id, 1, "", "No such device", 0.25)
+
+        [row] = handler.db.execute(
+            "SELECT command, template, exit_code, duration, stderr_length FROM commands"
+        ).fetchall()
+        assert row == (
+            "cat /sys/class/net/wlan0/operstate",
+            "cat /sys/class/net/<if>/operstate",
+            1,
+            0.25,
+            14
+        )
+
+    @pytest.mark.asyncio
+    async def test_script_sudo_password_not_stored(self, sink, test_config_data):
+        """Test a root script is stored without the sudo wrapper and its password."""
+        handler, _, commands = sink
+        config_data = test_config_data.copy()
+        config_data["vm"]["use_sudo"] = True
+        config_data["vm"]["sudo_method"] = "command"
+        config_data["vm"]["sudo_password"] = "s3cret-pass"
+        ssh = SSHManager(Config.from_dict(config_data))
+        ssh.cmd_logger = commands
+
+        conn = MagicMock()
+        conn.is_closed = MagicMock(return_value=False)
+        conn.run = AsyncMock(return_value=MagicMock(stdout="", stderr="", exit_status=0))
+        ssh._connection = conn
+
+        await ssh.execute_script("test -e /dev/rfkill", needs_root=True)
+
+        assert "s3cret-pass" in conn.run.call_args.args[0]
+        [(command, template)] = handler.db.execute("SELECT command, template FROM commands").fetchall()
+        assert command == "test -e /dev/rfkill"
+        assert "s3cret-pass" not in template
+
+    def test_tool_error_recorded(self, sink):
+        """Test a failed tool call marks the row and adds an error."""
+        handler, tools, _ = sink
+        tool_id = tools.log_tool_start("driver_load", {"operation": "load"})
+        try:
+            raise RuntimeError("insmod: ERROR: could not insert module")
+        except RuntimeError as e:
+            tools.log_tool_error(tool_id, "driver_load", e)
+
+        [(success, error)] = handler.db.execute("SELECT success, error FROM tools").fetchall()
+        assert success == 0
+        assert error.startswith("RuntimeError: insmod")
+        [(exception_type,)] = handler.db.execute("SELECT exception_type FROM errors").fetchall()
+        assert exception_type == "RuntimeError"
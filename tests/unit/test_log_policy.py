@@ -0,0 +1,55 @@
+"""Unit tests for the command output logging policy."""
+
+import logging
+
+import pytest
+from kali_driver_mcp.log_policy import CommandLogPolicy
+from kali_driver_mcp.logging_config import CommandLogger
+
+
+@pytest.mark.unit
+class TestCommandLogPolicy:
+    """Test which commands keep their full output."""
+
+    @pytest.fixture
+    def policy(self):
+        """Policy sampling sysfs reads and dropping lsmod output."""
+        return CommandLogPolicy(
+            slow_threshold=2.0,
+            success="full",
+            rules=[
+                {"match": r"^cat /sys/", "success": "sample", "sample_every": 3},
+                {"match": r"^lsmod", "success": "metadata"}
+            ]
+        )
+
+    def test_failures_and_slow_commands_keep_output(self, policy):
+        """Test errors and slow commands override the rules."""
+        assert policy.decide("lsmod", 1, 0.1) == (True, "error")
+        assert policy.decide("lsmod", 0, 2.5) == (True, "slow")
+
+    def test_rules_apply_to_fast_successes(self, policy):
+        """Test pattern rules and the default mode."""
+        assert policy.decide("lsmod", 0, 0.1) == (False, "policy")
+        assert policy.decide("uname -r", 0, 0.1) == (True, "policy")
+
+    def test_sampling_keeps_one_in_n(self, policy):
+        """Test sampled rules keep full output for every n-th match."""
+        kept = [policy.decide("cat /sys/class/net/wlan0/operstate", 0, 0.01)[0] for _ in range(7)]
+        assert kept == [True, False, False, True, False, False, True]
+
+    def test_metadata_record_omits_output(self, caplog):
+        """Test metadata-only records keep lengths but no output."""
+        command_logger = CommandLogger(
+            logging.getLogger("ssh_commands"),
+            CommandLogPolicy(success="metadata")
+        )
+        cmd_id = command_logger.log_command_start("cat /sys/class/net/wlan0/address")
+
+        with caplog.at_level(logging.INFO, logger="ssh_commands"):
+            command_logger.log_command_end(cmd_id, 0, "00:11:22:33:44:55", "", 0.01)
+
+        [record] = [r for r in caplog.records if f"[CMD-{cmd_id}] Completed" in r.getMessage()]
+        assert record.extra_data["output_logged"] == "metadata"
+        assert record.extra_data["stdout_length"] == 17
+        assert "stdout" not in record.extra_data
@@ -0,0 +1,115 @@
+"""Unit tests for the queued logging pipeline."""
+
+import gzip
+import json
+import logging
+import queue
+import time
+
+import pytest
+from kali_driver_mcp.logging_config import (
+    BoundedQueueHandler,
+    CompressingRotatingFileHandler,
+    setup_logging,
+    shutdown_logging
+)
+from kali_driver_mcp.metrics import get_metrics_registry
+from kali_driver_mcp.tracing import Tracer
+
+
+@pytest.fixture
+def json_log(tmp_path, session_log_file):
+    """Log to a temporary JSON file, restoring the test session's logging afterwards."""
+    log_file = tmp_path / "server.log"
+    setup_logging(log_level="DEBUG", log_file=str(log_file), json_format=True, enable_console=False)
+    yield log_file
+    setup_logging(
+        log_level="DEBUG",
+        log_file=str(session_log_file),
+        json_format=False,
+        enable_console=False
+    )
+
+
+def read_records(log_file):
+    """Flush the background writer and read the JSON records."""
+    shutdown_logging()
+    return [json.loads(line) for line in log_file.read_text().splitlines()]
+
+
+@pytest.mark.unit
+class TestQueuedLogging:
+    """Test records are written in the background without losing context."""
+
+    def test_records_written_by_listener(self, json_log, tmp_path):
+        """Test messages, exceptions and span ids survive the queue."""
+        tracer = Tracer()
+        tracer.configure(str(tmp_path / "traces.jsonl"))
+        log = logging.getLogger("ssh_commands")
+
+        with tracer.span("ssh.execute") as span:
+            log.info("[%s] START", "CMD-1")
+        try:
+            raise RuntimeError("connection lost")
+        except RuntimeError:
+            log.error("[CMD-1] ERROR", exc_info=True)
+
+        start, error = read_records(json_log)
+        assert start["message"] == "[CMD-1] START"
+        assert start["span_id"] == span.span_id
+        assert error["exception"]["message"] == "connection lost"
+
+    def test_full_queue_drops_and_counts(self):
+        """Test the drop policy discards records instead of blocking."""
+        metrics = get_metrics_registry()
+        before = metrics.snapshot()["counters"].get("log_records_dropped_total", {}).get("level=INFO", 0)
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1), "drop")
+        record = logging.LogRecord("mcp_tools", logging.INFO, __file__, 1, "TOOL-1", None, None)
+
+        handler.handle(record)
+        handler.handle(record)
+
+        assert handler.queue.qsize() == 1
+        after = metrics.snapshot()["counters"]["log_records_dropped_total"]["level=INFO"]
+        assert after == before + 1
+
+
+def make_record(message, created=None):
+    """Build a log record, optionally backdated."""
+    record = logging.LogRecord("ssh_commands", logging.INFO, __file__, 1, message, None, None)
+    if created is not None:
+        record.created = created
+    return record
+
+
+@pytest.mark.unit
+class TestLogRotation:
+    """Test size/age rotation with compressed, retained segments."""
+
+    def test_size_rotation_compresses_and_prunes(self, tmp_path):
+        """Test full segments are gzipped and only backup_count are kept."""
+        log_file = tmp_path / "server.log"
+        handler = CompressingRotatingFileHandler(str(log_file), max_bytes=1000, backup_count=2)
+        for i in range(40):
+            handler.handle(make_record(f"[CMD-{i}] " + "x" * 90))
+            time.sleep(0.001)
+        handler.close()
+
+        segments = sorted(tmp_path.glob("server.log.*"))
+        assert len(segments) == 2
+        assert all(path.suffix == ".gz" for path in segments)
+        with gzip.open(segments[-1], "rt") as f:
+            assert "[CMD-" in f.read()
+        assert log_file.stat().st_size < 1000
+
+    def test_age_rotation(self, tmp_path):
+        """Test a segment older than max_age is rotated on the next record."""
+        log_file = tmp_path / "server.log"
+        handler = CompressingRotatingFileHandler(str(log_file), max_age=3600, compression="none")
+        handler.handle(make_record("[TOOL-1] first"))
+        handler.handle(make_record("[TOOL-2] next day", created=time.time() + 86400))
+        handler.close()
+
+        [segment] = tmp_path.glob("server.log.*")
+        assert segment.read_text() == "[TOOL-1] first\n"
+        assert log_file.read_text() == "[TOOL-2] next day\n"
@@ -0,0 +1,47 @@
+"""Unit tests for the event loop monitor."""
+
+import asyncio
+import time
+import pytest
+from kali_driver_mcp.loop_monitor import LoopMonitor
+
+
+def blocking_json_encode(seconds):
+    """Block the event loop like a large synchronous encode."""
+    time.sleep(seconds)
+
+
+@pytest.mark.unit
+class TestLoopMonitor:
+    """Test lag sampling and stall capture."""
+
+    @pytest.mark.asyncio
+    async def test_stall_captures_stack(self):
+        """Test a blocking call is recorded with its stack."""
+        monitor = LoopMonitor(interval=0.02, slow_threshold=0.05)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            blocking_json_encode(0.3)
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+
+        stats = monitor.stats()
+        assert stats["max_lag_seconds"] >= 0.2
+        assert len(stats["recent_stalls"]) == 1
+        stall = stats["recent_stalls"][0]
+        assert stall["blocked_seconds"] >= 0.2
+        assert any("blocking_json_encode" in frame for frame in stall["stack"])
+
+    @pytest.mark.asyncio
+    async def test_idle_loop_has_no_stalls(self):
+        """Test an idle loop records lag but no stalls."""
+        monitor = LoopMonitor(interval=0.01, slow_threshold=0.2)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+        stats = monitor.stats()
+        assert stats["running"] is False
+        assert stats["recent_stalls"] == []
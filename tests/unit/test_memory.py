@@ -0,0 +1,64 @@
+"""Unit tests for tracemalloc memory accounting."""
+
+import pytest
+from kali_driver_mcp.memory import MemoryTracker
+
+
+@pytest.fixture
+def tracker():
+    """Return a started memory tracker and stop it afterwards."""
+    tracker = MemoryTracker()
+    tracker.start()
+    yield tracker
+    tracker.stop()
+
+
+def split_output(size):
+    """Allocate like splitting a large command output into lines."""
+    return ("x" * 99 + "\n") * (size // 100)
+
+
+@pytest.mark.unit
+class TestMemoryTracker:
+    """Test per-call peak/net accounting and allocation reports."""
+
+    def test_peak_and_net(self, tracker):
+        """Test temporary allocations count toward peak but not net."""
+        window = tracker.begin()
+        kept = split_output(1_000_000)
+        temporary = kept.split("\n")
+        del temporary
+        usage = tracker.end(window, "tool", tool="log_viewer")
+
+        assert usage["net_bytes"] >= 1_000_000
+        assert usage["peak_bytes"] > usage["net_bytes"]
+        del kept
+
+    def test_nested_windows_keep_own_peak(self, tracker):
+        """Test a command inside a tool call does not hide the tool's peak."""
+        tool = tracker.begin()
+        command = tracker.begin()
+        blob = split_output(500_000)
+        del blob
+        command_usage = tracker.end(command, "command", template="dmesg")
+        tool_usage = tracker.end(tool, "tool", tool="log_viewer")
+
+        assert command_usage["peak_bytes"] >= 500_000
+        assert tool_usage["peak_bytes"] >= 500_000
+
+    def test_report_lists_sites(self, tracker):
+        """Test the report names the allocating source line."""
+        kept = split_output(1_000_000)
+
+        report = tracker.report(top=5)
+
+        assert report["traced_bytes"] >= 1_000_000
+        assert any("test_memory.py" in site["site"] for site in report["top_growth"])
+        del kept
+
+    def test_disabled_is_noop(self):
+        """Test measurements are skipped when tracking is off."""
+        tracker = MemoryTracker()
+        assert tracker.begin() is None
+        assert tracker.end(None, "tool", tool="kernel_info") is None
+        assert tracker.report() == {"enabled": False}
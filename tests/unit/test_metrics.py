@@ -0,0 +1,90 @@
+"""Unit tests for the metrics registry."""
+
+import pytest
+from kali_driver_mcp.metrics import MetricsRegistry, Histogram, command_template, MAX_COMMAND_TEMPLATES
+
+
+@pytest.mark.unit
+class TestCommandTemplate:
+    """Test command normalization."""
+
+    def test_sysfs_statistics(self):
+        """Test interface and statistic names are stripped from sysfs paths."""
+        template = command_template("cat /sys/class/net/wlan0/statistics/rx_bytes 2>/dev/null")
+        assert template == "cat /sys/class/net/<if>/statistics/<stat> 2>/dev/null"
+
+    def test_paths_numbers_and_modules(self):
+        """Test paths, numbers and module names are stripped."""
+        assert command_template("dmesg | tail -n 1000") == "dmesg | tail -n <n>"
+        assert command_template("insmod /home/kali/share/aic.ko debug=1") == "insmod <module> debug=<n>"
+        assert command_template("ip link show wlan0mon") == "ip link show <if>"
+
+
+@pytest.mark.unit
+class TestMetricsRegistry:
+    """Test MetricsRegistry class."""
+
+    def test_histogram_percentiles(self):
+        """Test nearest-rank percentiles over the sample window."""
+        histogram = Histogram(window=100)
+        for value in range(1, 101):
+            histogram.observe(value / 100)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 100
+        assert snapshot["p50"] == 0.5
+        assert snapshot["p95"] == 0.95
+        assert snapshot["p99"] == 0.99
+        assert snapshot["max"] == 1.0
+
+    def test_snapshot_and_cache_ratios(self):
+        """Test counters, gauges and cache hit ratios in the snapshot."""
+        metrics = MetricsRegistry()
+        metrics.inc("ssh_connects_total")
+        metrics.add_gauge("tools_in_flight", 1, tool="kernel_info")
+        metrics.record_cache("kernel_info", hit=True)
+        metrics.record_cache("kernel_info", hit=True)
+        metrics.record_cache("kernel_info", hit=False)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["counters"]["ssh_connects_total"] == 1
+        assert snapshot["gauges"]["tools_in_flight"] == {"tool=kernel_info": 1}
+        assert snapshot["cache_hit_ratios"]["kernel_info"]["hit_ratio"] == 0.6667
+
+    def test_reset_keeps_gauges(self):
+        """Test a reset during a call leaves in-flight gauges balanced."""
+        metrics = MetricsRegistry()
+        metrics.add_gauge("tools_in_flight", 1, tool="server_stats")
+        metrics.inc("tool_calls_total", tool="kernel_info", outcome="ok")
+        metrics.observe("tool_duration_seconds", 0.2, tool="kernel_info")
+
+        metrics.reset()
+        metrics.add_gauge("tools_in_flight", -1, tool="server_stats")
+
+        snapshot = metrics.snapshot()
+        assert snapshot["gauges"]["tools_in_flight"] == {"tool=server_stats": 0}
+        assert "tool_calls_total" not in snapshot["counters"]
+        assert "tool_duration_seconds" not in snapshot["histograms"]
+
+    def test_template_cardinality_is_bounded(self):
+        """Test new templates fold into <other> once the limit is reached."""
+        metrics = MetricsRegistry()
+        for i in range(MAX_COMMAND_TEMPLATES):
+            metrics.command_template(f"cmd{i}")
+        assert metrics.command_template("brand-new-command") == "<other>"
+        assert metrics.command_template("cmd0") == "cmd0"
+
+    def test_prometheus_output(self, tmp_path):
+        """Test Prometheus text rendering and file dump."""
+        metrics = MetricsRegistry()
+        metrics.inc("tool_calls_total", tool="kernel_info", outcome="ok")
+        metrics.observe("tool_duration_seconds", 0.25, tool="kernel_info")
+
+        path = tmp_path / "metrics.prom"
+        metrics.write_prometheus(str(path))
+        text = path.read_text()
+
+        assert "# TYPE tool_calls_total counter" in text
+        assert 'tool_calls_total{outcome="ok",tool="kernel_info"} 1' in text
+        assert 'tool_duration_seconds{tool="kernel_info",quantile="0.5"} 0.25' in text
+        assert 'tool_duration_seconds_count{tool="kernel_info"} 1' in text
@@ -0,0 +1,58 @@
+"""Unit tests for tool call profiling."""
+
+import pstats
+import time
+import pytest
+from kali_driver_mcp.profiling import ToolProfile, should_profile
+
+
+def busy_parse(seconds):
+    """Burn CPU like a slow output parser."""
+    end = time.monotonic() + seconds
+    total = 0
+    while time.monotonic() < end:
+        total += sum(range(100))
+    return total
+
+
+@pytest.mark.unit
+class TestToolProfile:
+    """Test profile capture and output files."""
+
+    def test_both_modes_write_files(self, tmp_path):
+        """Test cProfile and sampling output are written."""
+        profile = ToolProfile("network_info", str(tmp_path), mode="both", sample_interval=0.001)
+
+        assert profile.start() is True
+        busy_parse(0.1)
+        profile.stop()
+
+        stats = pstats.Stats(profile.files["pstats"])
+        assert any(func[2] == "busy_parse" for func in stats.stats)
+
+        with open(profile.files["collapsed"]) as f:
+            folded = f.read()
+        assert "test_profiling.py:busy_parse" in folded
+
+    def test_one_profile_at_a_time(self, tmp_path):
+        """Test a second concurrent profile is skipped."""
+        first = ToolProfile("driver_compile", str(tmp_path), mode="sampling")
+        second = ToolProfile("kernel_info", str(tmp_path), mode="sampling")
+
+        assert first.start() is True
+        try:
+            assert second.start() is False
+            assert second.files == {}
+        finally:
+            first.stop()
+
+        third = ToolProfile("kernel_info", str(tmp_path), mode="sampling")
+        assert third.start() is True
+        third.stop()
+
+    def test_should_profile(self):
+        """Test the tool argument overrides configuration."""
+        assert should_profile("kernel_info", None, False, ["kernel_info"]) is True
+        assert should_profile("network_info", None, False, ["kernel_info"]) is False
+        assert should_profile("network_info", True, False, []) is True
+        assert should_profile("network_info", False, True, []) is False
@@ -0,0 +1,66 @@
+"""Unit tests for response field projection and summary mode."""
+
+import pytest
+from kali_driver_mcp.projection import parse_fields, wants, project_result, summarize_result
+
+
+@pytest.mark.unit
+class TestProjection:
+    """Test field projection helpers."""
+
+    def test_parse_fields(self):
+        """Test empty field lists mean all fields."""
+        assert parse_fields(None) is None
+        assert parse_fields([]) is None
+        assert parse_fields(["state ", "interfaces"]) == {"state", "interfaces"}
+
+    def test_wants(self):
+        """Test parent, child and exact matches."""
+        fields = {"interface_data.state", "networks"}
+        assert wants(None, "csv_data") is True
+        assert wants(fields, "networks") is True
+        assert wants(fields, "csv_data") is False
+        assert wants(fields, "interface_data") is True
+        assert wants(fields, "interface_data.state") is True
+        assert wants(fields, "interface_data.link_info") is False
+        assert wants({"interface_data"}, "interface_data.link_info") is True
+
+    def test_project_result(self):
+        """Test projection keeps requested and always-kept fields only."""
+        result = {
+            "success": True,
+            "csv_data": "BSSID,...",
+            "networks": [{"bssid": "AA:BB:CC:DD:EE:FF"}],
+            "interface_data": {"state": "up", "link_info": "..."}
+        }
+
+        projected = project_result(result, {"networks", "interface_data.state"})
+
+        assert projected == {
+            "success": True,
+            "networks": [{"bssid": "AA:BB:CC:DD:EE:FF"}],
+            "interface_data": {"state": "up"}
+        }
+        assert project_result(result, None) is result
+
+    def test_summarize_result(self):
+        """Test summary mode reduces blobs to counts."""
+        result = {
+            "success": True,
+            "channel": 6,
+            "output": "line1\nline2\nline3",
+            "networks": [{}, {}],
+            "interface_data": {"entries": ["a"], "state": "up"},
+            "error": "first line\nsecond line"
+        }
+
+        summary = summarize_result(result)
+
+        assert summary == {
+            "success": True,
+            "channel": 6,
+            "output_lines": 3,
+            "networks_count": 2,
+            "interface_data": {"entries_count": 1, "state": "up"},
+            "error": "first line"
+        }
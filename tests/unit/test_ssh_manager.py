@@ -184,3 +184,116 @@ class TestSSHManager:
         # Should raise TimeoutError
         with pytest.raises(asyncio.TimeoutError):
             await ssh.execute("sleep 100", timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_execute_script_survives_su_wrapping(self, test_config_with_sudo):
+        """Test scripts are shipped encoded so su -c cannot expand their variables."""
+        import base64
+
+        ssh = SSHManager(test_config_with_sudo)
+        ssh.execute = AsyncMock(return_value=CommandResult("ok", "", 0))
+
+        await ssh.execute_script('echo "$HOME"', needs_root=True, remote_timeout=10)
+
+        command = ssh.execute.call_args.args[0]
+        encoded = command.split()[1]
+        assert base64.b64decode(encoded).decode() == 'echo "$HOME"'
+        assert "$HOME" not in command
+        assert 'su root -c "timeout -k 2 10 sh /tmp/kali-driver-mcp-' in command
+
+    @pytest.mark.asyncio
+    async def test_stream_script_reports_lines(self, test_config):
+        """Test streamed output reaches the callback line by line."""
+        process = MagicMock()
+        process.stdout.readline = AsyncMock(side_effect=["line 1\n", "line 2\n", ""])
+        process.stderr.readline = AsyncMock(side_effect=["warning\n", ""])
+        process.wait_closed = AsyncMock()
+        process.returncode = 0
+
+        ssh = SSHManager(test_config)
+        ssh.start_process = AsyncMock(return_value=process)
+        received = []
+
+        async def on_output(stream, line):
+            received.append((stream, line))
+
+        exit_code = await ssh.stream_script("cat /proc/interrupts", on_output, timeout=5)
+
+        assert exit_code == 0
+        assert ("stdout", "line 2") in received
+        assert ("stderr", "warning") in received
+        assert "timeout -k 2 5 sh" in ssh.start_process.call_args.args[0]
+        process.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_stream_script_logs_output_and_sizes(self, test_config):
+        """Test the command log gets the caller's excerpt and the full sizes."""
+        process = MagicMock()
+        process.stdout.readline = AsyncMock(side_effect=["line 1\n", "line 2\n", ""])
+        process.stderr.readline = AsyncMock(side_effect=["oops\n", ""])
+        process.wait_closed = AsyncMock()
+        process.returncode = 1
+
+        ssh = SSHManager(test_config)
+        ssh.cmd_logger = MagicMock()
+        ssh.start_process = AsyncMock(return_value=process)
+
+        await ssh.stream_script("make", AsyncMock(), timeout=5, logged_output=lambda: ("line 2", "oops"))
+
+        logged = ssh.cmd_logger.log_command_end.call_args.kwargs
+        assert (logged["stdout"], logged["stderr"]) == ("line 2", "oops")
+        assert (logged["stdout_length"], logged["stderr_length"]) == (14, 5)
+
+    @pytest.mark.asyncio
+    async def test_stream_script_remote_timeout(self, test_config):
+        """Test the remote timeout exit code is reported as a timeout."""
+        async def killed():
+            await asyncio.sleep(0.06)
+            return ""
+
+        process = MagicMock()
+        process.stdout.readline = AsyncMock(side_effect=killed)
+        process.stderr.readline = AsyncMock(return_value="")
+        process.wait_closed = AsyncMock()
+        process.returncode = 124
+
+        ssh = SSHManager(test_config)
+        ssh.cmd_logger = MagicMock()
+        ssh.start_process = AsyncMock(return_value=process)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await ssh.stream_script("sleep 60", AsyncMock(), timeout=0.05)
+
+        ssh.cmd_logger.log_command_end.assert_not_called()
+        ssh.cmd_logger.log_command_error.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_stream_script_start_failure_logged(self, test_config):
+        """Test a process that fails to start closes its command record."""
+        ssh = SSHManager(test_config)
+        ssh.cmd_logger = MagicMock()
+        ssh.cmd_logger.log_command_start.return_value = 7
+        ssh.start_process = AsyncMock(side_effect=OSError("channel open failed"))
+
+        with pytest.raises(OSError):
+            await ssh.stream_script("dmesg -w", AsyncMock(), timeout=5)
+
+        assert ssh.cmd_logger.log_command_error.call_args.kwargs["cmd_id"] == 7
+
+    @pytest.mark.asyncio
+    async def test_stream_script_timeout_closes_process(self, test_config):
+        """Test a timed out stream closes the remote process."""
+        async def hang():
+            await asyncio.sleep(10)
+
+        process = MagicMock()
+        process.stdout.readline = AsyncMock(side_effect=hang)
+        process.stderr.readline = AsyncMock(return_value="")
+
+        ssh = SSHManager(test_config)
+        ssh.start_process = AsyncMock(return_value=process)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await ssh.stream_script("perf stat -a sleep 60", AsyncMock(), timeout=0.05)
+
+        process.close.assert_called_once()
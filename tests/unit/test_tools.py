@@ -1,10 +1,16 @@
 """Unit tests for MCP tools."""
 
+import asyncio
 import pytest
+from unittest.mock import AsyncMock
 from kali_driver_mcp.tools.kernel_info import get_kernel_info
 from kali_driver_mcp.tools.driver_load import manage_driver
 from kali_driver_mcp.tools.network_monitor import manage_monitor_mode
 from kali_driver_mcp.tools.packet_capture import capture_packets, _parse_airodump_csv
+from kali_driver_mcp.tools.driver_pipeline import run_driver_pipeline, _parse_dmesg_timestamp
+from kali_driver_mcp.tools.wait_condition import wait_for_condition, build_watch_script
+from kali_driver_mcp.tools.execute_command import execute_command
+from kali_driver_mcp.ssh_manager import CommandResult
 
 
 @pytest.mark.unit
@@ -35,6 +41,20 @@ class TestKernelInfo:
         # When commands fail, the result dict may be empty or partial
         # This is expected behavior - the function doesn't set a "success" field
 
+    @pytest.mark.asyncio
+    async def test_get_kernel_info_fields_skip_fetches(self, test_config, mock_ssh_manager):
+        """Test unrequested fields are never fetched from the VM."""
+        result = await get_kernel_info(
+            test_config,
+            mock_ssh_manager,
+            detail_level="full",
+            fields={"build_date"}
+        )
+
+        assert list(result.keys()) == ["build_date"]
+        commands = [call.args[0] for call in mock_ssh_manager.execute.call_args_list]
+        assert commands == ["uname -v"]
+
 
 @pytest.mark.unit
 class TestDriverLoad:
@@ -108,6 +128,28 @@ class TestDriverLoad:
         assert "error" in result
         assert "not found" in result["error"]
 
+    @pytest.mark.asyncio
+    async def test_info_checks_module_exists_when_only_loaded_wanted(self, test_config, mock_ssh_manager):
+        """Test info still runs modinfo, and fails, when its output is not requested."""
+        async def execute(command, **kwargs):
+            if command.startswith("modinfo"):
+                return CommandResult("", "modinfo: ERROR: Module missing not found.", 1)
+            return CommandResult("", "", 1)
+        mock_ssh_manager.execute = AsyncMock(side_effect=execute)
+
+        result = await manage_driver(
+            test_config,
+            mock_ssh_manager,
+            operation="info",
+            module_name="missing",
+            fields={"loaded"}
+        )
+
+        assert result["success"] is False
+        assert result["loaded"] is False
+        assert "info" not in result
+        assert "parsed_info" not in result
+
 
 @pytest.mark.unit
 class TestNetworkMonitor:
@@ -249,3 +291,235 @@ Station MAC, First time seen, Last time seen, Power, # packets, BSSID, Probed ES
 """
         networks = _parse_airodump_csv(csv_data)
         assert len(networks) == 0
+
+
+@pytest.mark.unit
+class TestDriverPipeline:
+    """Test build-load-verify pipeline tool."""
+
+    @staticmethod
+    def _fake_vm(build_exit_code=0, artifacts="/share/my_driver.ko"):
+        """Return an execute side effect emulating a VM before/after load."""
+        state = {"loaded": False}
+
+        async def execute(cmd, *args, **kwargs):
+            if "Makefile" in cmd:
+                return CommandResult("YES", "", 0)
+            if "make -j" in cmd:
+                return CommandResult("", "error: boom", build_exit_code)
+            if cmd.startswith("find"):
+                return CommandResult(artifacts, "", 0)
+            if cmd.startswith("insmod"):
+                state["loaded"] = True
+                return CommandResult("", "", 0)
+            if cmd.startswith("rmmod"):
+                return CommandResult("", "", 0)
+            if cmd == "ls /sys/class/net/":
+                return CommandResult("eth0 lo wlan0" if state["loaded"] else "eth0 lo", "", 0)
+            if cmd == "dmesg | tail -n 1":
+                return CommandResult("[  100.500000] old message", "", 0)
+            if cmd.startswith("dmesg | awk"):
+                assert "100.5" in cmd
+                return CommandResult("[  101.000000] my_driver: probe ok", "", 0)
+            return CommandResult("", "", 0)
+
+        return execute
+
+    @pytest.mark.asyncio
+    async def test_pipeline_success(self, test_config, mock_ssh_manager):
+        """Test a successful build, reload and verify run."""
+        mock_ssh_manager.execute.side_effect = self._fake_vm()
+
+        result = await run_driver_pipeline(test_config, mock_ssh_manager, module_name="my_driver")
+
+        assert result["success"] is True
+        assert result["failed_phase"] is None
+        assert result["build"]["artifacts"] == ["/share/my_driver.ko"]
+        assert result["kernel_messages"] == ["[  101.000000] my_driver: probe ok"]
+        assert result["interfaces"]["added"] == ["wlan0"]
+        assert set(result["timings"]) >= {"build", "snapshot", "load", "verify", "total"}
+
+    @pytest.mark.asyncio
+    async def test_pipeline_reloads_module_built_in_directory(self, test_config, mock_ssh_manager):
+        """Test the reload inserts the module the build just produced."""
+        mock_ssh_manager.execute.side_effect = self._fake_vm(
+            artifacts="/share/drivers/other.ko\n/share/drivers/my-driver.ko"
+        )
+
+        result = await run_driver_pipeline(
+            test_config, mock_ssh_manager, module_name="my_driver", directory="drivers"
+        )
+
+        insmods = [call.args[0] for call in mock_ssh_manager.execute.call_args_list
+                   if call.args[0].startswith("insmod")]
+        assert insmods == ["insmod /share/drivers/my-driver.ko"]
+        assert result["load"]["module_path"] == "/share/drivers/my-driver.ko"
+        assert result["success"] is True
+
+    @pytest.mark.asyncio
+    async def test_pipeline_stops_on_build_failure(self, test_config, mock_ssh_manager):
+        """Test that a failed build skips load and verify."""
+        mock_ssh_manager.execute.side_effect = self._fake_vm(build_exit_code=2)
+
+        result = await run_driver_pipeline(test_config, mock_ssh_manager, module_name="my_driver")
+
+        assert result["success"] is False
+        assert result["failed_phase"] == "build"
+        assert "boom" in result["build"]["error"]
+        assert "load" not in result
+        calls = [str(call) for call in mock_ssh_manager.execute.call_args_list]
+        assert not any("insmod" in call for call in calls)
+
+    def test_parse_dmesg_timestamp(self):
+        """Test parsing raw dmesg timestamps."""
+        assert _parse_dmesg_timestamp("[  100.123456] my_driver: loaded") == 100.123456
+        assert _parse_dmesg_timestamp("no timestamp") is None
+        assert _parse_dmesg_timestamp("") is None
+
+
+@pytest.mark.unit
+class TestWaitCondition:
+    """Test server-side wait tool."""
+
+    @pytest.mark.asyncio
+    async def test_wait_matched(self, test_config, mock_ssh_manager):
+        """Test a matched dmesg condition returns the matching line."""
+        mock_ssh_manager.execute_script = AsyncMock(
+            return_value=CommandResult("MATCHED [  5.1] aic8800: firmware loaded", "", 0)
+        )
+
+        result = await wait_for_condition(
+            test_config,
+            mock_ssh_manager,
+            condition="dmesg_match",
+            pattern="firmware loaded",
+            timeout=5
+        )
+
+        assert result["matched"] is True
+        assert result["matched_line"] == "[  5.1] aic8800: firmware loaded"
+        kwargs = mock_ssh_manager.execute_script.call_args.kwargs
+        assert kwargs["remote_timeout"] == 5
+
+    @pytest.mark.asyncio
+    async def test_wait_timeout(self, test_config, mock_ssh_manager):
+        """Test the remote timeout exit code is reported as timed out."""
+        mock_ssh_manager.execute_script = AsyncMock(return_value=CommandResult("", "", 124))
+
+        result = await wait_for_condition(
+            test_config,
+            mock_ssh_manager,
+            condition="interface_present",
+            target="wlan0mon",
+            timeout=1
+        )
+
+        assert result["matched"] is False
+        assert result["timed_out"] is True
+
+    @pytest.mark.asyncio
+    async def test_wait_requires_target(self, test_config, mock_ssh_manager):
+        """Test conditions other than dmesg_match require a target."""
+        result = await wait_for_condition(test_config, mock_ssh_manager, condition="module_loaded")
+        assert "target is required" in result["error"]
+
+    @pytest.mark.asyncio
+    async def test_wait_file_requires_absolute_path(self, test_config, mock_ssh_manager):
+        """Test a relative file_exists target is rejected before running anything."""
+        mock_ssh_manager.execute_script = AsyncMock()
+
+        result = await wait_for_condition(
+            test_config, mock_ssh_manager, condition="file_exists", target="foo.txt"
+        )
+
+        assert "absolute path" in result["error"]
+        mock_ssh_manager.execute_script.assert_not_called()
+
+    def test_watch_file_with_missing_parent(self, tmp_path):
+        """Test a file whose parent directory appears later is still waited for."""
+        import subprocess
+        import time
+
+        target = tmp_path / "new" / "fw.bin"
+        script = build_watch_script("file_exists", str(target))
+        assert f"test -d {target.parent}" in script
+
+        process = subprocess.Popen(["sh", "-c", script], stdout=subprocess.PIPE, text=True)
+        try:
+            time.sleep(0.3)
+            assert process.poll() is None
+            target.parent.mkdir()
+            target.touch()
+            stdout, _ = process.communicate(timeout=5)
+        finally:
+            process.kill()
+        assert process.returncode == 0
+        assert stdout.startswith("MATCHED")
+
+    def test_watch_script_is_event_driven(self):
+        """Test watch scripts use event sources rather than sleep loops."""
+        assert "ip monitor link" in build_watch_script("interface_up", "wlan0")
+        assert "udevadm monitor" in build_watch_script("module_loaded", "aic8800-fdrv")
+        assert "'^aic8800_fdrv '" in build_watch_script("module_loaded", "aic8800-fdrv")
+        assert "dmesg -W" in build_watch_script("dmesg_match", None, pattern="fw")
+
+
+@pytest.mark.unit
+class TestExecuteCommand:
+    """Test ad-hoc command execution."""
+
+    @staticmethod
+    def streaming(lines, exit_code=0):
+        """Fake stream_script emitting stdout lines then exiting."""
+        async def stream_script(script, on_output, timeout=30, needs_root=False, logged_output=None):
+            for line in lines:
+                await on_output("stdout", line)
+            return exit_code
+        return stream_script
+
+    @pytest.mark.asyncio
+    async def test_head_and_tail_caps(self, test_config, mock_ssh_manager):
+        """Test long output keeps only its head and tail."""
+        lines = [f"line {i}" for i in range(50)]
+        mock_ssh_manager.stream_script = AsyncMock(side_effect=self.streaming(lines))
+        progress = AsyncMock()
+
+        result = await execute_command(
+            test_config,
+            mock_ssh_manager,
+            command="cat /proc/interrupts",
+            head_lines=2,
+            tail_lines=3,
+            progress=progress
+        )
+
+        assert result["success"] is True
+        assert result["stdout"] == "line 0\nline 1\n... [45 lines omitted] ...\nline 47\nline 48\nline 49"
+        assert result["stdout_lines"] == 50
+        assert result["stdout_truncated"] is True
+        assert progress.await_count == 50
+
+    @pytest.mark.asyncio
+    async def test_failure_reports_exit_code(self, test_config, mock_ssh_manager):
+        """Test a non-zero exit code is reported as an error."""
+        mock_ssh_manager.stream_script = AsyncMock(side_effect=self.streaming([], exit_code=127))
+
+        result = await execute_command(test_config, mock_ssh_manager, command="perf stat true")
+
+        assert result["success"] is False
+        assert result["exit_code"] == 127
+        assert "exited with code 127" in result["error"]
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, test_config, mock_ssh_manager):
+        """Test a timed out command keeps its partial output."""
+        async def stream_script(script, on_output, timeout=30, needs_root=False, logged_output=None):
+            await on_output("stdout", "partial")
+            raise asyncio.TimeoutError()
+
+        mock_ssh_manager.stream_script = AsyncMock(side_effect=stream_script)
+
+        result = await execute_command(test_config, mock_ssh_manager, command="dmesg -w", timeout=1)
+
+        assert result["timed_out"] is True
+        assert result["stdout"] == "partial"
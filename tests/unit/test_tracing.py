@@ -0,0 +1,96 @@
+"""Unit tests for trace spans."""
+
+import asyncio
+import json
+import logging
+
+import pytest
+from kali_driver_mcp.tracing import Tracer, TraceContextFilter, current_span
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    """Return a tracer exporting to a temporary file."""
+    tracer = Tracer()
+    tracer.configure(str(tmp_path / "traces.jsonl"))
+    return tracer
+
+
+def read_traces(tracer):
+    """Read exported traces as lists of OTLP spans."""
+    with open(tracer.file) as f:
+        return [
+            json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+            for line in f
+        ]
+
+
+@pytest.mark.unit
+class TestTracer:
+    """Test span nesting, export and log correlation."""
+
+    def test_disabled_tracer_creates_no_spans(self):
+        """Test spans are skipped until tracing is configured."""
+        tracer = Tracer()
+
+        with tracer.span("encode") as span:
+            assert span is None
+            assert current_span() is None
+
+    def test_child_spans_share_trace(self, tracer):
+        """Test nested spans link to their parent and export with the root."""
+        root = tracer.start_span("tool/kernel_info", tool="kernel_info")
+        with tracer.span("admission.wait"):
+            pass
+        with tracer.span("ssh.execute", **{"command.timeout": 30}) as ssh:
+            with tracer.span("ssh.remote"):
+                pass
+        assert current_span() is root
+        tracer.end_span(root)
+
+        [spans] = read_traces(tracer)
+        by_name = {span["name"]: span for span in spans}
+        assert len(spans) == 4
+        assert {span["traceId"] for span in spans} == {root.trace_id}
+        assert "parentSpanId" not in by_name["tool/kernel_info"]
+        assert by_name["admission.wait"]["parentSpanId"] == root.span_id
+        assert by_name["ssh.remote"]["parentSpanId"] == ssh.span_id
+        assert by_name["ssh.execute"]["attributes"] == [
+            {"key": "command.timeout", "value": {"intValue": "30"}}
+        ]
+        assert current_span() is None
+
+    def test_error_status(self, tracer):
+        """Test a failing span is exported with an error status."""
+        with pytest.raises(RuntimeError):
+            with tracer.span("tool/driver_load"):
+                raise RuntimeError("insmod failed")
+
+        [[span]] = read_traces(tracer)
+        assert span["status"] == {"code": 2, "message": "RuntimeError: insmod failed"}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_get_separate_traces(self, tracer):
+        """Test concurrent tool calls do not adopt each other's spans."""
+        async def call(name):
+            with tracer.span(f"tool/{name}"):
+                await asyncio.sleep(0.01)
+                with tracer.span("ssh.execute"):
+                    await asyncio.sleep(0.01)
+
+        await asyncio.gather(call("kernel_info"), call("network_info"))
+
+        traces = read_traces(tracer)
+        assert len(traces) == 2
+        for spans in traces:
+            assert len({span["traceId"] for span in spans}) == 1
+
+    def test_log_records_carry_span_ids(self, tracer):
+        """Test the logging filter stamps the current trace and span ids."""
+        record = logging.LogRecord("mcp_tools", logging.INFO, __file__, 1, "TOOL-1", None, None)
+
+        with tracer.span("tool/kernel_info") as span:
+            TraceContextFilter().filter(record)
+
+        assert record.trace_id == span.trace_id
+        assert record.span_id == span.span_id